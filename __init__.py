@@ -19,7 +19,7 @@ _package_dir = _app_dir / "apex_item"
 # The structure is: apps/apex_item/apex_item/hooks.py
 # We need to make apex_item.hooks importable
 
-_modules_to_import = ['hooks', 'install', 'item_price_hooks', 'item_price_config', 'api']
+_modules_to_import = ['hooks', 'utils', 'tracing', 'install', 'item_price_writer', 'item_price_hooks', 'item_price_queue', 'item_price_rebuild', 'item_price_reconcile', 'item_price_view_refresh', 'item_price_config', 'api']
 
 for module_name in _modules_to_import:
     module_path = _package_dir / f"{module_name}.py"
@@ -0,0 +1,205 @@
+# Copyright (c) 2025, Gaber and contributors
+# For license information, please see license.txt
+
+"""Incremental ledger of open Purchase Order quantity per item, warehouse and expected date"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, get_last_day, get_last_day_of_week, getdate, now
+
+from apex_item.utils import chunked
+
+_READY_KEY = "apex_item_open_purchase_ledger_ready"
+_CHUNK_SIZE = 500
+# Decimal places compared when deciding whether a ledger row changed
+_PRECISION = 6
+
+# Open PO line quantity grouped into ledger rows; {conditions} narrows the item scope
+_OPEN_PURCHASE_SELECT = """
+	SELECT
+		MD5(CONCAT_WS(CHAR(31), POI.item_code, IFNULL(POI.warehouse, ''), IFNULL(POI.schedule_date, ''))),
+		%(now)s, %(now)s, %(user)s, %(user)s,
+		POI.item_code,
+		IFNULL(POI.warehouse, ''),
+		POI.schedule_date,
+		SUM(POI.qty - POI.received_qty)
+	FROM `tabPurchase Order Item` POI
+	INNER JOIN `tabPurchase Order` PO ON PO.name = POI.parent
+	WHERE PO.docstatus = 1
+		AND POI.qty > POI.received_qty
+		{conditions}
+	GROUP BY POI.item_code, IFNULL(POI.warehouse, ''), POI.schedule_date
+"""
+
+
+class ItemOpenPurchase(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Open Purchase", ["item_code", "warehouse"])
+
+
+def is_ledger_ready() -> bool:
+	"""True once the ledger has been backfilled and can replace the live PO join."""
+	return bool(frappe.db.get_global(_READY_KEY))
+
+
+def rebuild_open_purchase_ledger() -> None:
+	"""Backfill the whole ledger from submitted Purchase Orders and mark it ready."""
+	frappe.db.sql("DELETE FROM `tabItem Open Purchase`")
+	_insert_open_purchase_rows("", {})
+	frappe.db.set_global(_READY_KEY, 1)
+	frappe.db.commit()
+
+
+def enqueue_ledger_rebuild_if_needed() -> None:
+	if not is_ledger_ready():
+		frappe.enqueue(
+			"apex_item.apex_item.doctype.item_open_purchase.item_open_purchase.rebuild_open_purchase_ledger",
+			queue="long",
+			timeout=3600,
+			job_id="apex_item_open_purchase_ledger_rebuild",
+			deduplicate=True,
+		)
+
+
+def sync_open_purchase_ledger(item_codes: Iterable[str]) -> None:
+	"""
+	Recompute ledger rows for the given items from their open PO lines. Called from
+	Purchase Order / Purchase Receipt events, so only the touched items are scanned.
+	"""
+	for chunk in chunked(sorted({code for code in item_codes if code}), _CHUNK_SIZE):
+		params = {"item_codes": tuple(chunk)}
+		frappe.db.sql("DELETE FROM `tabItem Open Purchase` WHERE item_code IN %(item_codes)s", params)
+		_insert_open_purchase_rows("AND POI.item_code IN %(item_codes)s", params)
+
+
+def reconcile_open_purchase_ledger(item_codes: Iterable[str]) -> int:
+	"""
+	Bring the ledger rows of the given items in line with their open PO lines, writing
+	only the rows that differ. The scheduled reconciles pass every item whose Bin moved,
+	mostly through sales postings, so unchanged items must cost reads only. Returns the
+	rows written or deleted.
+	"""
+	changes = 0
+	for chunk in chunked(sorted({code for code in item_codes if code}), _CHUNK_SIZE):
+		params = _get_insert_params({"item_codes": tuple(chunk)})
+		expected = {
+			row[0]: row
+			for row in frappe.db.sql(
+				_OPEN_PURCHASE_SELECT.format(conditions="AND POI.item_code IN %(item_codes)s"), params
+			)
+		}
+		stored = dict(
+			frappe.db.sql(
+				"SELECT name, open_qty FROM `tabItem Open Purchase` WHERE item_code IN %(item_codes)s", params
+			)
+		)
+
+		stale = [name for name in stored if name not in expected]
+		if stale:
+			frappe.db.sql(
+				"DELETE FROM `tabItem Open Purchase` WHERE name IN %(names)s", {"names": tuple(stale)}
+			)
+
+		# Ledger names hash (item_code, warehouse, schedule_date), so only open_qty can differ
+		changed = [
+			row
+			for name, row in expected.items()
+			if name not in stored or flt(stored[name], _PRECISION) != flt(row[-1], _PRECISION)
+		]
+		for rows in chunked(changed, _CHUNK_SIZE):
+			frappe.db.sql(
+				"""
+				INSERT INTO `tabItem Open Purchase`
+					(name, creation, modified, owner, modified_by, item_code, warehouse, schedule_date, open_qty)
+				VALUES {placeholders}
+				ON DUPLICATE KEY UPDATE open_qty = VALUES(open_qty), modified = VALUES(modified)
+			""".format(placeholders=", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))),
+				tuple(value for row in rows for value in row),
+			)
+		changes += len(stale) + len(changed)
+	return changes
+
+
+def get_waiting_qty(item_codes: Iterable[str]) -> Dict[str, Dict[str, float]]:
+	"""Return {item_code: {warehouse: open qty}} read from the ledger."""
+	rows = frappe.db.sql(
+		"""
+		SELECT item_code, warehouse, SUM(open_qty) AS waiting
+		FROM `tabItem Open Purchase`
+		WHERE item_code IN %(item_codes)s
+		GROUP BY item_code, warehouse
+	""",
+		{"item_codes": tuple(item_codes)},
+		as_dict=True,
+	)
+
+	waiting: Dict[str, Dict[str, float]] = {}
+	for row in rows:
+		waiting.setdefault(row.item_code, {})[row.warehouse or None] = flt(row.waiting)
+	return waiting
+
+
+def get_waiting_buckets(
+	item_pairs: Iterable[Tuple[str, Optional[str]]], today=None
+) -> Dict[Tuple[str, Optional[str]], Dict[str, float]]:
+	"""
+	Return open PO quantity arriving by the end of this week and this month (overdue
+	lines included) for each (item_code, warehouse) pair; a None warehouse sums all.
+	"""
+	pairs = list(dict.fromkeys(pair for pair in item_pairs if pair and pair[0]))
+	buckets = {pair: {"waiting_this_week": 0.0, "waiting_this_month": 0.0} for pair in pairs}
+	if not pairs:
+		return buckets
+
+	today = getdate(today)
+	week_end = get_last_day_of_week(today)
+	month_end = get_last_day(today)
+
+	for chunk in chunked(sorted({item_code for item_code, _warehouse in pairs}), _CHUNK_SIZE):
+		rows = frappe.db.sql(
+			"""
+			SELECT
+				item_code,
+				warehouse,
+				SUM(CASE WHEN schedule_date <= %(week_end)s THEN open_qty ELSE 0 END) AS this_week,
+				SUM(CASE WHEN schedule_date <= %(month_end)s THEN open_qty ELSE 0 END) AS this_month
+			FROM `tabItem Open Purchase`
+			WHERE item_code IN %(item_codes)s
+			GROUP BY item_code, warehouse
+		""",
+			{"item_codes": tuple(chunk), "week_end": week_end, "month_end": month_end},
+			as_dict=True,
+		)
+
+		for row in rows:
+			# Each ledger warehouse counts towards its own pair and the item's all-warehouse pair
+			for pair in {(row.item_code, row.warehouse or None), (row.item_code, None)}:
+				if pair in buckets:
+					buckets[pair]["waiting_this_week"] += flt(row.this_week)
+					buckets[pair]["waiting_this_month"] += flt(row.this_month)
+
+	return buckets
+
+
+def _insert_open_purchase_rows(conditions: str, params: dict) -> None:
+	params = _get_insert_params(params)
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabItem Open Purchase`
+			(name, creation, modified, owner, modified_by, item_code, warehouse, schedule_date, open_qty)
+		{select}
+		ON DUPLICATE KEY UPDATE open_qty = VALUES(open_qty), modified = VALUES(modified)
+	""".format(select=_OPEN_PURCHASE_SELECT.format(conditions=conditions)),
+		params,
+	)
+
+
+def _get_insert_params(params: dict) -> dict:
+	return dict(params, now=now(), user=frappe.session.user if frappe.session else "Administrator")
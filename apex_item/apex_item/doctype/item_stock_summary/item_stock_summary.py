@@ -0,0 +1,255 @@
+# Copyright (c) 2025, Gaber and contributors
+# For license information, please see license.txt
+
+"""Materialized stock figures per (item_code, warehouse)"""
+
+from __future__ import annotations
+
+from hashlib import md5
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, now
+
+from apex_item.utils import chunked
+
+# Warehouse value of the per-item "all warehouses" rollup row
+ROLLUP_WAREHOUSE = ""
+
+_QTY_COLUMNS = ("actual_qty", "reserved_qty", "available_qty", "waiting_qty")
+_VALUE_COLUMNS = (*_QTY_COLUMNS, "item_group", "item_image")
+_UPSERT_CHUNK_SIZE = 500
+# Decimal places compared when deciding whether a summary row changed
+_PRECISION = 6
+
+
+class ItemStockSummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Item Stock Summary", ["item_code", "warehouse"], constraint_name="item_warehouse")
+
+
+def is_summary_only() -> bool:
+	"""
+	With apex_item_stock_summary_reads = 1 in site config the summary is the only store of
+	stock quantities: Item Price keeps item data only and readers join this table.
+	"""
+	return bool(cint(frappe.conf.get("apex_item_stock_summary_reads")))
+
+
+def get_summary_name(item_code: str, warehouse: Optional[str]) -> str:
+	"""Deterministic document name for a (item_code, warehouse) pair."""
+	key = f"{item_code}\x1f{warehouse or ROLLUP_WAREHOUSE}"
+	return md5(key.encode("utf-8")).hexdigest()
+
+
+def update_stock_summary(snapshots: Dict[Tuple[str, Optional[str]], Dict[str, Any]]) -> Set[tuple]:
+	"""
+	Upsert one summary row per (item_code, warehouse) snapshot; a ``None`` warehouse
+	maps to the rollup row. Rows already holding the snapshot values are not written,
+	so ``modified`` only moves on a real change. Returns the snapshot keys written.
+	"""
+	names = {key: get_summary_name(*key) for key in snapshots if key[0]}
+	if not names:
+		return set()
+
+	stored = _get_summary_values(names.values())
+	changed = {key for key in names if _differs(stored.get(names[key]), snapshots[key])}
+	if not changed:
+		return changed
+
+	timestamp = now()
+	user = frappe.session.user if frappe.session else "Administrator"
+	rows = [
+		(
+			names[key],
+			timestamp,
+			timestamp,
+			user,
+			user,
+			key[0],
+			key[1] or ROLLUP_WAREHOUSE,
+			*(flt(snapshots[key].get(column)) for column in _QTY_COLUMNS),
+			snapshots[key].get("item_group"),
+			snapshots[key].get("item_image"),
+		)
+		for key in changed
+	]
+
+	unchanged = " AND ".join(f"`{column}` <=> VALUES(`{column}`)" for column in _VALUE_COLUMNS)
+	# modified must be assigned first: MariaDB evaluates assignments left to right
+	assignments = ", ".join(
+		["`modified` = IF({unchanged}, `modified`, VALUES(`modified`))".format(unchanged=unchanged)]
+		+ [f"`{column}` = VALUES(`{column}`)" for column in _VALUE_COLUMNS]
+	)
+
+	for chunk in chunked(rows, _UPSERT_CHUNK_SIZE):
+		placeholders = ", ".join(["(" + ", ".join(["%s"] * len(chunk[0])) + ")"] * len(chunk))
+		frappe.db.sql(
+			"""
+			INSERT INTO `tabItem Stock Summary`
+				(name, creation, modified, owner, modified_by, item_code, warehouse,
+				actual_qty, reserved_qty, available_qty, waiting_qty, item_group, item_image)
+			VALUES {placeholders}
+			ON DUPLICATE KEY UPDATE {assignments}
+		""".format(placeholders=placeholders, assignments=assignments),
+			tuple(value for row in chunk for value in row),
+		)
+	return changed
+
+
+def _get_summary_values(names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+	stored: Dict[str, Dict[str, Any]] = {}
+	for chunk in chunked(list(names), _UPSERT_CHUNK_SIZE):
+		for row in frappe.db.sql(
+			"""
+			SELECT name, {columns}
+			FROM `tabItem Stock Summary`
+			WHERE name IN %(names)s
+		""".format(columns=", ".join(f"`{column}`" for column in _VALUE_COLUMNS)),
+			{"names": tuple(chunk)},
+			as_dict=True,
+		):
+			stored[row.name] = row
+	return stored
+
+
+def _differs(stored: Optional[Dict[str, Any]], snapshot: Dict[str, Any]) -> bool:
+	if not stored:
+		return True
+	for column in _VALUE_COLUMNS:
+		if column in _QTY_COLUMNS:
+			if flt(stored.get(column), _PRECISION) != flt(snapshot.get(column), _PRECISION):
+				return True
+		elif (stored.get(column) or None) != (snapshot.get(column) or None):
+			return True
+	return False
+
+
+def apply_summary_delta(item_code: str, warehouse: str, delta: float) -> None:
+	"""
+	Shift actual/available qty of the warehouse row and the item rollup row by ``delta``.
+	Rows that do not exist are left alone; see has_missing_summary.
+	"""
+	if not item_code or not warehouse or not flt(delta):
+		return
+
+	frappe.db.sql(
+		"""
+		UPDATE `tabItem Stock Summary`
+		SET
+			actual_qty = actual_qty + %(delta)s,
+			available_qty = available_qty + %(delta)s,
+			modified = %(modified)s
+		WHERE item_code = %(item_code)s
+			AND warehouse IN (%(warehouse)s, %(rollup)s)
+	""",
+		{
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"rollup": ROLLUP_WAREHOUSE,
+			"delta": flt(delta),
+			"modified": now(),
+		},
+	)
+
+
+def has_missing_summary(item_code: str, warehouse: str) -> bool:
+	"""
+	Whether an Item Price reading ``warehouse`` or the item rollup has no summary row yet.
+	Warehouses no Item Price is pinned to, and items without Item Prices, never get rows.
+	"""
+	if not item_code:
+		return False
+
+	return bool(
+		frappe.db.sql(
+			"""
+			SELECT 1
+			FROM `tabItem Price` ip
+			WHERE ip.item_code = %(item_code)s
+				AND IFNULL(ip.stock_warehouse, %(rollup)s) IN (%(warehouse)s, %(rollup)s)
+				AND NOT EXISTS (
+					SELECT 1
+					FROM `tabItem Stock Summary` s
+					WHERE s.item_code = ip.item_code
+						AND s.warehouse = IFNULL(ip.stock_warehouse, %(rollup)s)
+				)
+			LIMIT 1
+		""",
+			{"item_code": item_code, "warehouse": warehouse or ROLLUP_WAREHOUSE, "rollup": ROLLUP_WAREHOUSE},
+		)
+	)
+
+
+def delete_orphan_summaries(names: Iterable[str]) -> int:
+	"""
+	Delete the summary rows among ``names`` that no Item Price reads any more: rows of
+	items without Item Prices, and warehouse rows no Item Price is pinned to. Returns
+	the rows deleted.
+	"""
+	names = [name for name in names if name]
+	if not names:
+		return 0
+
+	orphans = frappe.db.sql_list(
+		"""
+		SELECT s.name
+		FROM `tabItem Stock Summary` s
+		WHERE s.name IN %(names)s
+			AND NOT EXISTS (
+				SELECT 1
+				FROM `tabItem Price` ip
+				WHERE ip.item_code = s.item_code
+					AND (s.warehouse = %(rollup)s OR ip.stock_warehouse = s.warehouse)
+			)
+	""",
+		{"names": tuple(names), "rollup": ROLLUP_WAREHOUSE},
+	)
+	if orphans:
+		frappe.db.sql("DELETE FROM `tabItem Stock Summary` WHERE name IN %(names)s", {"names": tuple(orphans)})
+	return len(orphans)
+
+
+def get_item_price_stock(names: Iterable[str]) -> List[Dict[str, Any]]:
+	"""
+	Return stock figures for Item Price rows read through a join on the summary table.
+	Rows without a summary entry yet fall back to the values stored on Item Price.
+	Open PO quantity due this week / month comes from the open-purchase ledger.
+	"""
+	from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import get_waiting_buckets
+
+	names = [name for name in dict.fromkeys(names or []) if name]
+	result: List[Dict[str, Any]] = []
+
+	for chunk in chunked(names, _UPSERT_CHUNK_SIZE):
+		result.extend(
+			frappe.db.sql(
+				"""
+				SELECT
+					ip.name,
+					ip.item_code,
+					ip.stock_warehouse,
+					IFNULL(s.actual_qty, ip.actual_qty) AS actual_qty,
+					IFNULL(s.reserved_qty, ip.reserved_qty) AS reserved_qty,
+					IFNULL(s.available_qty, ip.available_qty) AS available_qty,
+					IFNULL(s.waiting_qty, ip.waiting_qty) AS waiting_qty
+				FROM `tabItem Price` ip
+				LEFT JOIN `tabItem Stock Summary` s
+					ON s.item_code = ip.item_code
+					AND s.warehouse = IFNULL(ip.stock_warehouse, %(rollup)s)
+				WHERE ip.name IN %(names)s
+			""",
+				{"names": tuple(chunk), "rollup": ROLLUP_WAREHOUSE},
+				as_dict=True,
+			)
+		)
+
+	buckets = get_waiting_buckets((row.item_code, row.stock_warehouse or None) for row in result)
+	for row in result:
+		row.update(buckets.get((row.item_code, row.stock_warehouse or None)) or {})
+
+	return result
@@ -3,67 +3,229 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-
+import time
+from functools import partial
 from hashlib import md5
+from typing import Any, Dict, List, Optional
 
 import frappe
 from frappe import _
-from frappe.utils import cint  # type: ignore
+from frappe.model import numeric_fieldtypes
+from frappe.utils import cint, flt  # type: ignore
 
+from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import (
+	get_item_price_stock as get_item_price_stock_from_summary,
+	is_summary_only,
+)
 from apex_item.item_price_config import (
+	clear_compiled_config,
 	get_allowed_fieldnames,
 	get_default_card_config,
 	get_field_definition,
 )
-from apex_item.item_price_hooks import set_stock_fields
-
-_CARD_CONFIG_CACHE_KEY = "apex_item:item_price_card_config"
+from apex_item.item_price_hooks import get_default_warehouse_cache_stats as get_warehouse_cache_stats
+from apex_item.item_price_rebuild import cancel_rebuild, get_rebuild_state, start_rebuild
+from apex_item.item_price_reconcile import (
+	get_partitioned_reconcile_status,
+	retry_failed_partitions,
+	start_partitioned_reconcile,
+)
+from apex_item.tracing import span
+from apex_item.utils import RedisLease, SiteTTLCache, get_conf_int, get_redis_value
+
+_CARD_CONFIG_CACHE_KEY = "apex_item:item_price_card_config:{lang}:{version}"
+_CARD_CONFIG_VERSION_KEY = "apex_item:item_price_card_config:version"
+_CARD_CONFIG_TTL = 3600  # apex_item_card_config_ttl (seconds a built config stays cached)
+_CARD_CONFIG_VERSION_CHECK_INTERVAL = 2  # seconds a worker trusts its last seen config version
+_CARD_CONFIG_LAST_GOOD_KEY = "apex_item:item_price_card_config:last_good:{lang}"
+_CARD_CONFIG_LOCK_KEY = "apex_item:item_price_card_config:rebuild_lock:{lang}"
+_CARD_CONFIG_LOCK_TTL = 30  # seconds before a crashed rebuilder's lock expires
+_CARD_CONFIG_LOCK_WAIT_MS = 2000  # apex_item_card_config_lock_wait_ms (wait when no stale config exists)
+_CARD_CONFIG_METRICS_KEY = "apex_item:item_price_card_config:metrics"
+_CARD_CONFIG_VERSION_EVENT = "apex_item_card_config_version"
+
+# In-process L1 in front of Redis: the version is re-read at most every few seconds and
+# configs are keyed by version, so a bump anywhere is picked up without pub/sub
+_card_config_version_l1 = SiteTTLCache(maxsize=256, ttl=_CARD_CONFIG_VERSION_CHECK_INTERVAL)
+_card_config_l1 = SiteTTLCache(maxsize=1024, ttl=_CARD_CONFIG_TTL)
+_FEED_PAGE_LENGTH = 20
+_FEED_MAX_PAGE_LENGTH = 100
+_FEED_PREFETCH_KEY = "apex_item:item_price_feed:{user}:{key}"
+_FEED_PREFETCH_TTL = 60  # seconds a prefetched next page stays available
+_FEED_BASE_FIELDS = ("name", "item_code", "item_name", "modified")
+_FEED_STOCK_FIELDS = ("actual_qty", "reserved_qty", "available_qty", "waiting_qty")
+# Sort columns that can never be NULL, so the keyset cursor stays exact
+_FEED_SORT_STANDARD_FIELDS = ("modified", "creation", "name")
 _EXCLUDED_CARD_FIELDS = {"item_name"}
 _PRIMARY_PRICE_FIELD = "price_list_rate"
 
 
 @frappe.whitelist()
-def get_item_price_card_config(force: bool = False) -> Dict[str, Any]:
-	"""Return the Item Price mobile card configuration, using Redis cache when possible."""
+def get_item_price_card_config(force: bool = False, version: Optional[int] = None) -> Dict[str, Any]:
+	"""
+	Return the Item Price mobile card configuration, served from the in-process cache,
+	then Redis, before building it. The returned dict is shared; do not mutate it.
+
+	The response carries the config ``version``; a client passing the version it already
+	holds gets ``{"not_modified": 1, "version": ...}`` when nothing has changed.
+	"""
+
+	if cint(force):
+		version = get_card_config_version()
+	else:
+		current = _card_config_version_l1.get_or_set("version", get_card_config_version)
+		if version and cint(version) == current:
+			return {"not_modified": 1, "version": current}
+
+		version = current
+		lang = frappe.local.lang or "en"
+		config = _card_config_l1.get_or_set((lang, version), partial(_get_cached_item_price_card_config, version))
+		if config:
+			return config
+		_card_config_l1.invalidate((lang, version))
+		return _rebuild_item_price_card_config(version)
+
+	return _build_and_cache_item_price_card_config(version)
+
+
+def boot_session(bootinfo) -> None:
+	"""
+	Ship the card config (with its version) in the desk boot payload for first-paint
+	rendering, and whether stock quantities must be read from Item Stock Summary.
+	"""
+	try:
+		if frappe.has_permission("Item Price", "read"):
+			bootinfo.apex_item_card_config = get_item_price_card_config()
+			bootinfo.apex_item_stock_summary_reads = cint(is_summary_only())
+	except Exception:
+		# Boot must never fail; the list view fetches the config itself instead
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Boot Card Config")
 
-	if not force:
-		cached = _get_cached_item_price_card_config()
-		if cached:
-			return cached
 
-	config = _build_item_price_card_config()
-	_cache_item_price_card_config(config)
-	return config
+def get_card_config_version() -> int:
+	"""Return the site's card config version, bumped whenever the card settings change."""
+	cache = frappe.cache()
+	key = cache.make_key(_CARD_CONFIG_VERSION_KEY)
+	version = cache.execute_command("GET", key)
+	if version is None:
+		# Seed from the clock so versions never repeat after Redis loses the counter
+		cache.execute_command("SET", key, int(time.time() * 1000), "NX")
+		version = cache.execute_command("GET", key)
+	return cint(version)
 
 
 def clear_item_price_card_config_cache() -> None:
-	"""Remove the cached Item Price card configuration."""
+	"""Invalidate the cached Item Price card configuration by bumping the config version."""
 	try:
 		cache = frappe.cache()
-		cache.delete_key(_CARD_CONFIG_CACHE_KEY)
+		get_card_config_version()
+		version = cache.execute_command("INCR", cache.make_key(_CARD_CONFIG_VERSION_KEY))
+		_card_config_version_l1.invalidate("version")
+		clear_compiled_config()
+		# Open desks render from the config shipped at boot; tell them it moved on
+		frappe.publish_realtime(_CARD_CONFIG_VERSION_EVENT, {"version": cint(version)})
 	except Exception:
 		frappe.log_error(frappe.get_traceback(), "Apex Item: Clear Card Config Cache")
 
 
-def _get_cached_item_price_card_config() -> Optional[Dict[str, Any]]:
+def on_card_settings_update(doc, method=None) -> None:
+	"""List View Settings / Item Price Card Setting hook: invalidate once the change is committed."""
+	if doc.doctype == "List View Settings" and doc.name != "Item Price":
+		return
+
+	try:
+		frappe.db.after_commit.add(clear_item_price_card_config_cache)
+	except AttributeError:
+		clear_item_price_card_config_cache()
+
+
+@frappe.whitelist()
+def get_card_config_metrics() -> Dict[str, Any]:
+	"""Return card config rebuild counters: rebuilds, lock waits and stale responses with timings."""
+
+	frappe.only_for("System Manager")
 	cache = frappe.cache()
-	cached = cache.hget(_CARD_CONFIG_CACHE_KEY, _get_cache_field_key())
+	metrics = cache.execute_command("HGETALL", cache.make_key(_CARD_CONFIG_METRICS_KEY)) or {}
+	return {frappe.safe_decode(key): flt(frappe.safe_decode(value)) for key, value in metrics.items()}
+
+
+def _rebuild_item_price_card_config(version: int) -> Dict[str, Any]:
+	"""
+	Single-flight rebuild after a cache miss: one request builds under a Redis lock while
+	the others serve the last good config (stale-while-revalidate) or, when there is none
+	yet, wait briefly for the builder's result.
+	"""
+	lang = frappe.local.lang or "en"
+	lease = RedisLease(_CARD_CONFIG_LOCK_KEY.format(lang=lang), _CARD_CONFIG_LOCK_TTL)
+	if lease.acquire():
+		try:
+			return _build_and_cache_item_price_card_config(version)
+		finally:
+			lease.release()
+
+	stale = get_redis_value(_CARD_CONFIG_LAST_GOOD_KEY.format(lang=lang))
+	if stale:
+		_record_card_config_metric("stale_served")
+		return stale
+
+	started = time.monotonic()
+	deadline = started + get_conf_int("apex_item_card_config_lock_wait_ms", _CARD_CONFIG_LOCK_WAIT_MS) / 1000
+	config = None
+	while not config and time.monotonic() < deadline:
+		time.sleep(0.05)
+		# Straight from Redis: frappe.local.cache still holds the miss read before the lock
+		config = get_redis_value(_get_card_config_cache_key(version))
+	_record_card_config_metric("lock_wait", (time.monotonic() - started) * 1000)
+
+	# The builder is slow or died: build without the lock rather than fail the request
+	return config or _build_and_cache_item_price_card_config(version)
+
+
+def _build_and_cache_item_price_card_config(version: int) -> Dict[str, Any]:
+	started = time.monotonic()
+	with span("card_config.build", version=version):
+		config = _build_item_price_card_config()
+	config["version"] = version
+	with span("card_config.cache", version=version):
+		_cache_item_price_card_config(config, version)
+	_record_card_config_metric("rebuild", (time.monotonic() - started) * 1000)
+	return config
 
-	if not cached:
-		return None
 
+def _record_card_config_metric(name: str, elapsed_ms: Optional[float] = None) -> None:
 	try:
-		return frappe.parse_json(cached)
+		cache = frappe.cache()
+		key = cache.make_key(_CARD_CONFIG_METRICS_KEY)
+		pipe = cache.pipeline()
+		pipe.hincrby(key, name, 1)
+		if elapsed_ms is not None:
+			pipe.hincrbyfloat(key, f"{name}_ms_total", round(elapsed_ms, 3))
+			pipe.hset(key, f"{name}_ms_last", round(elapsed_ms, 3))
+		pipe.execute()
 	except Exception:
-		# Corrupted cache entry, drop it and rebuild next time
-		cache.hdel(_CARD_CONFIG_CACHE_KEY, frappe.local.site)
-		return None
+		# Metrics must never break the config endpoint
+		pass
+
+
+def _get_cached_item_price_card_config(version: int) -> Optional[Dict[str, Any]]:
+	return frappe.cache().get_value(_get_card_config_cache_key(version))
 
 
-def _cache_item_price_card_config(config: Dict[str, Any]) -> None:
+def _cache_item_price_card_config(config: Dict[str, Any], version: int) -> None:
+	lang = frappe.local.lang or "en"
+	_card_config_l1.set((lang, version), config)
 	cache = frappe.cache()
-	cache.hset(_CARD_CONFIG_CACHE_KEY, _get_cache_field_key(), frappe.as_json(config))
+	cache.set_value(
+		_get_card_config_cache_key(version),
+		config,
+		expires_in_sec=get_conf_int("apex_item_card_config_ttl", _CARD_CONFIG_TTL),
+	)
+	# Served to concurrent requests while the next version is being rebuilt
+	cache.set_value(_CARD_CONFIG_LAST_GOOD_KEY.format(lang=lang), config)
+
+
+def _get_card_config_cache_key(version: int) -> str:
+	return _CARD_CONFIG_CACHE_KEY.format(lang=frappe.local.lang or "en", version=version)
 
 
 def _build_item_price_card_config() -> Dict[str, Any]:
@@ -91,7 +253,7 @@ def _build_item_price_card_config() -> Dict[str, Any]:
 				fields.append(field_dict)
 
 	if not fields:
-		fields = default_config.get("fields", [])
+		fields = [dict(field) for field in default_config.get("fields", ())]
 
 	return {
 		"show_item_image": show_item_image,
@@ -126,71 +288,276 @@ def _make_field_dict(fieldname: str, row: Any = None) -> Optional[Dict[str, Any]
 
 
 @frappe.whitelist()
-def update_all_item_price_qty():
-	"""Update available_qty for all Item Prices"""
+def update_all_item_price_qty(resume: bool = True) -> Dict[str, Any]:
+	"""Start (or resume) the background rebuild of stock fields for all Item Prices"""
 
 	frappe.only_for("System Manager")
 
-	item_prices = frappe.db.sql(
-		"""
-			SELECT name
-			FROM `tabItem Price`
-			WHERE item_code IS NOT NULL
-		""",
-		as_dict=True,
-	)
+	state = start_rebuild(resume=cint(resume))
+	return {
+		"success": True,
+		"status": state.get("status"),
+		"updated": state.get("written", 0),
+		"processed": state.get("processed", 0),
+		"total": state.get("total", 0),
+		"message": _("Item Price stock rebuild queued. Progress is shown as it runs."),
+	}
 
-	updated = 0
-	item_price_columns = frappe.db.get_table_columns("Item Price")
-	include_item_image = "item_image" in item_price_columns
 
-	for ip in item_prices:
-		try:
-			item_price_doc = frappe.get_doc("Item Price", ip.name)
-			set_stock_fields(item_price_doc)
-
-			values = {
-				"available_qty": item_price_doc.available_qty,
-				"reserved_qty": item_price_doc.reserved_qty,
-				"actual_qty": item_price_doc.actual_qty,
-				"waiting_qty": item_price_doc.waiting_qty,
-				"item_group": item_price_doc.item_group,
-				"stock_warehouse": item_price_doc.stock_warehouse,
-			}
+@frappe.whitelist()
+def cancel_item_price_rebuild() -> Dict[str, Any]:
+	"""Stop the running Item Price stock rebuild after its current chunk."""
+
+	frappe.only_for("System Manager")
+	return cancel_rebuild()
 
-			if include_item_image:
-				values["item_image"] = item_price_doc.item_image
 
-			frappe.db.set_value(
-				"Item Price",
-				ip.name,
-				values,
-				update_modified=False,
-			)
+@frappe.whitelist()
+def get_item_price_rebuild_status() -> Dict[str, Any]:
+	"""Return the checkpoint of the latest Item Price stock rebuild."""
 
-			updated += 1
+	frappe.only_for("System Manager")
+	return get_rebuild_state()
 
-			if updated % 50 == 0:
-				frappe.db.commit()
-				frappe.publish_realtime(
-					"progress",
-					{"progress": updated, "total": len(item_prices)},
-					user=frappe.session.user,
-				)
 
-		except Exception as exc:
-			frappe.log_error(f"Error updating {ip.name}: {str(exc)}", "Update Item Price Qty")
+@frappe.whitelist()
+def start_item_price_reconcile(partitions: Optional[int] = None) -> Dict[str, Any]:
+	"""Start a full Item Price reconcile split across parallel item_code range jobs."""
 
-	frappe.db.commit()
+	frappe.only_for("System Manager")
+	return start_partitioned_reconcile(partitions)
+
+
+@frappe.whitelist()
+def retry_item_price_reconcile() -> Dict[str, Any]:
+	"""Retry only the failed partitions of the latest full reconcile."""
+
+	frappe.only_for("System Manager")
+	return retry_failed_partitions()
+
+
+@frappe.whitelist()
+def get_item_price_reconcile_status() -> Dict[str, Any]:
+	"""Return the latest full reconcile with per-partition and aggregated progress."""
+
+	frappe.only_for("System Manager")
+	return get_partitioned_reconcile_status()
+
+
+@frappe.whitelist()
+def get_default_warehouse_cache_stats() -> Dict[str, Any]:
+	"""Return hit / miss counters of this worker's default warehouse cache."""
+
+	frappe.only_for("System Manager")
+	return get_warehouse_cache_stats()
+
+
+@frappe.whitelist()
+def get_item_price_stock(names: List[str] | str) -> List[Dict[str, Any]]:
+	"""Return stock quantities for the given Item Price rows, read from Item Stock Summary."""
+	if isinstance(names, str):
+		names = frappe.parse_json(names) if names.startswith("[") else [n.strip() for n in names.split(",")]
+	if not names:
+		return []
+
+	permitted = frappe.get_list(
+		"Item Price",
+		filters={"name": ["in", names]},
+		pluck="name",
+		limit_page_length=0,
+	)
+	return get_item_price_stock_from_summary(permitted)
+
+
+@frappe.whitelist()
+def get_item_price_feed(
+	filters: Any = None,
+	cursor: Any = None,
+	page_length: int = _FEED_PAGE_LENGTH,
+	prefetch: int = 1,
+	sort_by: Optional[str] = None,
+	sort_order: Optional[str] = None,
+) -> Dict[str, Any]:
+	"""
+	Keyset-paginated feed for the mobile cards in the list view's sort order (newest
+	first by default), projecting only the columns the card config displays. Pass the
+	returned ``next_cursor`` to read the following page; it is prefetched into Redis in
+	the background so scrolling rarely waits.
+	Returns {"rows", "next_cursor", "version", "fields"}.
+	"""
+	filters = _normalize_feed_filters(filters)
+	cursor = frappe.parse_json(cursor) if isinstance(cursor, str) else cursor
+	page_length = min(max(cint(page_length), 1), _FEED_MAX_PAGE_LENGTH)
+	sort = _normalize_feed_sort(sort_by, sort_order)
+	config = get_item_price_card_config()
+	version = config.get("version")
+
+	cache = frappe.cache()
+	prefetch_key = _get_feed_prefetch_key(filters, cursor, page_length, version, sort)
+	page = cache.get_value(prefetch_key)
+	if page:
+		cache.delete_value(prefetch_key)
+	else:
+		page = _build_item_price_feed_page(filters, cursor, page_length, config, sort)
+
+	if cint(prefetch) and page.get("next_cursor"):
+		next_key = _get_feed_prefetch_key(filters, page["next_cursor"], page_length, version, sort)
+		# One job per next page: none once it is parked, and deduplicate while one is queued
+		if not cache.execute_command("EXISTS", cache.make_key(next_key)):
+			frappe.enqueue(
+				"apex_item.api.prefetch_item_price_feed_page",
+				queue="short",
+				job_id=next_key,
+				deduplicate=True,
+				enqueue_after_commit=True,
+				now=frappe.flags.in_test,
+				user=frappe.session.user,
+				filters=filters,
+				cursor=page["next_cursor"],
+				page_length=page_length,
+				version=version,
+				sort_by=sort[0],
+				sort_order=sort[1],
+			)
+	return page
+
+
+def prefetch_item_price_feed_page(
+	user: str,
+	filters: List[list],
+	cursor: Dict[str, Any],
+	page_length: int,
+	version: int,
+	sort_by: str = "modified",
+	sort_order: str = "desc",
+) -> None:
+	"""Background job: build the next feed page as ``user`` and park it in Redis briefly."""
+	frappe.set_user(user)
+	config = get_item_price_card_config()
+	if config.get("version") != version:
+		# The card config changed meanwhile; the client will ask with the new version
+		return
+
+	sort = (sort_by, sort_order)
+	page = _build_item_price_feed_page(filters, cursor, page_length, config, sort)
+	frappe.cache().set_value(
+		_get_feed_prefetch_key(filters, cursor, page_length, version, sort),
+		page,
+		expires_in_sec=_FEED_PREFETCH_TTL,
+	)
+
+
+def _build_item_price_feed_page(
+	filters: List[list],
+	cursor: Optional[Dict[str, Any]],
+	page_length: int,
+	config: Dict[str, Any],
+	sort: tuple = ("modified", "desc"),
+) -> Dict[str, Any]:
+	sort_by, sort_order = sort
+	columns = set(frappe.db.get_table_columns("Item Price"))
+	shown = [field.get("fieldname") for field in config.get("fields", [])]
+	stock_fields = [fieldname for fieldname in shown if fieldname in _FEED_STOCK_FIELDS]
+
+	fields = list(_FEED_BASE_FIELDS)
+	fields.extend(f for f in shown if f in columns and f not in _FEED_STOCK_FIELDS and f not in fields)
+	if "price_list_rate" in shown and "currency" not in fields:
+		fields.append("currency")
+	if stock_fields and "stock_warehouse" not in fields:
+		fields.append("stock_warehouse")
+	if cint(config.get("show_item_image")) and "item_image" in columns:
+		fields.append("item_image")
+	if sort_by not in fields:
+		fields.append(sort_by)
+
+	query_filters = list(filters)
+	or_filters = None
+	seek = "<" if sort_order == "desc" else ">"
+	if cursor and sort_by == "name":
+		query_filters.append(["Item Price", "name", seek, cursor.get("name")])
+	elif cursor:
+		# Seek past the last row seen: a further sort value, or the same value with a further name
+		query_filters.append(["Item Price", sort_by, f"{seek}=", cursor.get("value")])
+		or_filters = [
+			["Item Price", sort_by, seek, cursor.get("value")],
+			["Item Price", "name", seek, cursor.get("name")],
+		]
+
+	order_by = f"`tabItem Price`.`{sort_by}` {sort_order}"
+	if sort_by != "name":
+		order_by += f", `tabItem Price`.`name` {sort_order}"
+
+	with span("feed.query", page_length=page_length):
+		rows = frappe.get_list(
+			"Item Price",
+			fields=fields,
+			filters=query_filters,
+			or_filters=or_filters,
+			order_by=order_by,
+			limit_page_length=page_length + 1,
+		)
+
+	next_cursor = None
+	if len(rows) > page_length:
+		rows = rows[:page_length]
+		value = rows[-1].get(sort_by)
+		next_cursor = {
+			"value": value if isinstance(value, (int, float)) else str(value),
+			"name": rows[-1].name,
+		}
+
+	if stock_fields and rows:
+		with span("feed.stock", rows=len(rows)):
+			stock = {row.name: row for row in get_item_price_stock_from_summary([row.name for row in rows])}
+		for row in rows:
+			values = stock.get(row.name) or {}
+			row.update({fieldname: values.get(fieldname) for fieldname in stock_fields})
 
 	return {
-		"success": True,
-		"updated": updated,
-		"total": len(item_prices),
-		"message": f"✓ Updated {updated} Item Prices successfully!",
+		"rows": rows,
+		"next_cursor": next_cursor,
+		"version": config.get("version"),
+		"fields": fields + stock_fields,
 	}
 
 
+def _normalize_feed_filters(filters: Any) -> List[list]:
+	if isinstance(filters, str):
+		filters = frappe.parse_json(filters)
+	if not filters:
+		return []
+	if isinstance(filters, dict):
+		return [
+			[key, *value] if isinstance(value, (list, tuple)) else [key, "=", value]
+			for key, value in filters.items()
+		]
+	return [list(condition) for condition in filters]
+
+
+def _normalize_feed_sort(sort_by: Optional[str], sort_order: Optional[str]) -> tuple:
+	# The list view may send a qualified `tabItem Price`.`field`; keep the bare fieldname
+	sort_by = (sort_by or "").split(".")[-1].strip("` ")
+	if sort_by not in _FEED_SORT_STANDARD_FIELDS:
+		field = frappe.get_meta("Item Price").get_field(sort_by) if sort_by else None
+		# Numeric columns are created NOT NULL; other fields would break the keyset on NULLs
+		if not field or field.fieldtype not in numeric_fieldtypes:
+			sort_by = "modified"
+	return sort_by, "asc" if (sort_order or "").lower() == "asc" else "desc"
+
+
+def _get_feed_prefetch_key(
+	filters: List[list],
+	cursor: Optional[Dict[str, Any]],
+	page_length: int,
+	version: Optional[int],
+	sort: tuple = ("modified", "desc"),
+) -> str:
+	payload = frappe.as_json([filters, cursor, page_length, version, list(sort), frappe.local.lang], indent=None)
+	return _FEED_PREFETCH_KEY.format(
+		user=frappe.session.user, key=md5(payload.encode("utf-8")).hexdigest()
+	)
+
+
 @frappe.whitelist()
 def get_item_price_card_setting_debug() -> Dict[str, Any]:
 	"""Return the raw Item Price Card Setting document for debugging purposes."""
@@ -212,6 +579,7 @@ def ensure_item_price_card_setting() -> Dict[str, Any]:
 
 	setup_item_price_card_setting()
 	frappe.db.commit()
+	clear_item_price_card_config_cache()
 	return get_item_price_card_setting_debug()
 
 
@@ -273,16 +641,11 @@ def reset_item_price_card_setting() -> Dict[str, Any]:
 		)
 
 	frappe.db.commit()
+	clear_item_price_card_config_cache()
 
 	return get_item_price_card_setting_debug()
 
 
-def _get_cache_field_key() -> str:
-	user = getattr(frappe.session, "user", None) or "Guest"
-	signature = _get_settings_signature()
-	return f"{frappe.local.site}:{user}:{signature}"
-
-
 def _get_fields_from_list_view_settings() -> List[Dict[str, Any]]:
 	settings = frappe.db.get_value(
 		"List View Settings",
@@ -419,33 +782,3 @@ def _ensure_primary_field_first(
 			seen.discard(removed_fieldname)
 
 	return fields_config, seen
-
-
-def _get_settings_signature() -> str:
-	parts: List[str] = []
-
-	settings = frappe.db.get_value(
-		"List View Settings",
-		"Item Price",
-		["modified", "fields"],
-		as_dict=True,
-	)
-	if settings:
-		parts.append(str(settings.get("modified") or ""))
-		parts.append(settings.get("fields") or "")
-
-	card_modified = frappe.db.get_value(
-		"Singles",
-		{"doctype": "Item Price Card Setting", "field": "modified"},
-		"value",
-		order_by=None,
-	)
-	if card_modified:
-		parts.append(str(card_modified))
-
-	if not parts:
-		return "default"
-
-	payload = "|".join(parts)
-	return md5(payload.encode("utf-8")).hexdigest()
-
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks for the Item Price stock pipeline.
+
+Run against a disposable site, e.g.::
+
+	bench --site bench.local execute apex_item.benchmarks.run --kwargs "{'items': 5000, 'warehouses': 10}"
+
+Each run generates a reproducible synthetic dataset (``dataset``), times the hot
+paths (``harness``), writes the results as JSON and removes the dataset again.
+"""
+
+from apex_item.benchmarks.dataset import delete_dataset, generate_dataset
+from apex_item.benchmarks.harness import CASES, compare_results, run, run_benchmarks
+
+__all__ = ["CASES", "compare_results", "delete_dataset", "generate_dataset", "run", "run_benchmarks"]
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""Synthetic, seeded dataset of Items, Warehouses, Price Lists, Bins and open Purchase Orders"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import add_days, now, nowdate
+
+from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import (
+	is_ledger_ready,
+	sync_open_purchase_ledger,
+)
+
+# Every generated record carries this prefix so a dataset can be found and removed
+PREFIX = "APEX-BENCH"
+_SUPPLIER = f"{PREFIX} Supplier"
+_INSERT_CHUNK_SIZE = 2000
+
+
+def generate_dataset(
+	items: int = 1000,
+	warehouses: int = 5,
+	price_lists: int = 3,
+	purchase_orders: Optional[int] = None,
+	bins_per_item: int = 3,
+	lines_per_order: int = 5,
+	seed: int = 42,
+) -> Dict[str, Any]:
+	"""
+	Create ``items`` stock Items with one Item Price per price list, Bins in up to
+	``bins_per_item`` warehouses and submitted Purchase Orders with open lines
+	(``items // 10`` orders by default). The same arguments and ``seed`` always
+	produce the same names and quantities. Any earlier dataset is removed first, so
+	calling it again replaces the data instead of failing on duplicate names.
+
+	Masters go through the document API; the bulk tables are written with
+	frappe.db.bulk_insert so large scales stay quick to generate. Returns the counts.
+	"""
+	delete_dataset()
+	rng = random.Random(seed)
+	company = _get_company()
+	currency = frappe.get_cached_value("Company", company, "default_currency") or "USD"
+	timestamp = now()
+	user = frappe.session.user
+	standard = {"creation": timestamp, "modified": timestamp, "owner": user, "modified_by": user}
+
+	warehouse_names = [_make_warehouse(index, company) for index in range(warehouses)]
+	price_list_names = [_make_price_list(index, currency) for index in range(price_lists)]
+	item_group = frappe.db.get_value("Item Group", {"is_group": 0}, "name") or "All Item Groups"
+
+	item_codes = [f"{PREFIX}-ITEM-{index:06d}" for index in range(items)]
+	default_warehouses = {item_code: rng.choice(warehouse_names) for item_code in item_codes}
+
+	_bulk_insert(
+		"Item",
+		["name", "item_code", "item_name", "item_group", "stock_uom", "is_stock_item", *standard],
+		[
+			(item_code, item_code, item_code, item_group, "Nos", 1, *standard.values())
+			for item_code in item_codes
+		],
+	)
+	_bulk_insert(
+		"Item Default",
+		["name", "parent", "parenttype", "parentfield", "idx", "company", "default_warehouse", *standard],
+		[
+			(f"{item_code}-DEFAULT", item_code, "Item", "item_defaults", 1, company, warehouse, *standard.values())
+			for item_code, warehouse in default_warehouses.items()
+		],
+	)
+
+	bins: List[tuple] = []
+	for item_code in item_codes:
+		for warehouse in rng.sample(warehouse_names, min(bins_per_item, len(warehouse_names))):
+			actual = rng.randint(0, 500)
+			reserved = rng.randint(0, actual // 2) if actual else 0
+			bins.append(
+				(
+					f"{PREFIX}-BIN-{len(bins):07d}",
+					item_code,
+					warehouse,
+					actual,
+					reserved,
+					actual - reserved,
+					"Nos",
+					*standard.values(),
+				)
+			)
+	_bulk_insert(
+		"Bin",
+		["name", "item_code", "warehouse", "actual_qty", "reserved_qty", "projected_qty", "stock_uom", *standard],
+		bins,
+	)
+
+	item_prices: List[tuple] = []
+	for price_list in price_list_names:
+		for index, item_code in enumerate(item_codes):
+			# Every fifth row has no stock warehouse and reads the all-warehouse rollup
+			warehouse = None if index % 5 == 4 else default_warehouses[item_code]
+			item_prices.append(
+				(
+					f"{PREFIX}-IP-{len(item_prices):07d}",
+					item_code,
+					item_code,
+					price_list,
+					round(rng.uniform(1, 1000), 2),
+					currency,
+					1,
+					"Nos",
+					warehouse,
+					*standard.values(),
+				)
+			)
+	_bulk_insert(
+		"Item Price",
+		[
+			"name",
+			"item_code",
+			"item_name",
+			"price_list",
+			"price_list_rate",
+			"currency",
+			"selling",
+			"uom",
+			"stock_warehouse",
+			*standard,
+		],
+		item_prices,
+	)
+
+	order_count = items // 10 if purchase_orders is None else purchase_orders
+	order_lines = _make_purchase_orders(
+		rng, order_count, lines_per_order, item_codes, warehouse_names, company, currency, standard
+	)
+	if is_ledger_ready():
+		# Bulk inserts bypass the Purchase Order hooks that keep the ledger in sync
+		sync_open_purchase_ledger(item_codes)
+
+	frappe.db.commit()
+	return {
+		"items": len(item_codes),
+		"warehouses": len(warehouse_names),
+		"price_lists": len(price_list_names),
+		"item_prices": len(item_prices),
+		"bins": len(bins),
+		"purchase_orders": order_count,
+		"purchase_order_lines": order_lines,
+		"seed": seed,
+	}
+
+
+def delete_dataset() -> None:
+	"""Remove every record created by generate_dataset."""
+	pattern = f"{PREFIX}%"
+	for table, column in (
+		("Item Price", "name"),
+		("Item Stock Summary", "item_code"),
+		("Item Open Purchase", "item_code"),
+		("Purchase Order Item", "parent"),
+		("Purchase Order", "name"),
+		("Bin", "name"),
+		("Item Default", "parent"),
+		("Item", "name"),
+	):
+		frappe.db.sql(f"DELETE FROM `tab{table}` WHERE `{column}` LIKE %s", pattern)
+
+	for doctype, field in (("Price List", "name"), ("Warehouse", "name"), ("Supplier", "supplier_name")):
+		for name in frappe.get_all(doctype, filters={field: ["like", pattern]}, pluck="name"):
+			frappe.delete_doc(doctype, name, force=True, ignore_permissions=True)
+
+	frappe.db.commit()
+
+
+def get_dataset_names(doctype: str, limit: Optional[int] = None) -> List[str]:
+	"""Names of generated ``doctype`` records in a stable order."""
+	return frappe.get_all(
+		doctype,
+		filters={"name": ["like", f"{PREFIX}%"]},
+		pluck="name",
+		order_by="name asc",
+		limit_page_length=limit or 0,
+	)
+
+
+def _make_purchase_orders(
+	rng: random.Random,
+	count: int,
+	lines_per_order: int,
+	item_codes: List[str],
+	warehouses: List[str],
+	company: str,
+	currency: str,
+	standard: Dict[str, Any],
+) -> int:
+	if not count or not item_codes:
+		return 0
+
+	supplier = _make_supplier()
+	today = nowdate()
+	orders: List[tuple] = []
+	lines: List[tuple] = []
+	for index in range(count):
+		name = f"{PREFIX}-PO-{index:06d}"
+		orders.append(
+			(
+				name,
+				supplier,
+				company,
+				today,
+				add_days(today, 30),
+				currency,
+				1,
+				1,
+				"To Receive and Bill",
+				*standard.values(),
+			)
+		)
+		for idx, item_code in enumerate(rng.sample(item_codes, min(lines_per_order, len(item_codes))), start=1):
+			qty = rng.randint(1, 100)
+			lines.append(
+				(
+					f"{name}-{idx:03d}",
+					name,
+					"Purchase Order",
+					"items",
+					idx,
+					item_code,
+					item_code,
+					rng.choice(warehouses),
+					qty,
+					rng.randint(0, qty - 1),
+					qty,
+					"Nos",
+					"Nos",
+					1,
+					# Spread expected dates from overdue to next month for the week/month buckets
+					add_days(today, rng.randint(-10, 45)),
+					*standard.values(),
+				)
+			)
+
+	_bulk_insert(
+		"Purchase Order",
+		[
+			"name",
+			"supplier",
+			"company",
+			"transaction_date",
+			"schedule_date",
+			"currency",
+			"conversion_rate",
+			"docstatus",
+			"status",
+			*standard,
+		],
+		orders,
+	)
+	_bulk_insert(
+		"Purchase Order Item",
+		[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"item_code",
+			"item_name",
+			"warehouse",
+			"qty",
+			"received_qty",
+			"stock_qty",
+			"uom",
+			"stock_uom",
+			"conversion_factor",
+			"schedule_date",
+			*standard,
+		],
+		lines,
+	)
+	return len(lines)
+
+
+def _bulk_insert(doctype: str, fields: List[str], values: List[tuple]) -> None:
+	frappe.db.bulk_insert(doctype, fields=list(fields), values=values, chunk_size=_INSERT_CHUNK_SIZE)
+
+
+def _get_company() -> str:
+	company = frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+	if not company:
+		frappe.throw("Benchmarks need at least one Company on the site")
+	return company
+
+
+def _make_warehouse(index: int, company: str) -> str:
+	warehouse_name = f"{PREFIX} WH {index:03d}"
+	existing = frappe.db.get_value("Warehouse", {"warehouse_name": warehouse_name, "company": company}, "name")
+	if existing:
+		return existing
+	doc = frappe.get_doc({"doctype": "Warehouse", "warehouse_name": warehouse_name, "company": company})
+	doc.insert(ignore_permissions=True)
+	return doc.name
+
+
+def _make_price_list(index: int, currency: str) -> str:
+	name = f"{PREFIX} PL {index:03d}"
+	if not frappe.db.exists("Price List", name):
+		frappe.get_doc(
+			{"doctype": "Price List", "price_list_name": name, "currency": currency, "selling": 1}
+		).insert(ignore_permissions=True)
+	return name
+
+
+def _make_supplier() -> str:
+	existing = frappe.db.get_value("Supplier", {"supplier_name": _SUPPLIER}, "name")
+	if existing:
+		return existing
+	doc = frappe.get_doc(
+		{
+			"doctype": "Supplier",
+			"supplier_name": _SUPPLIER,
+			"supplier_group": frappe.db.get_value("Supplier Group", {"is_group": 0}, "name"),
+		}
+	)
+	doc.flags.ignore_mandatory = True
+	doc.insert(ignore_permissions=True)
+	return doc.name
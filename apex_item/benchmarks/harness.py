@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""Timing harness for the Item Price stock pipeline, with JSON results"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import frappe
+from frappe.utils import now
+
+from apex_item.benchmarks.dataset import PREFIX, delete_dataset, generate_dataset, get_dataset_names
+
+_RESULTS_DIR = "apex_item_benchmarks"
+
+# Every case run_benchmarks can time, in run order
+CASES = (
+	"set_stock_fields",
+	"update_item_prices_for_item",
+	"refresh_item_prices",
+	"refresh_item_prices_by_filters",
+	"refresh_item_prices_by_filters_fresh",
+	"update_all_item_price_qty",
+	"get_item_price_card_config_cold",
+	"get_item_price_card_config_warm",
+)
+
+
+def run(**kwargs) -> Dict[str, Any]:
+	"""Entry point for ``bench execute``; see run_benchmarks for the arguments."""
+	frappe.set_user("Administrator")
+	return run_benchmarks(**kwargs)
+
+
+def run_benchmarks(
+	items: int = 1000,
+	warehouses: int = 5,
+	price_lists: int = 3,
+	purchase_orders: Optional[int] = None,
+	repeat: int = 5,
+	sample: int = 50,
+	seed: int = 42,
+	output: Optional[str] = None,
+	keep: bool = False,
+	cases: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+	"""
+	Generate a dataset, time every benchmark case ``repeat`` times and write the results
+	to ``output`` (default: sites/<site>/private/apex_item_benchmarks/<timestamp>.json).
+
+	Per-row cases run over ``sample`` rows per repetition. The dataset is removed
+	afterwards unless ``keep`` is set. ``cases`` limits the run to the named cases
+	(default: all of CASES). update_all_item_price_qty sweeps every Item Price of the
+	site, so run it on a site holding only benchmark data.
+	"""
+	from apex_item.api import (
+		clear_item_price_card_config_cache,
+		get_item_price_card_config,
+		update_all_item_price_qty,
+	)
+	from apex_item.item_price_hooks import (
+		refresh_item_prices,
+		refresh_item_prices_by_filters,
+		set_stock_fields,
+		update_item_prices_for_item,
+	)
+	from apex_item.item_price_rebuild import get_rebuild_state, run_rebuild
+
+	params = {
+		"items": items,
+		"warehouses": warehouses,
+		"price_lists": price_lists,
+		"purchase_orders": purchase_orders,
+		"repeat": repeat,
+		"sample": sample,
+		"seed": seed,
+	}
+	selected = set(cases) if cases else None
+	unknown = selected - set(CASES) if selected else None
+	if unknown:
+		frappe.throw(f"Unknown benchmark cases: {', '.join(sorted(unknown))}")
+	params["cases"] = sorted(selected) if selected else None
+	started_at = now()
+
+	dataset = generate_dataset(
+		items=items, warehouses=warehouses, price_lists=price_lists, purchase_orders=purchase_orders, seed=seed
+	)
+
+	try:
+		item_price_names = get_dataset_names("Item Price")
+		sample_names = item_price_names[:sample]
+		sample_docs = [frappe.get_doc("Item Price", name) for name in sample_names]
+		sample_items = get_dataset_names("Item", limit=sample)
+		by_price_list = {
+			"price_list": frappe.db.get_value("Item Price", item_price_names[0], "price_list")
+			if item_price_names
+			else None
+		}
+
+		def full_rebuild():
+			update_all_item_price_qty(resume=0)
+			if get_rebuild_state().get("status") == "queued":
+				# Outside tests the endpoint only enqueues; run the job inline to time the sweep
+				run_rebuild()
+
+		# (name, fn, calls, setup); only the selected cases are timed
+		specs = [
+			("set_stock_fields", lambda: [set_stock_fields(doc) for doc in sample_docs], len(sample_docs), None),
+			(
+				"update_item_prices_for_item",
+				lambda: [update_item_prices_for_item(item_code) for item_code in sample_items],
+				len(sample_items),
+				None,
+			),
+			("refresh_item_prices", lambda: refresh_item_prices(item_price_names), len(item_price_names), None),
+			(
+				"refresh_item_prices_by_filters",
+				lambda: refresh_item_prices_by_filters(by_price_list, limit=items),
+				items,
+				_mark_unsynced,
+			),
+			# Second pass over rows just synced: only the staleness probe runs
+			(
+				"refresh_item_prices_by_filters_fresh",
+				lambda: refresh_item_prices_by_filters(by_price_list, limit=items),
+				items,
+				None,
+			),
+			("update_all_item_price_qty", full_rebuild, len(item_price_names), None),
+			(
+				"get_item_price_card_config_cold",
+				get_item_price_card_config,
+				1,
+				clear_item_price_card_config_cache,
+			),
+			("get_item_price_card_config_warm", get_item_price_card_config, 1, None),
+		]
+		measured = [
+			_measure(name, fn, repeat, calls, setup=setup)
+			for name, fn, calls, setup in specs
+			if selected is None or name in selected
+		]
+	finally:
+		if not keep:
+			delete_dataset()
+
+	results = {
+		"meta": {
+			"site": frappe.local.site,
+			"started_at": started_at,
+			"finished_at": now(),
+			"python": platform.python_version(),
+			"frappe": getattr(frappe, "__version__", None),
+			"apex_item": _get_app_version(),
+			"commit": _get_git_commit(),
+			"params": params,
+			"dataset": dataset,
+		},
+		"results": {case["name"]: case for case in measured},
+	}
+	results["output"] = _write_results(results, output)
+	return results
+
+
+def compare_results(baseline: str, current: str) -> Dict[str, Dict[str, Any]]:
+	"""
+	Compare two result files case by case; ``ratio`` is current / baseline median,
+	so values above 1 are regressions.
+	"""
+	with open(baseline) as f:
+		before = json.load(f)["results"]
+	with open(current) as f:
+		after = json.load(f)["results"]
+
+	comparison = {}
+	for name, case in after.items():
+		previous = before.get(name)
+		if not previous:
+			continue
+		comparison[name] = {
+			"baseline_median": previous["median"],
+			"current_median": case["median"],
+			"ratio": round(case["median"] / previous["median"], 3) if previous["median"] else None,
+		}
+	return comparison
+
+
+def _measure(
+	name: str, fn: Callable[[], Any], repeat: int, calls: int, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, Any]:
+	"""Time ``fn`` ``repeat`` times after one untimed warm-up; ``setup`` runs untimed before each."""
+	timings: List[float] = []
+	for attempt in range(max(repeat, 1) + 1):
+		if setup:
+			setup()
+		started = time.perf_counter()
+		fn()
+		elapsed = time.perf_counter() - started
+		frappe.db.commit()
+		if attempt:
+			timings.append(elapsed)
+
+	median = statistics.median(timings)
+	return {
+		"name": name,
+		"runs": len(timings),
+		"calls": calls,
+		"min": round(min(timings), 6),
+		"median": round(median, 6),
+		"mean": round(statistics.fmean(timings), 6),
+		"max": round(max(timings), 6),
+		"stdev": round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+		"per_call_median": round(median / calls, 6) if calls else None,
+		"unit": "s",
+	}
+
+
+def _mark_unsynced() -> None:
+	# Make every generated row stale again so the filter refresh does the full work
+	frappe.db.sql("UPDATE `tabItem Price` SET stock_synced_at = NULL WHERE name LIKE %s", f"{PREFIX}%")
+
+
+def _write_results(results: Dict[str, Any], output: Optional[str]) -> str:
+	if not output:
+		stamp = results["meta"]["started_at"].replace(" ", "_").replace(":", "-")
+		output = frappe.get_site_path("private", _RESULTS_DIR, f"{stamp}.json")
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	with open(output, "w") as f:
+		json.dump(results, f, indent=1, default=str)
+	return output
+
+
+def _get_app_version() -> Optional[str]:
+	try:
+		from apex_item import __version__
+
+		return __version__
+	except ImportError:
+		return None
+
+
+def _get_git_commit() -> Optional[str]:
+	try:
+		return subprocess.check_output(
+			["git", "rev-parse", "--short", "HEAD"],
+			cwd=frappe.get_app_path("apex_item"),
+			stderr=subprocess.DEVNULL,
+			text=True,
+		).strip()
+	except Exception:
+		return None
@@ -86,6 +86,12 @@ doctype_list_js = {
 after_install = "apex_item.install.after_install"
 after_migrate = ["apex_item.install.after_migrate"]
 
+# desk boot payload carries the Item Price card config
+boot_session = "apex_item.api.boot_session"
+
+# bench clear-cache also drops the cached card configuration
+clear_cache = "apex_item.api.clear_item_price_card_config_cache"
+
 # Uninstallation
 # ------------
 
@@ -147,6 +153,16 @@ doc_events = {
 	"Bin": {
 		"on_update": "apex_item.item_price_hooks.update_item_price_from_bin",
 	},
+	"Item": {
+		"on_update": "apex_item.item_price_hooks.invalidate_item_default_warehouse",
+		"on_trash": "apex_item.item_price_hooks.invalidate_item_default_warehouse",
+	},
+	"List View Settings": {
+		"on_update": "apex_item.api.on_card_settings_update",
+	},
+	"Item Price Card Setting": {
+		"on_update": "apex_item.api.on_card_settings_update",
+	},
 	"Stock Ledger Entry": {
 		"on_submit": "apex_item.item_price_hooks.update_item_prices_from_stock_ledger",
 		"on_cancel": "apex_item.item_price_hooks.update_item_prices_from_stock_ledger",
@@ -165,6 +181,10 @@ doc_events = {
 		"on_submit": "apex_item.item_price_hooks.update_item_prices_from_purchase_receipt",
 		"on_cancel": "apex_item.item_price_hooks.update_item_prices_from_purchase_receipt",
 	},
+	"Purchase Invoice": {
+		"on_submit": "apex_item.item_price_hooks.update_item_prices_from_purchase_invoice",
+		"on_cancel": "apex_item.item_price_hooks.update_item_prices_from_purchase_invoice",
+	},
 }
 
 # DocType JavaScript
@@ -184,8 +204,14 @@ scheduler_events = {
 		# Safe to run even if workers are down - function has error handling
 		"*/5 * * * *": [
 			"apex_item.item_price_hooks.scheduled_reconcile_item_price",
+			# re-enqueue a full rebuild whose worker was restarted mid-run
+			"apex_item.item_price_rebuild.resume_interrupted_rebuild",
 		],
-	}
+	},
+	# nightly full sweep, one job per item_code range
+	"daily_long": [
+		"apex_item.item_price_reconcile.scheduled_partitioned_reconcile",
+	],
 }
 
 # Testing
@@ -218,8 +244,9 @@ scheduler_events = {
 
 # Request Events
 # ----------------
-# before_request = ["apex_item.utils.before_request"]
-# after_request = ["apex_item.utils.after_request"]
+# Opt-in SQL tracing: X-Apex-Item-Trace: 1 on a request returns a per-step summary
+before_request = ["apex_item.tracing.before_request"]
+after_request = ["apex_item.tracing.after_request"]
 
 # Job Events
 # ----------
@@ -47,6 +47,19 @@ def after_migrate() -> None:
 	"""Ensure defaults exist after migrations run."""
 	try:
 		setup_item_price_card_setting()
+		# Fields or labels may have changed with the new code
+		from apex_item.api import clear_item_price_card_config_cache
+
+		clear_item_price_card_config_cache()
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item After Migrate")
+
+	try:
+		from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import (
+			enqueue_ledger_rebuild_if_needed,
+		)
+
+		enqueue_ledger_rebuild_if_needed()
 	except Exception:
 		frappe.log_error(frappe.get_traceback(), "Apex Item After Migrate")
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from typing import Dict, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 import frappe
 from frappe import _
@@ -69,60 +70,88 @@ _FIELD_DEFINITIONS: Dict[str, Dict[str, object]] = {
 	},
 }
 
+_DEFAULT_FIELD_ORDER: Tuple[str, ...] = (
+	"price_list_rate",
+	"available_qty",
+	"actual_qty",
+	"reserved_qty",
+	"brand",
+	"item_group",
+	"waiting_qty",
+)
+
+_EMPTY_DEFINITION: Mapping[str, object] = MappingProxyType({})
+
 
 def get_allowed_fieldnames() -> List[str]:
 	"""Return the list of fieldnames that can be displayed inside the mobile card."""
 	return list(_FIELD_DEFINITIONS.keys())
 
 
-def get_field_definition(fieldname: str) -> Dict[str, object]:
-	"""Return the field definition with translated label."""
-	definition = _FIELD_DEFINITIONS.get(fieldname)
-	if not definition:
-		return {}
+def get_field_definition(fieldname: str) -> Mapping[str, object]:
+	"""Return the read-only field definition with translated label."""
+	return _compile(*_get_cache_key()).definitions.get(fieldname, _EMPTY_DEFINITION)
+
+
+def get_default_card_fields() -> Tuple[Mapping[str, object], ...]:
+	"""Return the default ordered card field configurations (read-only)."""
+	return _compile(*_get_cache_key()).default_config["fields"]
+
+
+def get_default_card_config() -> Mapping[str, object]:
+	"""
+	Return the read-only default configuration for the mobile card. Convert with
+	dict() / list() before modifying or serializing any part of it.
+	"""
+	return _compile(*_get_cache_key()).default_config
 
-	translated = deepcopy(definition)
-	translated["label"] = _(definition["label"])
-	return translated
 
+def clear_compiled_config() -> None:
+	"""Drop the compiled definitions, e.g. after translations changed."""
+	_compile.cache_clear()
 
-def get_default_card_fields() -> List[Dict[str, object]]:
-	"""Return the default ordered list of card field configurations."""
-	fields: List[Dict[str, object]] = []
 
-	_DEFAULT_FIELD_ORDER: List[str] = [
-		"price_list_rate",
-		"available_qty",
-		"actual_qty",
-		"reserved_qty",
-		"brand",
-		"item_group",
-		"waiting_qty",
-	]
+class _CompiledConfig:
+	__slots__ = ("definitions", "default_config")
 
-	for fieldname in _DEFAULT_FIELD_ORDER:
-		definition = get_field_definition(fieldname)
-		if not definition:
-			continue
+	def __init__(self, definitions: Mapping[str, Mapping[str, object]], default_config: Mapping[str, object]):
+		self.definitions = definitions
+		self.default_config = default_config
 
-		fields.append(
+
+@lru_cache(maxsize=64)
+def _compile(site: Optional[str], lang: str) -> _CompiledConfig:
+	"""Translate and freeze definitions and the default config once per (site, language)."""
+	definitions = MappingProxyType(
+		{
+			fieldname: MappingProxyType(dict(definition, label=_(definition["label"])))
+			for fieldname, definition in _FIELD_DEFINITIONS.items()
+		}
+	)
+
+	fields = tuple(
+		MappingProxyType(
 			{
 				"fieldname": fieldname,
-				"label": definition.get("label"),
-				"css_class": definition.get("css_class"),
+				"label": definitions[fieldname].get("label"),
+				"css_class": definitions[fieldname].get("css_class"),
 				"is_full_width": 1 if fieldname == "waiting_qty" else 0,
-				"hide_if_zero": definition.get("hide_if_zero", 0),
+				"hide_if_zero": definitions[fieldname].get("hide_if_zero", 0),
 			}
 		)
-
-	return fields
-
-
-def get_default_card_config() -> Dict[str, object]:
-	"""Return the default configuration dictionary for the mobile card."""
-	return {
-		"show_item_image": 0,
-		"empty_state_text": _("لا توجد أصناف مطابقة"),
-		"fields": get_default_card_fields(),
-	}
-
+		for fieldname in _DEFAULT_FIELD_ORDER
+		if fieldname in definitions
+	)
+
+	default_config = MappingProxyType(
+		{
+			"show_item_image": 0,
+			"empty_state_text": _("لا توجد أصناف مطابقة"),
+			"fields": fields,
+		}
+	)
+	return _CompiledConfig(definitions, default_config)
+
+
+def _get_cache_key() -> Tuple[Optional[str], str]:
+	return getattr(frappe.local, "site", None), getattr(frappe.local, "lang", None) or "en"
@@ -2,10 +2,45 @@
 # Item Price Hooks - Auto-calculate available quantity
 
 import frappe
-from functools import lru_cache
+import time
+from functools import partial
 from typing import Iterable, Optional
 
-from frappe.utils import flt
+from frappe.utils import cint, flt, now_datetime
+
+from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import (
+	get_waiting_qty,
+	is_ledger_ready,
+	sync_open_purchase_ledger,
+)
+from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import (
+	apply_summary_delta,
+	get_item_price_stock,
+	has_missing_summary,
+	is_summary_only,
+	update_stock_summary,
+)
+from apex_item.item_price_writer import ItemPriceWriter, publish_stock_changes
+from apex_item.tracing import span, traceable
+from apex_item.utils import SiteTTLCache, chunked, get_conf_int
+
+# Item codes per grouped snapshot query; override with apex_item_snapshot_chunk_size
+_SNAPSHOT_CHUNK_SIZE = 500
+# Decimal places compared when detecting quantity changes; override with apex_item_change_precision
+_CHANGE_PRECISION = 6
+# Per-process default warehouse cache: entries per worker (all sites) and seconds to live
+_DEFAULT_WAREHOUSE_CACHE_SIZE = 4096
+_DEFAULT_WAREHOUSE_CACHE_TTL = 300
+# Entries are keyed by a site-wide Redis version that Item saves bump; each worker re-reads
+# the version at most this often, so other workers drop stale warehouses within seconds
+_DEFAULT_WAREHOUSE_VERSION_KEY = "apex_item:default_warehouse:version"
+_DEFAULT_WAREHOUSE_VERSION_CHECK_INTERVAL = 2
+
+_default_warehouse_cache = SiteTTLCache(_DEFAULT_WAREHOUSE_CACHE_SIZE, _DEFAULT_WAREHOUSE_CACHE_TTL)
+_default_warehouse_version_l1 = SiteTTLCache(256, _DEFAULT_WAREHOUSE_VERSION_CHECK_INTERVAL)
+
+_QTY_FIELDS = ("actual_qty", "available_qty", "reserved_qty", "waiting_qty")
+_SNAPSHOT_FIELDS = (*_QTY_FIELDS, "item_group", "item_image")
 
 
 def set_stock_fields(doc, method=None):
@@ -17,7 +52,11 @@ def set_stock_fields(doc, method=None):
 	if warehouse and not getattr(doc, "stock_warehouse", None):
 		doc.stock_warehouse = warehouse
 
-	snapshot = _get_stock_snapshot(doc.item_code, warehouse)
+	with span("set_stock_fields", item_code=doc.item_code, warehouse=warehouse):
+		snapshot = _get_stock_snapshot(doc.item_code, warehouse)
+	if is_summary_only():
+		# Quantities are read from Item Stock Summary; only the item data is stored here
+		snapshot = {key: value for key, value in snapshot.items() if key not in _QTY_FIELDS}
 	_apply_snapshot_to_doc(doc, snapshot)
 
 
@@ -35,41 +74,183 @@ def update_item_prices_for_item(item_code, target_warehouse=None):
 	if not item_code:
 		return
 
-	item_prices = frappe.db.get_all(
-		"Item Price",
-		filters={"item_code": item_code},
-		fields=["name", "stock_warehouse"],
-	)
-	if not item_prices:
-		return
+	with span("update_item_prices_for_item", item_code=item_code, warehouse=target_warehouse):
+		rows = _get_item_price_rows_for_items([item_code])
+		if not rows:
+			return
+
+		targets = {item_code: {target_warehouse}} if target_warehouse else None
+		return refresh_item_price_rows(rows, targets)
+
+
+def refresh_item_price_rows(
+	rows: Iterable[dict],
+	targets: Optional[dict] = None,
+	writer: Optional[ItemPriceWriter] = None,
+	stamp_unchanged: bool = False,
+) -> dict:
+	"""
+	Refresh stock columns for already-fetched Item Price rows.
+
+	- rows: dicts holding at least name, item_code and stock_warehouse.
+	- targets: optional {item_code: {warehouse, ...}} restricting which rows are touched;
+	  rows whose warehouse cannot be resolved are always refreshed.
+	- writer: optional ItemPriceWriter shared across calls; when omitted a writer is
+	  created and flushed before returning.
+	- stamp_unchanged: also record stock_synced_at on rows whose values did not change
+	  (written rows are always stamped).
+	Snapshots are computed in bulk through get_stock_snapshots, so the query cost grows
+	with the number of chunks rather than the number of rows. Rows whose stored values
+	already match the snapshot are not written. With is_summary_only the quantities go
+	to Item Stock Summary alone and rows are only stamped when their pair changed there.
+	Returns counters: {"total": refreshed rows, "written": changed rows, "skipped": unchanged rows}.
+	"""
+	# Resolve fallback warehouses for rows without stock_warehouse in one bulk lookup
+	try:
+		with span("refresh.default_warehouses"):
+			fallback_warehouses = _get_item_default_warehouses_cached(
+				row.get("item_code") for row in rows if row.get("item_code") and not row.get("stock_warehouse")
+			)
+	except Exception:
+		# If unavailable, proceed with all-warehouses snapshots
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Resolve Default Warehouses")
+		fallback_warehouses = {}
+	plan: list[tuple[str, tuple, dict | None]] = []
 
-	# Defer resolving fallback warehouse until needed to avoid errors on sites
-	# where Item.default_warehouse column may not exist.
-	fallback_warehouse = None
-	snapshots: dict[str | None, dict] = {}
-
-	for row in item_prices:
-		# Resolve fallback lazily only if the row has no explicit warehouse
-		if not row.stock_warehouse and fallback_warehouse is None:
-			try:
-				fallback_warehouse = _get_item_default_warehouse(item_code)
-			except Exception:
-				# If unavailable (e.g. missing column), keep None and proceed with all-warehouses snapshot
-				fallback_warehouse = None
-
-		row_warehouse = row.stock_warehouse or fallback_warehouse
-		if target_warehouse and row_warehouse and row_warehouse != target_warehouse:
+	for row in rows:
+		item_code = row.get("item_code")
+		if not item_code:
 			continue
 
-		snapshot_key = row_warehouse or "__all__"
-		if snapshot_key not in snapshots:
-			snapshots[snapshot_key] = _get_stock_snapshot(item_code, row_warehouse)
+		row_warehouse = row.get("stock_warehouse") or fallback_warehouses.get(item_code)
+
+		if targets is not None:
+			item_targets = targets.get(item_code)
+			if item_targets is None:
+				continue
+			if row_warehouse and None not in item_targets and row_warehouse not in item_targets:
+				continue
+
+		extra_values = None
+		if not row.get("stock_warehouse") and row_warehouse:
+			extra_values = {"stock_warehouse": row_warehouse}
+
+		plan.append((row, (item_code, row_warehouse), extra_values))
+
+	stats = {"total": len(plan), "written": 0, "skipped": 0}
+	if not plan:
+		return stats
+
+	# Taken before reading stock so changes made while computing are seen as newer
+	synced_at = now_datetime()
+
+	# Rollup pairs come from the same grouped rows, so they cost no extra queries
+	pairs = [pair for _row, pair, _extra in plan]
+	snapshots = get_stock_snapshots(pairs + [(item_code, None) for item_code, _warehouse in pairs])
+	with span("refresh.stock_summary", pairs=len(snapshots)):
+		changed_pairs = _update_stock_summary(snapshots)
+	precision = get_conf_int("apex_item_change_precision", _CHANGE_PRECISION, minimum=0)
+	# Only stored columns are compared; a snapshot value the table cannot hold is never "changed"
+	comparable = set(get_item_price_row_fields())
+	summary_only = is_summary_only()
+	if summary_only:
+		comparable -= set(_QTY_FIELDS)
+	summary_changes: dict = {}
+
+	own_writer = writer is None
+	writer = writer or ItemPriceWriter()
+	for row, pair, extra_values in plan:
+		snapshot = snapshots.get(pair) or _empty_snapshot()
+		changes = _get_changed_values(row, snapshot, precision, comparable)
+		if extra_values:
+			changes.update(extra_values)
+		if summary_only and pair in changed_pairs:
+			summary_changes[row.get("name")] = snapshot
+			changes.setdefault("stock_synced_at", synced_at)
+		if not changes:
+			stats["skipped"] += 1
+			if stamp_unchanged:
+				writer.add(row.get("name"), {"stock_synced_at": synced_at})
+			continue
 
-		extra_values = {}
-		if not row.stock_warehouse and row_warehouse:
-			extra_values["stock_warehouse"] = row_warehouse
+		changes["stock_synced_at"] = synced_at
+		writer.add(row.get("name"), changes)
+		stats["written"] += 1
 
-		_update_item_price_row(row.name, snapshots[snapshot_key], extra_values)
+	if own_writer:
+		try:
+			writer.flush()
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), "Apex Item: refresh_item_price_rows")
+			stats["written"] = 0
+	# The writer only publishes what it stores; summary-only quantities are pushed here
+	publish_stock_changes(summary_changes)
+	return stats
+
+
+def _update_stock_summary(snapshots: dict) -> set:
+	"""Maintain Item Stock Summary once per computed (item_code, warehouse) pair; returns the pairs changed."""
+	try:
+		return update_stock_summary(snapshots)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Update Item Stock Summary")
+		return set()
+
+
+def _get_changed_values(row: dict, snapshot: dict, precision: int, comparable: set) -> dict:
+	"""
+	Return the snapshot values that differ from the stored row, ignoring float noise.
+	Only ``comparable`` fields (see get_item_price_row_fields) are considered; callers
+	must fetch rows with those fields.
+	"""
+	changes = {}
+	for fieldname, value in snapshot.items():
+		if fieldname not in comparable:
+			continue
+
+		stored = row.get(fieldname)
+		if fieldname in _QTY_FIELDS:
+			if flt(stored, precision) != flt(value, precision):
+				changes[fieldname] = value
+		elif (stored or None) != (value or None):
+			changes[fieldname] = value
+	return changes
+
+
+def get_item_price_row_fields() -> list[str]:
+	"""Fields fetched for refreshes: identity plus the stored values used for change detection."""
+	columns = set(frappe.db.get_table_columns("Item Price"))
+	return ["name", "item_code", "stock_warehouse"] + [
+		fieldname for fieldname in _SNAPSHOT_FIELDS if fieldname in columns
+	]
+
+
+def _get_item_price_rows_for_items(item_codes: Iterable[str]) -> list[dict]:
+	rows: list[dict] = []
+	chunk_size = get_conf_int("apex_item_snapshot_chunk_size", _SNAPSHOT_CHUNK_SIZE)
+	for chunk in chunked(sorted({code for code in item_codes if code}), chunk_size):
+		rows.extend(
+			frappe.db.get_all(
+				"Item Price",
+				filters={"item_code": ["in", chunk]},
+				fields=get_item_price_row_fields(),
+			)
+		)
+	return rows
+
+
+def _get_item_price_rows_by_names(names: Iterable[str]) -> list[dict]:
+	rows: list[dict] = []
+	chunk_size = get_conf_int("apex_item_snapshot_chunk_size", _SNAPSHOT_CHUNK_SIZE)
+	for chunk in chunked(list(dict.fromkeys(name for name in names if name)), chunk_size):
+		rows.extend(
+			frappe.db.get_all(
+				"Item Price",
+				filters={"name": ["in", chunk]},
+				fields=get_item_price_row_fields(),
+			)
+		)
+	return rows
 
 
 def update_item_price_from_bin(doc, method=None):
@@ -86,124 +267,286 @@ def update_item_prices_from_stock_ledger(doc, method=None):
 	item_code = getattr(doc, "item_code", None)
 	if not item_code:
 		return
-	_enqueue_item_price_refresh(
-		[{"item_code": item_code, "warehouse": getattr(doc, "warehouse", None)}]
+
+	warehouse = getattr(doc, "warehouse", None)
+	if warehouse and _is_incremental_stock_enabled():
+		delta = _get_stock_ledger_delta(doc, method)
+		if delta:
+			apply_stock_delta(item_code, warehouse, delta)
+			return
+
+	# No usable delta: recompute the affected rows from the Bins instead
+	_enqueue_item_price_refresh([{"item_code": item_code, "warehouse": warehouse}])
+
+
+def _get_stock_ledger_delta(doc, method=None) -> float:
+	"""
+	Signed quantity change a Stock Ledger Entry applies, or 0 when it has none to apply.
+
+	ERPNext cancels a voucher by submitting reversing entries that already carry the
+	negated quantity, so only an entry that is itself cancelled (docstatus 2) is
+	inverted. Stock Reconciliation entries set the balance instead of moving it.
+	"""
+	if getattr(doc, "voucher_type", None) == "Stock Reconciliation":
+		return 0.0
+
+	delta = flt(getattr(doc, "actual_qty", 0))
+	if method == "on_cancel":
+		return -delta if cint(getattr(doc, "docstatus", 0)) == 2 else 0.0
+	return delta
+
+
+def apply_stock_delta(item_code, warehouse, delta) -> None:
+	"""
+	Shift actual/available quantities of the affected Item Price rows by ``delta``.
+
+	Rows pinned to ``warehouse`` and rows without a warehouse (all-warehouse totals) are
+	updated in place with a single statement, so stock postings cost O(1) per event.
+	With is_summary_only only the Item Stock Summary rows are shifted. Drift (e.g.
+	reposts) is corrected by the scheduled full reconcile.
+	"""
+	delta = flt(delta)
+	if not item_code or not warehouse or not delta:
+		return
+
+	summary_only = is_summary_only()
+	with span("apply_stock_delta", item_code=item_code, warehouse=warehouse):
+		if summary_only:
+			_apply_summary_delta(item_code, warehouse, delta, refresh_missing=True)
+			_publish_delta_rows(item_code, warehouse)
+			return
+
+		frappe.db.sql(
+			"""
+			UPDATE `tabItem Price`
+			SET
+				actual_qty = IFNULL(actual_qty, 0) + %(delta)s,
+				available_qty = IFNULL(available_qty, 0) + %(delta)s
+			WHERE item_code = %(item_code)s
+				AND (stock_warehouse = %(warehouse)s OR IFNULL(stock_warehouse, '') = '')
+		""",
+			{"item_code": item_code, "warehouse": warehouse, "delta": delta},
+		)
+		_publish_delta_rows(item_code, warehouse)
+
+	_apply_summary_delta(item_code, warehouse, delta)
+
+
+def _apply_summary_delta(item_code, warehouse, delta, refresh_missing=False) -> None:
+	try:
+		apply_summary_delta(item_code, warehouse, delta)
+		missing = refresh_missing and has_missing_summary(item_code, warehouse)
+	except Exception:
+		# Never block stock posting on the summary table. The entry moved the Bin, so the
+		# Bin reconcile recomputes the pair; the nightly reconcile rebuilds the whole table.
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Update Item Stock Summary")
+		return
+
+	if missing:
+		# An Item Price reads a row that was never materialized; compute it from the Bins
+		_enqueue_item_price_refresh([{"item_code": item_code, "warehouse": warehouse}])
+
+
+def _publish_delta_rows(item_code, warehouse) -> None:
+	if not cint(frappe.conf.get("apex_item_realtime_stock_diffs", 1)):
+		return
+
+	rows = frappe.db.sql(
+		"""
+		SELECT name, actual_qty, available_qty
+		FROM `tabItem Price`
+		WHERE item_code = %(item_code)s
+			AND (stock_warehouse = %(warehouse)s OR IFNULL(stock_warehouse, '') = '')
+	""",
+		{"item_code": item_code, "warehouse": warehouse},
+		as_dict=True,
+	)
+	if is_summary_only():
+		rows = get_item_price_stock([row.name for row in rows])
+	publish_stock_changes(
+		{row.name: {"actual_qty": row.actual_qty, "available_qty": row.available_qty} for row in rows}
 	)
 
 
+def _is_incremental_stock_enabled() -> bool:
+	"""Delta updates from Stock Ledger Entries; disable with apex_item_incremental_stock = 0."""
+	return bool(cint(frappe.conf.get("apex_item_incremental_stock", 1)))
+
+
 def update_item_prices_from_sales_order(doc, method=None):
 	_enqueue_item_price_refresh(_collect_item_warehouse_pairs(doc, "items"))
 
 
 def update_item_prices_from_purchase_order(doc, method=None):
-	_enqueue_item_price_refresh(_collect_item_warehouse_pairs(doc, "items"))
+	pairs = _collect_item_warehouse_pairs(doc, "items")
+	_sync_open_purchase_ledger(pairs)
+	_enqueue_item_price_refresh(pairs)
 
 
 def update_item_prices_from_purchase_receipt(doc, method=None):
-	_enqueue_item_price_refresh(_collect_item_warehouse_pairs(doc, "items"))
+	pairs = _collect_item_warehouse_pairs(doc, "items")
+	_sync_open_purchase_ledger(pairs)
+	_enqueue_item_price_refresh(pairs)
+
+
+def update_item_prices_from_purchase_invoice(doc, method=None):
+	# Only invoices that move stock also receive against their Purchase Order lines
+	if cint(getattr(doc, "update_stock", 0)):
+		update_item_prices_from_purchase_receipt(doc, method)
+
+
+def _sync_open_purchase_ledger(pairs):
+	"""Keep the open-purchase ledger in step with PO / PR / PI changes inside the same transaction."""
+	try:
+		sync_open_purchase_ledger(pair["item_code"] for pair in pairs)
+	except Exception:
+		# Never block purchasing documents. The document moved the item's Bin, so the
+		# Bin reconcile re-syncs its ledger rows within one scheduler run.
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Sync Open Purchase Ledger")
 
 
 def _get_stock_snapshot(item_code, warehouse=None):
-	snapshot = _empty_snapshot()
 	if not item_code:
-		return snapshot
+		return _empty_snapshot()
+	return get_stock_snapshots([(item_code, warehouse)]).get((item_code, warehouse)) or _empty_snapshot()
 
-	try:
-		bin_conditions = ["item_code = %s"]
-		bin_params = [item_code]
-		if warehouse:
-			bin_conditions.append("warehouse = %s")
-			bin_params.append(warehouse)
 
-		stock_data = frappe.db.sql(
+def get_stock_snapshots(item_pairs: Iterable[dict | tuple | list]) -> dict[tuple, dict]:
+	"""
+	Return stock snapshots for many (item_code, warehouse) pairs at once.
+
+	A pair with an empty warehouse yields the all-warehouses aggregate for the item.
+	Bin, Purchase Order and Item data are read with grouped queries over chunks of item
+	codes (``apex_item_snapshot_chunk_size`` in site config), keyed by (item_code, warehouse).
+	"""
+	pairs = list(_deduplicate_pairs(item_pairs or []))
+	snapshots = {pair: _empty_snapshot() for pair in pairs}
+	if not pairs:
+		return snapshots
+
+	pairs_by_item: dict[str, list[tuple]] = {}
+	for pair in pairs:
+		pairs_by_item.setdefault(pair[0], []).append(pair)
+
+	chunk_size = get_conf_int("apex_item_snapshot_chunk_size", _SNAPSHOT_CHUNK_SIZE)
+	for chunk in chunked(sorted(pairs_by_item), chunk_size):
+		try:
+			_fill_snapshot_chunk(chunk, pairs_by_item, snapshots)
+		except Exception as e:
+			frappe.log_error(
+				f"Error calculating stock fields for {', '.join(chunk[:10])}: {str(e)}",
+				"Item Price - Stock Calculation",
+			)
+
+	return snapshots
+
+
+def _fill_snapshot_chunk(item_codes: list[str], pairs_by_item: dict, snapshots: dict) -> None:
+	params = {"item_codes": tuple(item_codes)}
+	# Spans of single-item chunks carry the item code
+	tags = {"item_code": item_codes[0]} if len(item_codes) == 1 else {"items": len(item_codes)}
+
+	with span("snapshot.bin_aggregate", **tags):
+		stock_rows = frappe.db.sql(
 			"""
-			SELECT 
+			SELECT
+				item_code,
+				warehouse,
 				SUM(actual_qty) as actual_qty,
 				SUM(reserved_qty + reserved_qty_for_production + reserved_qty_for_sub_contract) as reserved_qty
 			FROM `tabBin`
-			WHERE {conditions}
-		""".format(
-				conditions=" AND ".join(bin_conditions)
-			),
-			tuple(bin_params),
+			WHERE item_code IN %(item_codes)s
+			GROUP BY item_code, warehouse
+		""",
+			params,
 			as_dict=True,
 		)
 
-		waiting_conditions = [
-			"POI.item_code = %s",
-			"PO.docstatus = 1",
-			"POI.qty > POI.received_qty",
-		]
-		waiting_params = [item_code]
-		if warehouse:
-			waiting_conditions.append("POI.warehouse = %s")
-			waiting_params.append(warehouse)
-
-		waiting_data = frappe.db.sql(
-			"""
-			SELECT SUM(POI.qty - POI.received_qty) AS waiting
-			FROM `tabPurchase Order Item` POI
-			INNER JOIN `tabPurchase Order` PO ON PO.name = POI.parent
-			WHERE {conditions}
-		""".format(
-				conditions=" AND ".join(waiting_conditions)
-			),
-			tuple(waiting_params),
-			as_dict=True,
+	with span("snapshot.item_lookup", **tags):
+		item_rows = frappe.db.get_all(
+			"Item",
+			filters={"name": ["in", item_codes]},
+			fields=["name", "item_group", "image", "website_image", "thumbnail"],
 		)
 
-		item_data = frappe.db.get_value(
-			"Item",
-			item_code,
-			["item_group", "image", "website_image", "thumbnail"],
-			as_dict=True,
+	stock_by_item: dict[str, dict] = {}
+	for row in stock_rows:
+		stock_by_item.setdefault(row.item_code, {})[row.warehouse] = (
+			flt(row.get("actual_qty")),
+			flt(row.get("reserved_qty")),
 		)
 
-		if stock_data and stock_data[0]:
-			actual = flt(stock_data[0].get("actual_qty", 0))
-			reserved = flt(stock_data[0].get("reserved_qty", 0))
-			available = actual - reserved
-		else:
-			actual = reserved = available = 0
+	with span("snapshot.open_purchase", **tags):
+		waiting_by_item = _get_waiting_by_item(item_codes)
 
-		waiting = flt(waiting_data[0].get("waiting", 0)) if waiting_data and waiting_data[0] else 0
+	items = {row.name: row for row in item_rows}
 
+	for item_code in item_codes:
+		item_data = items.get(item_code)
 		item_group = item_data.get("item_group") if item_data else None
 		item_image = None
 		if item_data:
 			item_image = item_data.get("image") or item_data.get("website_image") or item_data.get("thumbnail")
 
-		snapshot.update(
-			{
-				"actual_qty": actual,
-				"available_qty": available,
-				"reserved_qty": reserved,
-				"waiting_qty": waiting,
-				"item_group": item_group,
-				"item_image": item_image,
-			}
-		)
-	except Exception as e:
-		frappe.log_error(
-			f"Error calculating stock fields for {item_code}: {str(e)}",
-			"Item Price - Stock Calculation",
-		)
+		item_stock = stock_by_item.get(item_code, {})
+		item_waiting = waiting_by_item.get(item_code, {})
+
+		for pair in pairs_by_item[item_code]:
+			warehouse = pair[1]
+			if warehouse:
+				actual, reserved = item_stock.get(warehouse, (0, 0))
+				waiting = item_waiting.get(warehouse, 0)
+			else:
+				actual = sum(values[0] for values in item_stock.values())
+				reserved = sum(values[1] for values in item_stock.values())
+				waiting = sum(item_waiting.values())
+
+			snapshots[pair].update(
+				{
+					"actual_qty": actual,
+					"available_qty": actual - reserved,
+					"reserved_qty": reserved,
+					"waiting_qty": waiting,
+					"item_group": item_group,
+					"item_image": item_image,
+				}
+			)
+
+
+def _get_waiting_by_item(item_codes: list[str]) -> dict[str, dict]:
+	"""Open PO qty per item and warehouse, from the open-purchase ledger once it is backfilled."""
+	if is_ledger_ready():
+		return get_waiting_qty(item_codes)
+
+	waiting_rows = frappe.db.sql(
+		"""
+		SELECT POI.item_code, POI.warehouse, SUM(POI.qty - POI.received_qty) AS waiting
+		FROM `tabPurchase Order Item` POI
+		INNER JOIN `tabPurchase Order` PO ON PO.name = POI.parent
+		WHERE POI.item_code IN %(item_codes)s
+			AND PO.docstatus = 1
+			AND POI.qty > POI.received_qty
+		GROUP BY POI.item_code, POI.warehouse
+	""",
+		{"item_codes": tuple(item_codes)},
+		as_dict=True,
+	)
 
-	return snapshot
+	waiting_by_item: dict[str, dict] = {}
+	for row in waiting_rows:
+		waiting_by_item.setdefault(row.item_code, {})[row.warehouse] = flt(row.get("waiting"))
+	return waiting_by_item
 
 
 def _apply_snapshot_to_doc(doc, snapshot):
-	doc.actual_qty = snapshot["actual_qty"]
-	doc.available_qty = snapshot["available_qty"]
-	doc.reserved_qty = snapshot["reserved_qty"]
-	doc.waiting_qty = snapshot["waiting_qty"]
-	doc.item_group = snapshot["item_group"]
-	doc.item_image = snapshot["item_image"]
+	for fieldname in _SNAPSHOT_FIELDS:
+		if fieldname in snapshot:
+			setattr(doc, fieldname, snapshot[fieldname])
 
 
-def _update_item_price_row(name, doc_or_snapshot, extra_values=None):
+def _update_item_price_row(name, doc_or_snapshot, extra_values=None, writer=None):
 	if isinstance(doc_or_snapshot, dict):
-		payload = doc_or_snapshot
+		payload = dict(doc_or_snapshot)
 	else:
 		payload = {
 			"available_qty": getattr(doc_or_snapshot, "available_qty", 0),
@@ -216,6 +559,14 @@ def _update_item_price_row(name, doc_or_snapshot, extra_values=None):
 
 	if extra_values:
 		payload.update(extra_values)
+	if is_summary_only():
+		payload = {key: value for key, value in payload.items() if key not in _QTY_FIELDS}
+	if not payload:
+		return
+
+	if writer is not None:
+		writer.add(name, payload)
+		return
 
 	frappe.db.set_value(
 		"Item Price",
@@ -223,6 +574,7 @@ def _update_item_price_row(name, doc_or_snapshot, extra_values=None):
 		payload,
 		update_modified=False,
 	)
+	publish_stock_changes({name: payload})
 
 
 def _empty_snapshot():
@@ -236,29 +588,126 @@ def _empty_snapshot():
 	}
 
 
-@lru_cache(maxsize=None)
 def _get_item_default_warehouse(item_code):
 	if not item_code:
 		return None
 
+	return _default_warehouse_cache.get_or_set(
+		(_get_default_warehouse_version(), item_code), partial(_load_item_default_warehouse, item_code)
+	)
+
+
+def invalidate_item_default_warehouse(doc, method=None):
+	"""Item hook (Item Defaults are saved with it): expire cached default warehouses on every worker."""
+	try:
+		frappe.db.after_commit.add(_bump_default_warehouse_version)
+	except AttributeError:
+		_bump_default_warehouse_version()
+
+
+def _get_default_warehouse_version() -> int:
+	return _default_warehouse_version_l1.get_or_set("version", _read_default_warehouse_version)
+
+
+def _read_default_warehouse_version() -> int:
+	try:
+		cache = frappe.cache()
+		key = cache.make_key(_DEFAULT_WAREHOUSE_VERSION_KEY)
+		version = cache.execute_command("GET", key)
+		if version is None:
+			# Seed from the clock so versions never repeat after Redis loses the counter
+			cache.execute_command("SET", key, int(time.time() * 1000), "NX")
+			version = cache.execute_command("GET", key)
+		return cint(version)
+	except Exception:
+		# Without Redis entries still expire with the cache TTL
+		return 0
+
+
+def _bump_default_warehouse_version() -> None:
+	try:
+		cache = frappe.cache()
+		_read_default_warehouse_version()
+		cache.execute_command("INCR", cache.make_key(_DEFAULT_WAREHOUSE_VERSION_KEY))
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Invalidate Default Warehouses")
+	_default_warehouse_version_l1.invalidate("version")
+
+
+def get_default_warehouse_cache_stats() -> dict:
+	return _default_warehouse_cache.stats()
+
+
+def _load_item_default_warehouse(item_code):
+	return get_item_default_warehouses([item_code]).get(item_code)
+
+
+def get_item_default_warehouses(item_codes: Iterable[str], company: str | None = None) -> dict[str, str | None]:
+	"""
+	Resolve default warehouses for many items at once: Item.default_warehouse when that
+	column exists, otherwise the first Item Default row by idx (optionally for ``company``).
+	Costs one Item Default query plus one optional Item query per chunk of items.
+	"""
+	item_codes = sorted({code for code in item_codes if code})
+	warehouses: dict[str, str | None] = dict.fromkeys(item_codes)
+	if not item_codes:
+		return warehouses
+
 	# Some sites may not have Item.default_warehouse column; guard defensively
 	try:
-		if hasattr(frappe.db, "has_column") and frappe.db.has_column("Item", "default_warehouse"):
-			warehouse = frappe.db.get_value("Item", item_code, "default_warehouse")
-		else:
-			warehouse = None
+		has_item_column = frappe.db.has_column("Item", "default_warehouse")
 	except Exception:
-		warehouse = None
+		has_item_column = False
+
+	chunk_size = get_conf_int("apex_item_snapshot_chunk_size", _SNAPSHOT_CHUNK_SIZE)
+	for chunk in chunked(item_codes, chunk_size):
+		if has_item_column:
+			for row in frappe.db.sql(
+				"""
+				SELECT name, default_warehouse
+				FROM `tabItem`
+				WHERE name IN %(item_codes)s AND IFNULL(default_warehouse, '') != ''
+			""",
+				{"item_codes": tuple(chunk)},
+				as_dict=True,
+			):
+				warehouses[row.name] = row.default_warehouse
+
+		missing = [item_code for item_code in chunk if not warehouses[item_code]]
+		if not missing:
+			continue
 
-	if warehouse:
-		return warehouse
+		company_condition = "AND company = %(company)s" if company else ""
+		for row in frappe.db.sql(
+			"""
+			SELECT parent, default_warehouse
+			FROM `tabItem Default`
+			WHERE parenttype = 'Item'
+				AND parent IN %(item_codes)s
+				AND IFNULL(default_warehouse, '') != ''
+				{company_condition}
+			ORDER BY parent, idx
+		""".format(company_condition=company_condition),
+			{"item_codes": tuple(missing), "company": company},
+			as_dict=True,
+		):
+			if not warehouses[row.parent]:
+				warehouses[row.parent] = row.default_warehouse
+
+	return warehouses
 
-	return frappe.db.get_value(
-		"Item Default",
-		{"parent": item_code},
-		"default_warehouse",
-		order_by="idx asc",
-	)
+
+def _get_item_default_warehouses_cached(item_codes: Iterable[str]) -> dict[str, str | None]:
+	"""Bulk variant of _get_item_default_warehouse: cache hits first, one resolve for the misses."""
+	version = _get_default_warehouse_version()
+	found, missing = _default_warehouse_cache.get_many((version, item_code) for item_code in item_codes)
+	warehouses = {item_code: warehouse for (_version, item_code), warehouse in found.items()}
+	if missing:
+		resolved = get_item_default_warehouses(item_code for _version, item_code in missing)
+		for item_code, warehouse in resolved.items():
+			_default_warehouse_cache.set((version, item_code), warehouse)
+		warehouses.update(resolved)
+	return warehouses
 
 
 def _collect_item_warehouse_pairs(doc, child_table):
@@ -286,12 +735,18 @@ def _collect_item_warehouse_pairs(doc, child_table):
 	return pairs
 
 
+@traceable
 def refresh_item_prices_for_items(item_pairs: Optional[Iterable[dict]] = None):
 	if not item_pairs:
 		return
 
+	targets: dict[str, set] = {}
 	for item_code, warehouse in _deduplicate_pairs(item_pairs):
-		update_item_prices_for_item(item_code, warehouse)
+		targets.setdefault(item_code, set()).add(warehouse)
+	if not targets:
+		return
+
+	return refresh_item_price_rows(_get_item_price_rows_for_items(targets), targets)
 
 
 def _enqueue_item_price_refresh(item_pairs):
@@ -300,17 +755,31 @@ def _enqueue_item_price_refresh(item_pairs):
 		return
 
 	if frappe.flags.in_test or frappe.flags.in_install:
-		for pair in normalized:
-			update_item_prices_for_item(*pair)
+		refresh_item_prices_for_items(normalized)
 		return
 
-	frappe.enqueue(
-		"apex_item.item_price_hooks.refresh_item_prices_for_items",
-		item_pairs=[{"item_code": item_code, "warehouse": warehouse} for item_code, warehouse in normalized],
-		queue="short",
-		timeout=300,
-		now=False,
-	)
+	try:
+		# Coalesce into the pending set once the current transaction is committed, so the
+		# debounced flusher never reads stock figures that are not visible yet.
+		frappe.db.after_commit.add(partial(_queue_item_price_refresh, normalized))
+	except AttributeError:
+		_queue_item_price_refresh(normalized)
+
+
+def _queue_item_price_refresh(normalized):
+	from apex_item.item_price_queue import queue_item_price_refresh
+
+	try:
+		queue_item_price_refresh(normalized)
+	except Exception:
+		# Redis unavailable: fall back to a dedicated job for this event
+		frappe.enqueue(
+			"apex_item.item_price_hooks.refresh_item_prices_for_items",
+			item_pairs=[{"item_code": item_code, "warehouse": warehouse} for item_code, warehouse in normalized],
+			queue="short",
+			timeout=300,
+			now=False,
+		)
 
 
 def _deduplicate_pairs(item_pairs: Iterable[dict | tuple | list]):
@@ -336,49 +805,10 @@ def _deduplicate_pairs(item_pairs: Iterable[dict | tuple | list]):
 		yield key
 
 
-def _iter_recent_bin_changes(minutes: int = 15, limit: int = 500):
-	"""
-	Yield (item_code, warehouse) pairs for Bins modified recently.
-	Used by the scheduler to reconcile Item Price quantities in case
-	background jobs were not running at the time of earlier events.
-	"""
-	try:
-		# use fallback to limit to recent changes without heavy scans
-		rows = frappe.db.sql(
-			"""
-			SELECT item_code, warehouse
-			FROM `tabBin`
-			WHERE modified >= NOW() - INTERVAL %s MINUTE
-			ORDER BY modified DESC
-			LIMIT %s
-		""",
-			(minutes, limit),
-			as_dict=True,
-		)
-	except Exception:
-		# If DB doesn't support INTERVAL in this dialect, fallback to latest rows
-		rows = frappe.db.sql(
-			"""
-			SELECT item_code, warehouse
-			FROM `tabBin`
-			ORDER BY modified DESC
-			LIMIT %s
-		""",
-			(limit,),
-			as_dict=True,
-		)
-
-	for r in rows or []:
-		item_code = r.get("item_code")
-		warehouse = r.get("warehouse")
-		if item_code:
-			yield {"item_code": item_code, "warehouse": warehouse}
-
-
 def scheduled_reconcile_item_price():
 	"""
 	Scheduled task: reconcile Item Price stock fields for items
-	with recently modified Bin rows. This provides a self-healing
+	with Bin rows changed since the last run. This provides a self-healing
 	mechanism if workers were down when events fired.
 	
 	Safe to call even if scheduler/workers are not running - will
@@ -389,10 +819,13 @@ def scheduled_reconcile_item_price():
 		if not frappe.db:
 			return
 		
-		item_pairs = list(_iter_recent_bin_changes())
-		if not item_pairs:
-			return
-		refresh_item_prices_for_items(item_pairs)
+		from apex_item.item_price_queue import drain_pending_pairs
+		from apex_item.item_price_reconcile import reconcile_changed_bins
+
+		# Pick up anything left in the coalescing queue (e.g. a flusher that died)
+		drain_pending_pairs()
+
+		reconcile_changed_bins()
 	except Exception as e:
 		# Log but don't fail - scheduler tasks should be resilient
 		frappe.log_error(
@@ -415,7 +848,9 @@ def refresh_item_price(name: str) -> dict:
 		frappe.throw("Item Price has no Item Code")
 	# Determine warehouse scope from row or item defaults
 	warehouse = getattr(doc, "stock_warehouse", None) or _get_item_default_warehouse(doc.item_code)
-	snapshot = _get_stock_snapshot(doc.item_code, warehouse)
+	snapshots = get_stock_snapshots([(doc.item_code, warehouse), (doc.item_code, None)])
+	_update_stock_summary(snapshots)
+	snapshot = snapshots[(doc.item_code, warehouse)]
 	# Apply to doc and persist
 	_apply_snapshot_to_doc(doc, snapshot)
 	_update_item_price_row(doc.name, doc, {"stock_warehouse": warehouse} if warehouse and not getattr(doc, "stock_warehouse", None) else None)
@@ -429,13 +864,13 @@ def refresh_item_price(name: str) -> dict:
 
 
 @frappe.whitelist()
-def refresh_item_prices(names: list[str] | str) -> int:
+def refresh_item_prices(names: list[str] | str, with_stats: bool = False) -> int | dict:
 	"""
 	Bulk refresh for multiple Item Price rows by name.
-	Returns the count of rows updated.
+	Returns the count of rows refreshed, or the written/skipped counters when with_stats is set.
 	"""
 	if not names:
-		return 0
+		return {"total": 0, "written": 0, "skipped": 0} if cint(with_stats) else 0
 	if isinstance(names, str):
 		try:
 			# accept JSON or comma-separated
@@ -444,39 +879,89 @@ def refresh_item_prices(names: list[str] | str) -> int:
 		except Exception:
 			names = [n.strip() for n in names.split(",") if n.strip()]
 
-	updated = 0
-	for name in names:
-		try:
-			refresh_item_price(name)
-			updated += 1
-		except Exception:
-			# continue with others; log for debugging
-			frappe.log_error(f"Failed to refresh Item Price {name}", "Apex Item: refresh_item_prices")
+	stats = refresh_item_price_rows(_get_item_price_rows_by_names(names))
 	frappe.db.commit()
-	return updated
+	return stats if cint(with_stats) else stats["total"]
 
 
 @frappe.whitelist()
-def refresh_item_prices_by_filters(filters=None, limit: int = 1000) -> int:
+def refresh_item_prices_by_filters(filters=None, limit: int = 1000, with_stats: bool = False) -> int | dict:
 	"""
 	Refresh Item Price rows matching list filters (current view).
 	- filters: can be a JSON string (from list view) or a python structure.
 	- limit: safety cap to avoid refreshing an extremely large dataset at once.
+	- with_stats: return the written/skipped counters instead of a plain count.
 	Returns the number of rows updated.
 	"""
+	with span("filter.names"):
+		name_list = get_filtered_item_price_names(filters, limit)
+
+	# Only rows whose Bin / PO / Item data moved on since their last sync are recomputed
+	with span("filter.stale_probe", rows=len(name_list)):
+		stale = get_stale_item_price_names(name_list)
+	stats = refresh_item_price_rows(_get_item_price_rows_by_names(stale), stamp_unchanged=True)
+	frappe.db.commit()
+	stats["fresh"] = len(name_list) - len(stale)
+	return stats if cint(with_stats) else stats["total"]
+
+
+def get_filtered_item_price_names(filters=None, limit: int = 1000) -> list[str]:
+	"""Names of the Item Prices matching list view filters, newest first, capped at ``limit``."""
 	try:
 		parsed = frappe.parse_json(filters) if isinstance(filters, str) else (filters or [])
 	except Exception:
 		parsed = []
 
-	# Get matching names within limit
-	names = frappe.get_all(
+	return frappe.get_all(
 		"Item Price",
 		filters=parsed or None,
-		fields=["name"],
-		limit_page_length=limit,
+		pluck="name",
+		limit_page_length=cint(limit),
 		order_by="modified desc",
 	)
-	name_list = [r["name"] for r in names]
-	return refresh_item_prices(name_list)
+
+
+def get_stale_item_price_names(names: list[str]) -> list[str]:
+	"""
+	Return the Item Prices among ``names`` that were never synced or whose Item, Bins or
+	Purchase Orders changed after their stock_synced_at, with one set-based probe per chunk.
+	"""
+	if not names:
+		return []
+	if not frappe.db.has_column("Item Price", "stock_synced_at"):
+		return list(names)
+
+	stale: list[str] = []
+	chunk_size = get_conf_int("apex_item_snapshot_chunk_size", _SNAPSHOT_CHUNK_SIZE)
+	for chunk in chunked(names, chunk_size):
+		stale.extend(
+			frappe.db.sql_list(
+				"""
+				SELECT ip.name
+				FROM `tabItem Price` ip
+				WHERE ip.name IN %(names)s
+					AND (
+						ip.stock_synced_at IS NULL
+						OR ip.modified > ip.stock_synced_at
+						OR EXISTS (
+							SELECT 1 FROM `tabItem` i
+							WHERE i.name = ip.item_code AND i.modified > ip.stock_synced_at
+						)
+						OR EXISTS (
+							SELECT 1 FROM `tabBin` b
+							WHERE b.item_code = ip.item_code AND b.modified > ip.stock_synced_at
+						)
+						OR EXISTS (
+							SELECT 1
+							FROM `tabPurchase Order Item` POI
+							INNER JOIN `tabPurchase Order` PO ON PO.name = POI.parent
+							WHERE POI.item_code = ip.item_code
+								AND (POI.modified > ip.stock_synced_at OR PO.modified > ip.stock_synced_at)
+						)
+					)
+			""",
+				{"names": tuple(chunk)},
+			)
+		)
+	return stale
 
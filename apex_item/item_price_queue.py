@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Coalescing Redis queue for Item Price stock refresh events"""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+
+import frappe
+
+from apex_item.item_price_hooks import _deduplicate_pairs, refresh_item_prices_for_items
+from apex_item.utils import get_conf_int
+
+_PENDING_KEY = "apex_item:item_price_refresh:pending"
+_PENDING_SINCE_KEY = "apex_item:item_price_refresh:pending_since"
+_FLUSH_SCHEDULED_KEY = "apex_item:item_price_refresh:flush_scheduled"
+_MEMBER_SEPARATOR = "\x1f"
+_FLUSH_METHOD = "apex_item.item_price_queue.flush_item_price_refresh_queue"
+
+# Drops the debounce start only when nothing is pending any more
+_CLEAR_SINCE_SCRIPT = """
+if redis.call('SCARD', KEYS[1]) == 0 then
+	return redis.call('DEL', KEYS[2])
+end
+return 0
+"""
+
+# Defaults, overridable from site config
+_FLUSH_INTERVAL = 5  # apex_item_refresh_flush_interval (seconds to debounce)
+_FLUSH_THRESHOLD = 500  # apex_item_refresh_flush_threshold (pending pairs that trigger a flush)
+_FLUSH_BATCH_SIZE = 500  # apex_item_refresh_batch_size (pairs refreshed per batch)
+_FLUSH_MARKER_TTL = 600  # safety expiry if a flusher dies without clearing its marker
+
+
+def queue_item_price_refresh(item_pairs: Iterable[dict | tuple | list]) -> int:
+	"""
+	Add (item_code, warehouse) pairs to the pending set and make sure one flusher job
+	is scheduled. Repeated events for the same pair collapse into a single set member,
+	so queue depth follows the number of distinct pairs rather than the number of events.
+	Returns the number of pending pairs.
+	"""
+	members = [_encode_pair(item_code, warehouse) for item_code, warehouse in _deduplicate_pairs(item_pairs)]
+	if not members:
+		return 0
+
+	cache = frappe.cache()
+	pipe = cache.pipeline()
+	pipe.sadd(cache.make_key(_PENDING_KEY), *members)
+	pipe.set(cache.make_key(_PENDING_SINCE_KEY), time.time(), nx=True)
+	pipe.set(cache.make_key(_FLUSH_SCHEDULED_KEY), 1, nx=True, ex=_FLUSH_MARKER_TTL)
+	pipe.scard(cache.make_key(_PENDING_KEY))
+	added, _since_set, flush_marker_set, pending = pipe.execute()
+
+	if flush_marker_set:
+		# Start the debounce window in RQ rather than in a sleeping worker
+		interval = get_conf_int("apex_item_refresh_flush_interval", _FLUSH_INTERVAL, minimum=0)
+		if not _enqueue_flusher(delay=interval):
+			_enqueue_flusher()
+	elif pending >= get_conf_int("apex_item_refresh_flush_threshold", _FLUSH_THRESHOLD) > pending - added:
+		# Just crossed the threshold: flush now instead of waiting for the delayed flusher.
+		# Draining concurrently with it is safe since SPOP hands out each pair once.
+		frappe.enqueue(_FLUSH_METHOD, queue="short", timeout=_FLUSH_MARKER_TTL, release_marker=False)
+	return pending
+
+
+def flush_item_price_refresh_queue(release_marker: bool = True) -> int:
+	"""
+	Background job: drain the pending set once the debounce interval has elapsed (or the
+	pending count crosses the threshold). While the interval is still running the job
+	re-enqueues itself with a delay instead of sleeping in the worker. Threshold flushes
+	run with ``release_marker`` off and leave the scheduled flusher's marker alone.
+	Returns the pairs refreshed.
+	"""
+	cache = frappe.cache()
+	remaining = _get_debounce_remaining()
+	if release_marker and remaining > 0 and _enqueue_flusher(delay=remaining):
+		# The flush marker stays held by the delayed job
+		return 0
+
+	refreshed = 0
+	try:
+		refreshed = drain_pending_pairs()
+	except Exception:
+		# The failed batch is back in the set; the next event or the scheduled
+		# reconcile retries it instead of spinning here.
+		if release_marker:
+			cache.execute_command("DEL", cache.make_key(_FLUSH_SCHEDULED_KEY))
+		return refreshed
+
+	if not release_marker:
+		return refreshed
+
+	# Release the marker, then re-check: pairs added in between either scheduled
+	# their own flusher or are picked up by re-acquiring the marker here.
+	cache.execute_command("DEL", cache.make_key(_FLUSH_SCHEDULED_KEY))
+	if get_pending_count() and cache.execute_command(
+		"SET", cache.make_key(_FLUSH_SCHEDULED_KEY), 1, "NX", "EX", _FLUSH_MARKER_TTL
+	):
+		_enqueue_flusher()
+	return refreshed
+
+
+def drain_pending_pairs(max_batches: Optional[int] = None) -> int:
+	"""
+	Pop pending pairs batch by batch and refresh them. Safe to call concurrently since
+	SPOP hands each pair to exactly one caller. A failing batch is put back and re-raised.
+	The debounce start is only cleared once the set is empty, so pairs left behind keep
+	their original max-wait deadline.
+	"""
+	cache = frappe.cache()
+	batch_size = get_conf_int("apex_item_refresh_batch_size", _FLUSH_BATCH_SIZE)
+	refreshed = 0
+	batches = 0
+
+	while max_batches is None or batches < max_batches:
+		members = cache.execute_command("SPOP", cache.make_key(_PENDING_KEY), batch_size)
+		if not members:
+			break
+
+		pairs = [_decode_pair(member) for member in members]
+		try:
+			refresh_item_prices_for_items(pairs)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			# Put the batch back so the next flush or the scheduled reconcile retries it
+			cache.sadd(_PENDING_KEY, *members)
+			frappe.log_error(frappe.get_traceback(), "Apex Item: Flush Item Price Refresh Queue")
+			raise
+
+		refreshed += len(pairs)
+		batches += 1
+
+	cache.execute_command(
+		"EVAL", _CLEAR_SINCE_SCRIPT, 2, cache.make_key(_PENDING_KEY), cache.make_key(_PENDING_SINCE_KEY)
+	)
+	return refreshed
+
+
+def get_pending_count() -> int:
+	"""Return the number of distinct (item_code, warehouse) pairs waiting to be refreshed."""
+	cache = frappe.cache()
+	return cache.execute_command("SCARD", cache.make_key(_PENDING_KEY)) or 0
+
+
+def _get_debounce_remaining() -> float:
+	"""Seconds until the pending set is due for a flush; 0 when it is due now."""
+	cache = frappe.cache()
+	since = cache.execute_command("GET", cache.make_key(_PENDING_SINCE_KEY))
+	if not since:
+		return 0
+	interval = get_conf_int("apex_item_refresh_flush_interval", _FLUSH_INTERVAL, minimum=0)
+	remaining = float(since) + interval - time.time()
+	if remaining <= 0:
+		return 0
+	if get_pending_count() >= get_conf_int("apex_item_refresh_flush_threshold", _FLUSH_THRESHOLD):
+		return 0
+	return remaining
+
+
+def _enqueue_flusher(delay: Optional[float] = None) -> bool:
+	"""Enqueue the flusher, after ``delay`` seconds when given. Returns False if that is not possible."""
+	if not delay:
+		frappe.enqueue(_FLUSH_METHOD, queue="short", timeout=_FLUSH_MARKER_TTL)
+		return True
+
+	try:
+		from frappe.utils.background_jobs import execute_job, get_queue
+
+		# frappe.enqueue has no delay; schedule frappe's job runner on the RQ scheduler directly
+		get_queue("short").enqueue_in(
+			timedelta(seconds=delay),
+			execute_job,
+			site=frappe.local.site,
+			method=_FLUSH_METHOD,
+			event=None,
+			job_name=_FLUSH_METHOD,
+			kwargs={},
+			user=frappe.session.user,
+			is_async=True,
+			retry=0,
+			job_timeout=_FLUSH_MARKER_TTL,
+		)
+		return True
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Schedule Item Price Refresh Flush")
+		return False
+
+
+def _encode_pair(item_code: str, warehouse: Optional[str]) -> str:
+	return f"{item_code}{_MEMBER_SEPARATOR}{warehouse or ''}"
+
+
+def _decode_pair(member: bytes | str) -> Tuple[str, Optional[str]]:
+	if isinstance(member, bytes):
+		member = member.decode("utf-8")
+	item_code, _sep, warehouse = member.partition(_MEMBER_SEPARATOR)
+	return item_code, warehouse or None
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Resumable background rebuild of Item Price stock fields"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import now
+
+from apex_item.item_price_hooks import get_item_price_row_fields, refresh_item_price_rows
+from apex_item.item_price_writer import ItemPriceWriter
+from apex_item.tracing import traceable
+from apex_item.utils import get_conf_int, get_redis_value
+
+_STATE_KEY = "apex_item_item_price_rebuild"
+_CANCEL_KEY = "apex_item:item_price_rebuild:cancel"
+_JOB_ID = "apex_item_item_price_rebuild"
+_PROGRESS_EVENT = "apex_item_rebuild_progress"
+
+# Defaults, overridable from site config
+_CHUNK_SIZE = 500  # apex_item_rebuild_chunk_size
+_COMMIT_SIZE = 2000  # apex_item_rebuild_commit_size
+_PROGRESS_INTERVAL = 2  # apex_item_rebuild_progress_interval (seconds)
+
+_ACTIVE_STATUSES = ("queued", "running")
+_RESUMABLE_STATUSES = ("queued", "running", "failed")
+
+
+def get_rebuild_state() -> Dict[str, Any]:
+	"""Return the persisted rebuild checkpoint (empty dict if no rebuild ever ran)."""
+	raw = frappe.db.get_global(_STATE_KEY)
+	if not raw:
+		return {}
+	try:
+		return json.loads(raw)
+	except Exception:
+		return {}
+
+
+def start_rebuild(resume: bool = True, user: Optional[str] = None) -> Dict[str, Any]:
+	"""
+	Enqueue the rebuild job on the long queue.
+
+	With ``resume`` an interrupted or failed run continues from its last checkpoint;
+	otherwise (or after a completed / cancelled run) paging starts from the beginning.
+	Progress events go to ``user`` (default: the current user).
+	"""
+	state = get_rebuild_state()
+	if state.get("status") in _ACTIVE_STATUSES and _is_job_active():
+		return state
+
+	if not (resume and state.get("status") in _RESUMABLE_STATUSES):
+		state = {
+			"last_name": None,
+			"processed": 0,
+			"written": 0,
+			"skipped": 0,
+			"total": frappe.db.count("Item Price", {"item_code": ["is", "set"]}),
+			"started_at": now(),
+		}
+
+	state.update(
+		{
+			"status": "queued",
+			"user": user or frappe.session.user,
+			"error": None,
+			"finished_at": None,
+		}
+	)
+	_save_state(state)
+	frappe.cache().delete_value(_CANCEL_KEY)
+
+	frappe.enqueue(
+		"apex_item.item_price_rebuild.run_rebuild",
+		queue="long",
+		timeout=get_conf_int("apex_item_rebuild_timeout", 6 * 3600),
+		job_id=_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+	return state
+
+
+def cancel_rebuild() -> Dict[str, Any]:
+	"""Ask a running rebuild to stop after its current chunk."""
+	state = get_rebuild_state()
+	if state.get("status") not in _ACTIVE_STATUSES:
+		return state
+
+	frappe.cache().set_value(_CANCEL_KEY, 1, expires_in_sec=24 * 3600)
+	if not _is_job_active():
+		# Nothing is picking up the flag; mark the checkpoint directly
+		state["status"] = "cancelled"
+		state["finished_at"] = now()
+		_save_state(state)
+	return state
+
+
+def resume_interrupted_rebuild() -> None:
+	"""Scheduled task: re-enqueue a rebuild whose worker died mid-run."""
+	try:
+		state = get_rebuild_state()
+		if state.get("status") in _ACTIVE_STATUSES and not _is_job_active():
+			# Keep reporting to the user who started the rebuild, not the scheduler
+			start_rebuild(resume=True, user=state.get("user"))
+			frappe.db.commit()
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Resume Item Price Rebuild")
+
+
+@traceable
+def run_rebuild() -> Dict[str, Any]:
+	"""
+	Background job: page through Item Price by ``name`` (keyset pagination) and refresh
+	stock fields chunk by chunk. The checkpoint is committed together with the rows it
+	covers, so a restarted job continues exactly where the last commit left off.
+	"""
+	state = get_rebuild_state()
+	if state.get("status") not in _ACTIVE_STATUSES:
+		return state
+
+	chunk_size = get_conf_int("apex_item_rebuild_chunk_size", _CHUNK_SIZE)
+	commit_size = max(get_conf_int("apex_item_rebuild_commit_size", _COMMIT_SIZE), chunk_size)
+	progress_interval = get_conf_int("apex_item_rebuild_progress_interval", _PROGRESS_INTERVAL, minimum=0)
+
+	state["status"] = "running"
+	_save_state(state)
+	frappe.db.commit()
+
+	# Full sweeps touch too many rows to push each change to clients
+	writer = ItemPriceWriter(chunk_size=chunk_size, publish=False)
+	uncommitted = 0
+	last_published = 0.0
+
+	try:
+		while True:
+			if _is_cancel_requested():
+				state["status"] = "cancelled"
+				break
+
+			rows = _get_next_page(state.get("last_name"), chunk_size)
+			if not rows:
+				state["status"] = "completed"
+				break
+
+			stats = refresh_item_price_rows(rows, writer=writer)
+			state["processed"] += len(rows)
+			state["written"] += stats["written"]
+			state["skipped"] += stats["skipped"]
+			state["last_name"] = rows[-1].name
+			uncommitted += len(rows)
+
+			if uncommitted >= commit_size:
+				_checkpoint(writer, state)
+				uncommitted = 0
+
+			if time.monotonic() - last_published >= progress_interval:
+				_publish_progress(state)
+				last_published = time.monotonic()
+	except Exception as exc:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Item Price Rebuild")
+		# Keep the last committed checkpoint so the next run resumes from it
+		state = get_rebuild_state()
+		state["status"] = "failed"
+		state["error"] = str(exc)
+		_save_state(state)
+		frappe.db.commit()
+		_publish_progress(state)
+		return state
+
+	state["finished_at"] = now()
+	_checkpoint(writer, state)
+	frappe.cache().delete_value(_CANCEL_KEY)
+	_publish_progress(state)
+	return state
+
+
+def _get_next_page(after: Optional[str], limit: int) -> List[Dict[str, Any]]:
+	"""Next keyset page of Item Price rows ordered by ``name``."""
+	conditions = ["IFNULL(`item_code`, '') != ''"]
+	params: Dict[str, Any] = {"limit": limit}
+	if after:
+		conditions.append("`name` > %(after)s")
+		params["after"] = after
+
+	return frappe.db.sql(
+		"""
+		SELECT {fields}
+		FROM `tabItem Price`
+		WHERE {conditions}
+		ORDER BY `name` ASC
+		LIMIT %(limit)s
+	""".format(
+			fields=", ".join(f"`{field}`" for field in get_item_price_row_fields()),
+			conditions=" AND ".join(conditions),
+		),
+		params,
+		as_dict=True,
+	)
+
+
+def _is_cancel_requested() -> bool:
+	# get_value would keep returning the miss frappe.local.cache stored on the first
+	# check, so a cancel from another process would never be seen
+	return bool(get_redis_value(_CANCEL_KEY))
+
+
+def _checkpoint(writer: ItemPriceWriter, state: Dict[str, Any]) -> None:
+	writer.flush()
+	_save_state(state)
+	frappe.db.commit()
+
+
+def _save_state(state: Dict[str, Any]) -> None:
+	frappe.db.set_global(_STATE_KEY, json.dumps(state, default=str))
+
+
+def _publish_progress(state: Dict[str, Any]) -> None:
+	frappe.publish_realtime(
+		_PROGRESS_EVENT,
+		{
+			"status": state.get("status"),
+			"progress": state.get("processed", 0),
+			"total": state.get("total", 0),
+			"written": state.get("written", 0),
+			"skipped": state.get("skipped", 0),
+		},
+		user=state.get("user") or frappe.session.user,
+	)
+
+
+def _is_job_active() -> bool:
+	from frappe.utils.background_jobs import is_job_enqueued
+
+	try:
+		return is_job_enqueued(_JOB_ID)
+	except Exception:
+		return False
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""Scheduled and partitioned reconcile of Item Price stock fields"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import add_to_date, cint, now, now_datetime
+
+from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import (
+	is_ledger_ready,
+	reconcile_open_purchase_ledger,
+)
+from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import delete_orphan_summaries
+from apex_item.item_price_hooks import (
+	get_item_price_row_fields,
+	refresh_item_price_rows,
+	refresh_item_prices_for_items,
+)
+from apex_item.item_price_writer import ItemPriceWriter
+from apex_item.tracing import traceable
+from apex_item.utils import RedisLease, get_conf_int
+
+_WATERMARK_KEY = "apex_item_reconcile_watermark"
+_LEASE_KEY = "apex_item:item_price_reconcile:lease"
+_RUN_KEY = "apex_item_partitioned_reconcile"
+_PARTITION_KEY = "apex_item_partitioned_reconcile:{index}"
+_PARTITION_JOB_ID = "apex_item_reconcile_partition_{run_id}_{index}_{attempt}"
+
+# Defaults, overridable from site config
+_BATCH_SIZE = 500  # apex_item_reconcile_batch_size (Bin rows per batch)
+_LEASE_TTL = 600  # apex_item_reconcile_lease_ttl (seconds, renewed after every batch)
+_INITIAL_LOOKBACK = 15  # minutes scanned on the very first run, when no watermark exists yet
+# apex_item_reconcile_safety_window: seconds a Bin change must age before it is read, so a
+# transaction that stamped modified earlier but commits late is never skipped by the watermark
+_SAFETY_WINDOW = 120
+_PARTITIONS = 4  # apex_item_reconcile_partitions (parallel jobs for a full reconcile)
+_PARTITION_QUEUE = "long"  # apex_item_reconcile_queue
+_PARTITION_RETRIES = 2  # apex_item_reconcile_retries (automatic retries of a failed partition)
+_PARTITION_TIMEOUT = 3 * 3600  # apex_item_reconcile_timeout (seconds per partition job)
+_COUNTERS = ("processed", "written", "skipped", "orphans")
+
+
+def get_watermark() -> Dict[str, Any]:
+	"""Return the persisted (modified, name) position of the last reconciled Bin."""
+	return _load_json(_WATERMARK_KEY)
+
+
+def reconcile_changed_bins() -> int:
+	"""
+	Refresh Item Prices for every Bin changed after the watermark, in bounded batches.
+
+	The watermark is committed together with each batch, so a crash re-processes at
+	most one batch and bursts larger than a batch are never dropped. A lease lock keeps
+	overlapping cron runs from doing the same work. The open-purchase ledger of each
+	batch's items is re-synced first. Changes younger than the safety window are left
+	for the next run. Returns the Bin rows processed.
+	"""
+	lease = RedisLease(_LEASE_KEY, get_conf_int("apex_item_reconcile_lease_ttl", _LEASE_TTL))
+	if not lease.acquire():
+		return 0
+
+	try:
+		batch_size = get_conf_int("apex_item_reconcile_batch_size", _BATCH_SIZE)
+		watermark = get_watermark() or {
+			"modified": str(add_to_date(now_datetime(), minutes=-_INITIAL_LOOKBACK)),
+			"name": "",
+		}
+		window = get_conf_int("apex_item_reconcile_safety_window", _SAFETY_WINDOW, minimum=0)
+		until = str(add_to_date(now_datetime(), seconds=-window))
+		processed = 0
+
+		while True:
+			rows = _get_bins_after(watermark, batch_size, until)
+			if not rows:
+				break
+
+			_sync_ledger(row.item_code for row in rows)
+			refresh_item_prices_for_items(
+				{"item_code": row.item_code, "warehouse": row.warehouse} for row in rows if row.item_code
+			)
+			watermark = {"modified": str(rows[-1].modified), "name": rows[-1].name}
+			_save_watermark(watermark)
+			frappe.db.commit()
+			processed += len(rows)
+
+			if len(rows) < batch_size or not lease.renew():
+				# Caught up, or the lease was lost and another run has taken over
+				break
+
+		return processed
+	finally:
+		lease.release()
+
+
+def start_partitioned_reconcile(partitions: Optional[int] = None) -> Dict[str, Any]:
+	"""
+	Full consistency sweep of all Item Prices, split into up to N contiguous item_code
+	ranges with one job per range, so the sweep scales with the number of workers.
+	"""
+	run = get_partitioned_reconcile_status()
+	if run.get("status") == "running" and any(
+		_is_job_active(state.get("job_id")) for state in run.get("partition_states", [])
+	):
+		return run
+
+	ranges = get_partition_ranges(cint(partitions) or get_conf_int("apex_item_reconcile_partitions", _PARTITIONS))
+	count = len(ranges)
+	run_id = frappe.generate_hash(length=10)
+	frappe.db.set_global(
+		_RUN_KEY,
+		json.dumps({"run_id": run_id, "partitions": count, "started_at": now(), "user": frappe.session.user}),
+	)
+	for index, key_range in enumerate(ranges):
+		_enqueue_partition(index, count, {"run_id": run_id, "attempts": 0, "range": key_range, "last_key": None})
+
+	return get_partitioned_reconcile_status()
+
+
+def get_partition_ranges(count: int) -> List[List[Optional[str]]]:
+	"""
+	Split the item_code key space into at most ``count`` contiguous (lower, upper] ranges
+	holding about the same number of Item Prices. The boundaries are sampled off the
+	item_code index, so each partition later reads only its own index range.
+	"""
+	total = frappe.db.sql("SELECT COUNT(*) FROM `tabItem Price` WHERE item_code > ''")[0][0]
+	boundaries: List[str] = []
+	for index in range(1, max(cint(count), 1)):
+		boundary = frappe.db.sql_list(
+			"""
+			SELECT item_code
+			FROM `tabItem Price`
+			WHERE item_code > ''
+			ORDER BY item_code
+			LIMIT 1 OFFSET %(offset)s
+		""",
+			{"offset": total * index // count},
+		)
+		# An item_code never spans two ranges, so a repeated boundary merges them
+		if boundary and (not boundaries or boundary[0] > boundaries[-1]):
+			boundaries.append(boundary[0])
+
+	edges = [None, *boundaries, None]
+	return [[edges[index], edges[index + 1]] for index in range(len(edges) - 1)]
+
+
+def scheduled_partitioned_reconcile() -> None:
+	"""Scheduled task: nightly full reconcile, disabled with apex_item_nightly_reconcile = 0."""
+	if not cint(frappe.conf.get("apex_item_nightly_reconcile", 1)):
+		return
+	try:
+		start_partitioned_reconcile()
+		frappe.db.commit()
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Partitioned Reconcile")
+
+
+def retry_failed_partitions() -> Dict[str, Any]:
+	"""Re-enqueue only the partitions of the current run that failed, from their checkpoint."""
+	run = get_partitioned_reconcile_status()
+	for index, partition in enumerate(run.get("partition_states", [])):
+		if partition.get("status") == "failed":
+			_enqueue_partition(index, run["partitions"], partition)
+	return get_partitioned_reconcile_status()
+
+
+def get_partitioned_reconcile_status() -> Dict[str, Any]:
+	"""Return the current partitioned run with its per-partition states and aggregated totals."""
+	run = _load_json(_RUN_KEY)
+	if not run:
+		return {}
+
+	states = [_load_json(_PARTITION_KEY.format(index=index)) for index in range(run["partitions"])]
+	statuses = {state.get("status") for state in states}
+	run["partition_states"] = states
+	for counter in _COUNTERS:
+		run[counter] = sum(state.get(counter, 0) for state in states)
+
+	if statuses & {"queued", "running"}:
+		run["status"] = "running"
+	elif "failed" in statuses:
+		run["status"] = "failed"
+	else:
+		run["status"] = "completed"
+	return run
+
+
+@traceable
+def run_reconcile_partition(run_id: str, index: int, partitions: int) -> Dict[str, Any]:
+	"""
+	Background job: refresh the Item Prices in the item_code range of partition
+	``index`` after re-syncing their open-purchase ledger, which recomputes their Item
+	Stock Summary rows too, then delete the partition's summary rows no Item Price
+	reads any more. Progress is checkpointed per commit, so a retry resumes where it
+	stopped.
+	"""
+	state = _load_json(_PARTITION_KEY.format(index=index))
+	if state.get("run_id") != run_id:
+		# Superseded by a newer run
+		return state
+
+	chunk_size = get_conf_int("apex_item_rebuild_chunk_size", 500)
+	commit_size = max(get_conf_int("apex_item_rebuild_commit_size", 2000), chunk_size)
+	state["status"] = "running"
+	state["attempts"] = state.get("attempts", 0) + 1
+	for counter in _COUNTERS:
+		state.setdefault(counter, 0)
+	_save_partition(index, state)
+	frappe.db.commit()
+
+	# Full sweeps touch too many rows to push each change to clients
+	writer = ItemPriceWriter(chunk_size=chunk_size, publish=False)
+	uncommitted = 0
+
+	try:
+		while True:
+			rows = _get_partition_page(state.get("last_key"), chunk_size, state.get("range"))
+			if not rows:
+				break
+
+			_sync_ledger(row.item_code for row in rows)
+			stats = refresh_item_price_rows(rows, writer=writer)
+			state["processed"] += len(rows)
+			state["written"] += stats["written"]
+			state["skipped"] += stats["skipped"]
+			state["last_key"] = [rows[-1].item_code, rows[-1].name]
+			uncommitted += len(rows)
+
+			if uncommitted >= commit_size:
+				_checkpoint_partition(writer, index, state)
+				uncommitted = 0
+
+		_checkpoint_partition(writer, index, state)
+		while True:
+			rows = _get_summary_page(state.get("summary_after"), chunk_size, state.get("range"))
+			if not rows:
+				break
+
+			state["orphans"] += delete_orphan_summaries(row.name for row in rows)
+			state["summary_after"] = [rows[-1].item_code, rows[-1].warehouse]
+			_checkpoint_partition(writer, index, state)
+	except Exception as exc:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), f"Apex Item: Reconcile Partition {index}")
+		# Keep the committed checkpoint; retry this partition alone while attempts remain
+		state = _load_json(_PARTITION_KEY.format(index=index))
+		state["status"] = "failed"
+		state["error"] = str(exc)
+		_save_partition(index, state)
+		frappe.db.commit()
+		if state.get("attempts", 0) <= get_conf_int("apex_item_reconcile_retries", _PARTITION_RETRIES, minimum=0):
+			_enqueue_partition(index, partitions, state)
+			frappe.db.commit()
+		return state
+
+	state["status"] = "completed"
+	state["error"] = None
+	state["finished_at"] = now()
+	_checkpoint_partition(writer, index, state)
+	return state
+
+
+def _sync_ledger(item_codes) -> None:
+	# The ledger hooks miss PO status changes, data patches and swallowed sync errors.
+	# All of them move the item's Bin or are swept here, so compare the ledger first;
+	# only rows that drifted are rewritten.
+	if is_ledger_ready():
+		reconcile_open_purchase_ledger(item_codes)
+
+
+def _enqueue_partition(index: int, partitions: int, state: Dict[str, Any]) -> None:
+	# Each attempt gets its own job id so a retry never collides with the job that failed
+	state["status"] = "queued"
+	state["job_id"] = _PARTITION_JOB_ID.format(
+		run_id=state["run_id"], index=index, attempt=state.get("attempts", 0)
+	)
+	_save_partition(index, state)
+
+	frappe.enqueue(
+		"apex_item.item_price_reconcile.run_reconcile_partition",
+		queue=frappe.conf.get("apex_item_reconcile_queue") or _PARTITION_QUEUE,
+		timeout=get_conf_int("apex_item_reconcile_timeout", _PARTITION_TIMEOUT),
+		job_id=state["job_id"],
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		run_id=state["run_id"],
+		index=index,
+		partitions=partitions,
+	)
+
+
+def _checkpoint_partition(writer: ItemPriceWriter, index: int, state: Dict[str, Any]) -> None:
+	writer.flush()
+	_save_partition(index, state)
+	frappe.db.commit()
+
+
+def _save_partition(index: int, state: Dict[str, Any]) -> None:
+	frappe.db.set_global(_PARTITION_KEY.format(index=index), json.dumps(state, default=str))
+
+
+def _load_json(key: str) -> Dict[str, Any]:
+	raw = frappe.db.get_global(key)
+	if not raw:
+		return {}
+	try:
+		return json.loads(raw)
+	except Exception:
+		return {}
+
+
+def _is_job_active(job_id: Optional[str]) -> bool:
+	from frappe.utils.background_jobs import is_job_enqueued
+
+	if not job_id:
+		return False
+	try:
+		return is_job_enqueued(job_id)
+	except Exception:
+		return False
+
+
+def _get_partition_page(
+	after: Optional[List[str]], limit: int, key_range: Optional[List[Optional[str]]]
+) -> List[Dict[str, Any]]:
+	# Keyset over (item_code, name): the item_code index carries the primary key
+	conditions, params = _get_range_conditions(key_range)
+	params["limit"] = limit
+	if after:
+		conditions.append("item_code >= %(item_code)s AND (item_code > %(item_code)s OR name > %(name)s)")
+		params["item_code"], params["name"] = after
+
+	return frappe.db.sql(
+		"""
+		SELECT {fields}
+		FROM `tabItem Price`
+		WHERE {conditions}
+		ORDER BY item_code ASC, name ASC
+		LIMIT %(limit)s
+	""".format(
+			fields=", ".join(f"`{field}`" for field in get_item_price_row_fields()),
+			conditions=" AND ".join(conditions),
+		),
+		params,
+		as_dict=True,
+	)
+
+
+def _get_summary_page(
+	after: Optional[List[str]], limit: int, key_range: Optional[List[Optional[str]]]
+) -> List[Dict[str, Any]]:
+	# Keyset over the (item_code, warehouse) unique index
+	conditions, params = _get_range_conditions(key_range)
+	params["limit"] = limit
+	if after:
+		conditions.append(
+			"item_code >= %(item_code)s AND (item_code > %(item_code)s OR warehouse > %(warehouse)s)"
+		)
+		params["item_code"], params["warehouse"] = after
+
+	return frappe.db.sql(
+		"""
+		SELECT name, item_code, warehouse
+		FROM `tabItem Stock Summary`
+		WHERE {conditions}
+		ORDER BY item_code ASC, warehouse ASC
+		LIMIT %(limit)s
+	""".format(conditions=" AND ".join(conditions)),
+		params,
+		as_dict=True,
+	)
+
+
+def _get_range_conditions(key_range: Optional[List[Optional[str]]]) -> tuple:
+	lower, upper = key_range or (None, None)
+	conditions = ["item_code > ''"]
+	params: Dict[str, Any] = {}
+	if lower:
+		conditions.append("item_code > %(lower)s")
+		params["lower"] = lower
+	if upper:
+		conditions.append("item_code <= %(upper)s")
+		params["upper"] = upper
+	return conditions, params
+
+
+def _get_bins_after(watermark: Dict[str, Any], limit: int, until: str) -> List[Dict[str, Any]]:
+	# The leading range on modified keeps the modified index usable for the seek
+	return frappe.db.sql(
+		"""
+		SELECT name, item_code, warehouse, modified
+		FROM `tabBin`
+		WHERE modified >= %(modified)s
+			AND (modified > %(modified)s OR name > %(name)s)
+			AND modified < %(until)s
+		ORDER BY modified ASC, name ASC
+		LIMIT %(limit)s
+	""",
+		{
+			"modified": watermark.get("modified"),
+			"name": watermark.get("name") or "",
+			"until": until,
+			"limit": limit,
+		},
+		as_dict=True,
+	)
+
+
+def _save_watermark(watermark: Optional[Dict[str, Any]]) -> None:
+	frappe.db.set_global(_WATERMARK_KEY, json.dumps(watermark, default=str))
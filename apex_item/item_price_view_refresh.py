@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous, single-flight refresh of the Item Prices shown in a list view"""
+
+from __future__ import annotations
+
+from hashlib import md5
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now
+
+from apex_item.item_price_hooks import (
+	_get_item_price_rows_by_names,
+	get_filtered_item_price_names,
+	get_stale_item_price_names,
+	refresh_item_price_rows,
+)
+from apex_item.item_price_writer import ItemPriceWriter
+from apex_item.tracing import traceable
+from apex_item.utils import RedisLease, chunked, get_conf_int
+
+_STATE_KEY = "apex_item:view_refresh:{job_id}"
+_USERS_KEY = "apex_item:view_refresh:{job_id}:users"
+_LOCK_KEY = "apex_item:view_refresh:{job_id}:lock"
+_RESULT_KEY = "apex_item:view_refresh:{job_id}:result"
+_JOB_ID = "apex_item_view_refresh_{job_id}"
+_PROGRESS_EVENT = "apex_item_view_refresh_progress"
+_DONE_EVENT = "apex_item_view_refresh_done"
+_ACTIVE = ("queued", "running")
+
+# Defaults, overridable from site config
+_CHUNK_SIZE = 200  # apex_item_view_refresh_chunk_size (rows per commit / progress event)
+_RESULT_TTL = 30  # apex_item_view_refresh_reuse_ttl (seconds a finished refresh is reused)
+_STATE_TTL = 3600  # seconds the job state stays readable for polling
+_JOB_TIMEOUT = 1800  # also bounds the flight lock if a worker dies mid-job
+_QUEUED_LEASE_TTL = 120  # apex_item_view_refresh_queued_lease (flight lock until the job starts)
+_MAX_LIMIT = 5000  # upper bound for the row limit a client may ask for
+
+
+@frappe.whitelist()
+def start_filter_refresh(filters: Any = None, limit: int = 1000) -> Dict[str, Any]:
+	"""
+	Enqueue a refresh of the Item Prices matching list view ``filters`` and return its
+	job handle right away. Progress and completion arrive as realtime events; the state
+	can also be polled with get_filter_refresh_status.
+
+	Identical requests share one flight: the handle is derived from (site, filters,
+	limit), so a request arriving while the refresh runs joins it, and one arriving
+	shortly after it finished reuses its result instead of refreshing again.
+	"""
+	frappe.has_permission("Item Price", "read", throw=True)
+
+	filters = _normalize_filters(filters)
+	limit = min(max(cint(limit), 1), _MAX_LIMIT)
+	job_id = get_flight_key(filters, limit)
+
+	result = _load(_RESULT_KEY, job_id)
+	if result:
+		_add_user(job_id)
+		return dict(result, reused=True)
+
+	# Short lease while queued: a rolled back request or a lost enqueue frees the flight
+	# quickly, and the job extends the lease once it starts
+	lock = RedisLease(
+		_LOCK_KEY.format(job_id=job_id), get_conf_int("apex_item_view_refresh_queued_lease", _QUEUED_LEASE_TTL)
+	)
+	if not lock.acquire():
+		# Another request owns this flight; follow its events instead of starting a new one
+		_add_user(job_id)
+		state = _load(_STATE_KEY, job_id)
+		if state.get("status") not in _ACTIVE:
+			state = {"job_id": job_id, "status": "queued"}
+		return dict(state, joined=True)
+
+	frappe.cache().execute_command("DEL", frappe.cache().make_key(_USERS_KEY.format(job_id=job_id)))
+	_add_user(job_id)
+	_save(
+		{
+			"job_id": job_id,
+			"status": "queued",
+			"user": frappe.session.user,
+			"progress": 0,
+			"total": 0,
+			"queued_at": now(),
+		}
+	)
+
+	try:
+		frappe.enqueue(
+			"apex_item.item_price_view_refresh.run_filter_refresh",
+			queue="default",
+			timeout=_JOB_TIMEOUT,
+			job_id=_JOB_ID.format(job_id=job_id),
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+			job_handle=job_id,
+			filters=filters,
+			limit=limit,
+			lock_token=lock.token,
+		)
+	except Exception:
+		lock.release()
+		raise
+	return get_filter_refresh_status(job_id)
+
+
+@frappe.whitelist()
+def get_filter_refresh_status(job_id: str) -> Dict[str, Any]:
+	"""Return the state of a view refresh started or joined by the current user."""
+	state = _load(_STATE_KEY, job_id)
+	if state and frappe.session.user not in _get_users(job_id) and "System Manager" not in frappe.get_roles():
+		frappe.throw(_("Not permitted"), frappe.PermissionError)
+	return state or {"job_id": job_id, "status": "unknown"}
+
+
+def get_flight_key(filters: List[list], limit: int) -> str:
+	"""Stable handle for a refresh of ``filters`` / ``limit`` on the current site."""
+	payload = frappe.as_json([frappe.local.site, filters, cint(limit)], indent=None)
+	return md5(payload.encode("utf-8")).hexdigest()
+
+
+@traceable
+def run_filter_refresh(
+	job_handle: str, filters: Any = None, limit: int = 1000, lock_token: Optional[str] = None
+) -> Dict[str, Any]:
+	"""
+	Background job: refresh the stale rows of the view in chunks, committing and
+	publishing progress after each chunk, then publish the final counters and hand
+	the flight lock back.
+	"""
+	lock = RedisLease(_LOCK_KEY.format(job_id=job_handle), _JOB_TIMEOUT + 60, token=lock_token)
+	if not lock.renew() and not lock.acquire():
+		# The queued lease expired and a newer request owns the flight; its job does the work
+		return _load(_STATE_KEY, job_handle) or {"job_id": job_handle, "status": "queued"}
+
+	state = _load(_STATE_KEY, job_handle) or {"job_id": job_handle, "user": frappe.session.user}
+	state["status"] = "running"
+	state.setdefault("progress", 0)
+
+	try:
+		names = get_filtered_item_price_names(filters, limit)
+		stale = get_stale_item_price_names(names)
+		stats = {"total": 0, "written": 0, "skipped": 0, "fresh": len(names) - len(stale)}
+		state["total"] = len(stale)
+		_save(state)
+		_publish(_PROGRESS_EVENT, state)
+
+		chunk_size = get_conf_int("apex_item_view_refresh_chunk_size", _CHUNK_SIZE)
+		for chunk in chunked(stale, chunk_size):
+			with ItemPriceWriter() as writer:
+				chunk_stats = refresh_item_price_rows(
+					_get_item_price_rows_by_names(chunk), writer=writer, stamp_unchanged=True
+				)
+			frappe.db.commit()
+			lock.renew()
+
+			for counter in ("total", "written", "skipped"):
+				stats[counter] += chunk_stats[counter]
+			state["progress"] += len(chunk)
+			_save(state)
+			_publish(_PROGRESS_EVENT, state)
+	except Exception as exc:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), "Apex Item: View Refresh")
+		# No result record: the next identical request starts a fresh attempt
+		state.update({"status": "failed", "error": str(exc), "finished_at": now()})
+		_save(state)
+		lock.release()
+		_publish(_DONE_EVENT, state)
+		return state
+
+	state.update({"status": "completed", "stats": stats, "finished_at": now()})
+	_save(state)
+	frappe.cache().set_value(
+		_RESULT_KEY.format(job_id=job_handle),
+		state,
+		expires_in_sec=get_conf_int("apex_item_view_refresh_reuse_ttl", _RESULT_TTL),
+	)
+	lock.release()
+	_publish(_DONE_EVENT, state)
+	return state
+
+
+def _normalize_filters(filters: Any) -> List[list]:
+	# Equivalent filter sets from different clients must hash to the same flight
+	try:
+		filters = frappe.parse_json(filters) if isinstance(filters, str) else filters
+	except Exception:
+		filters = None
+	if not filters:
+		return []
+	if isinstance(filters, dict):
+		filters = [
+			[key, *value] if isinstance(value, (list, tuple)) else [key, "=", value]
+			for key, value in filters.items()
+		]
+	conditions = [list(condition) for condition in filters]
+	return sorted(conditions, key=lambda condition: frappe.as_json(condition, indent=None))
+
+
+def _publish(event: str, state: Dict[str, Any]) -> None:
+	for user in _get_users(state["job_id"]) or [state.get("user")]:
+		frappe.publish_realtime(event, state, user=user)
+
+
+def _add_user(job_id: str) -> None:
+	cache = frappe.cache()
+	key = cache.make_key(_USERS_KEY.format(job_id=job_id))
+	pipe = cache.pipeline()
+	pipe.sadd(key, frappe.session.user)
+	pipe.expire(key, _STATE_TTL)
+	pipe.execute()
+
+
+def _get_users(job_id: str) -> List[str]:
+	cache = frappe.cache()
+	members = cache.execute_command("SMEMBERS", cache.make_key(_USERS_KEY.format(job_id=job_id))) or []
+	return [member.decode("utf-8") if isinstance(member, bytes) else member for member in members]
+
+
+def _save(state: Dict[str, Any]) -> None:
+	frappe.cache().set_value(_STATE_KEY.format(job_id=state["job_id"]), state, expires_in_sec=_STATE_TTL)
+
+
+def _load(key: str, job_id: Optional[str]) -> Dict[str, Any]:
+	if not job_id:
+		return {}
+	return frappe.cache().get_value(key.format(job_id=job_id)) or {}
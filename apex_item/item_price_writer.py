@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Batched writer for Item Price stock columns"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import cint
+
+from apex_item.tracing import span
+from apex_item.utils import get_conf_int
+
+# Rows per UPDATE statement; override with apex_item_write_chunk_size
+_WRITE_CHUNK_SIZE = 500
+
+# Only these columns may be written, which also keeps the generated SQL safe
+_WRITABLE_COLUMNS = (
+	"available_qty",
+	"reserved_qty",
+	"actual_qty",
+	"waiting_qty",
+	"item_group",
+	"item_image",
+	"stock_warehouse",
+	"stock_synced_at",
+)
+
+# Realtime diffs pushed to open list views and forms after each flush
+STOCK_CHANGE_EVENT = "apex_item_item_price_stock"
+_PUBLISHED_COLUMNS = ("available_qty", "reserved_qty", "actual_qty", "waiting_qty", "stock_warehouse")
+_PUBLISH_CHUNK_SIZE = 200
+
+
+class ItemPriceWriter:
+	"""
+	Collect (name -> payload) updates for Item Price and flush them in chunks.
+
+	Each flush issues one multi-row ``UPDATE ... SET col = CASE name WHEN .. THEN .. END``
+	per chunk instead of one ``frappe.db.set_value`` per row. ``modified`` is never
+	touched, matching ``update_modified=False``. Use as a context manager or call
+	flush() before committing. With ``publish`` the written stock fields are pushed
+	to open clients once the transaction commits.
+	"""
+
+	def __init__(self, chunk_size: Optional[int] = None, publish: bool = True):
+		self.chunk_size = chunk_size or get_conf_int("apex_item_write_chunk_size", _WRITE_CHUNK_SIZE)
+		self.publish = publish
+		self.written = 0
+		self._pending: Dict[str, Dict[str, Any]] = {}
+		self._columns: Optional[set[str]] = None
+
+	def __enter__(self) -> "ItemPriceWriter":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		if exc_type is None:
+			self.flush()
+
+	def __len__(self) -> int:
+		return len(self._pending)
+
+	def add(self, name: str, payload: Dict[str, Any]) -> None:
+		"""Queue ``payload`` for row ``name``; later payloads for the same row are merged."""
+		if not name or not payload:
+			return
+
+		self._pending.setdefault(name, {}).update(payload)
+		if len(self._pending) >= self.chunk_size:
+			self.flush()
+
+	def flush(self) -> int:
+		"""Write all queued rows. Returns the number of rows sent to the database."""
+		if not self._pending:
+			return 0
+
+		pending, self._pending = self._pending, {}
+		names = list(pending)
+		flushed = 0
+
+		with span("item_price.write", pending=len(names)):
+			for start in range(0, len(names), self.chunk_size):
+				chunk = {name: pending[name] for name in names[start : start + self.chunk_size]}
+				self._write_chunk(chunk)
+				flushed += len(chunk)
+
+		value_cache = getattr(frappe.db, "value_cache", None)
+		if isinstance(value_cache, dict):
+			value_cache.pop("Item Price", None)
+
+		self.written += flushed
+		if self.publish:
+			publish_stock_changes(pending)
+		return flushed
+
+	def _write_chunk(self, chunk: Dict[str, Dict[str, Any]]) -> None:
+		available = self._get_columns()
+		assignments: List[str] = []
+		params: List[Any] = []
+
+		for column in _WRITABLE_COLUMNS:
+			if column not in available:
+				continue
+
+			cases = [(name, payload[column]) for name, payload in chunk.items() if column in payload]
+			if not cases:
+				continue
+
+			whens = []
+			for name, value in cases:
+				whens.append("WHEN %s THEN %s")
+				params.extend((name, value))
+			assignments.append(f"`{column}` = CASE `name` {' '.join(whens)} ELSE `{column}` END")
+
+		if not assignments:
+			return
+
+		params.extend(chunk)
+		frappe.db.sql(
+			"""
+			UPDATE `tabItem Price`
+			SET {assignments}
+			WHERE `name` IN ({placeholders})
+		""".format(
+				assignments=", ".join(assignments),
+				placeholders=", ".join(["%s"] * len(chunk)),
+			),
+			tuple(params),
+		)
+
+	def _get_columns(self) -> set[str]:
+		if self._columns is None:
+			self._columns = set(frappe.db.get_table_columns("Item Price"))
+		return self._columns
+
+
+def publish_stock_changes(changes: Dict[str, Dict[str, Any]]) -> None:
+	"""
+	Push compact {name: changed stock fields} diffs to the site room after commit, in
+	batches. Disable with apex_item_realtime_stock_diffs = 0.
+	"""
+	if not changes or not cint(frappe.conf.get("apex_item_realtime_stock_diffs", 1)):
+		return
+
+	rows = {}
+	for name, payload in changes.items():
+		diff = {column: payload[column] for column in _PUBLISHED_COLUMNS if column in payload}
+		if diff:
+			rows[name] = diff
+
+	try:
+		names = list(rows)
+		for start in range(0, len(names), _PUBLISH_CHUNK_SIZE):
+			frappe.publish_realtime(
+				STOCK_CHANGE_EVENT,
+				{"rows": {name: rows[name] for name in names[start : start + _PUBLISH_CHUNK_SIZE]}},
+				after_commit=True,
+			)
+	except Exception:
+		# Clients catch up on their next load; never fail a write over a push
+		frappe.log_error(frappe.get_traceback(), "Apex Item: Publish Stock Changes")
@@ -1,3 +1,27 @@
+const ITEM_PRICE_STOCK_FIELDS = ["stock_warehouse", "actual_qty", "reserved_qty", "available_qty", "waiting_qty"];
+
+// Realtime stock diffs from the server: patch the open form without a reload
+if (frappe.realtime && typeof frappe.realtime.on === "function") {
+	frappe.realtime.on("apex_item_item_price_stock", (data) => {
+		const frm = window.cur_frm;
+		if (!data || !data.rows || !frm || frm.doctype !== "Item Price" || frm.is_new()) {
+			return;
+		}
+
+		const changes = data.rows[frm.doc.name];
+		if (!changes) {
+			return;
+		}
+
+		// Read-only stock fields: update the doc directly so the form does not turn dirty
+		const fields = ITEM_PRICE_STOCK_FIELDS.filter((fieldname) => fieldname in changes);
+		fields.forEach((fieldname) => {
+			frm.doc[fieldname] = changes[fieldname];
+		});
+		frm.refresh_fields(fields);
+	});
+}
+
 frappe.ui.form.on("Item Price", {
 	refresh(frm) {
 		// Debug footprint to confirm script load
@@ -7,6 +31,21 @@ frappe.ui.form.on("Item Price", {
 			return;
 		}
 
+		// With summary reads the stored stock columns are not maintained; show the joined figures
+		if (frappe.boot && frappe.boot.apex_item_stock_summary_reads) {
+			frappe
+				.call({ method: "apex_item.api.get_item_price_stock", args: { names: [frm.doc.name] }, freeze: false })
+				.then((r) => {
+					const row = (r.message || [])[0];
+					if (!row || row.name !== frm.doc.name) return;
+					const fields = ITEM_PRICE_STOCK_FIELDS.filter((fieldname) => fieldname in row);
+					fields.forEach((fieldname) => {
+						frm.doc[fieldname] = row[fieldname];
+					});
+					frm.refresh_fields(fields);
+				});
+		}
+
 		const handler = async () => {
 			if (!frm.doc.name) return;
 			frm.disable_save();
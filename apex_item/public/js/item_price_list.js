@@ -38,9 +38,14 @@ const formatNumber = (value, precision = 2) => {
 
 let itemPriceCardConfigPromise = null;
 
+const ITEM_PRICE_SUMMARY_FIELDS = ["actual_qty", "reserved_qty", "available_qty", "waiting_qty"];
+const isSummaryStockReads = () => Boolean(frappe.boot && cintValue(frappe.boot.apex_item_stock_summary_reads));
+
 frappe.listview_settings["Item Price"] = {
 	hide_name_column: true,
 
+	// Mobile cards read apex_item.api.get_item_price_feed; these also feed the cards rendered from
+	// the list's own rows when the feed is unavailable
 	add_fields: [
 		"item_name",
 		"item_code",
@@ -84,19 +89,14 @@ frappe.listview_settings["Item Price"] = {
 					console.warn("Failed to read filters from listview", e);
 				}
 
-				frappe.dom.freeze(__("Refreshing all items in current view..."));
+				// Runs as a background job; progress is shown without freezing the page
 				try {
-					await frappe.call({
-						method: "apex_item.item_price_hooks.refresh_item_prices_by_filters",
-						args: { filters },
-					});
+					await startViewRefresh(filters, { showProgress: true });
 					frappe.show_alert({ message: __("Refreshed current view"), indicator: "green" });
 					listview.refresh();
 				} catch (e) {
 					console.error(e);
 					frappe.msgprint({ message: __("Failed to refresh current view."), indicator: "red" });
-				} finally {
-					frappe.dom.unfreeze();
 				}
 			};
 
@@ -108,6 +108,25 @@ frappe.listview_settings["Item Price"] = {
 				listview.page.add_menu_item(__("Refresh Stock (Current View)"), refreshAllInView);
 			}
 
+			// Full rebuild of every Item Price; progress arrives as apex_item_rebuild_progress
+			if (frappe.user.has_role("System Manager")) {
+				listview.page.add_menu_item(__("Update Stock for All Item Prices"), () => {
+					frappe.confirm(__("Recalculate stock fields for all Item Prices in the background?"), () => {
+						frappe
+							.call({ method: "apex_item.api.update_all_item_price_qty", args: { resume: 1 } })
+							.then((response) => {
+								const message = response.message || {};
+								frappe.show_alert({ message: message.message || __("Rebuild queued"), indicator: "blue" });
+							});
+					});
+				});
+				listview.page.add_menu_item(__("Cancel Stock Rebuild"), () => {
+					frappe.call({ method: "apex_item.api.cancel_item_price_rebuild" }).then(() => {
+						frappe.show_alert({ message: __("Rebuild will stop after the current chunk"), indicator: "orange" });
+					});
+				});
+			}
+
 			// Auto-refresh on first open/route change with throttling (60s per route+filter)
 			let autoSyncInProgress = false;
 			const readCurrentFilters = () => {
@@ -136,10 +155,7 @@ frappe.listview_settings["Item Price"] = {
 
 					// Run in background without freezing UI; show a subtle alert when done
 					autoSyncInProgress = true;
-					frappe.call({
-						method: "apex_item.item_price_hooks.refresh_item_prices_by_filters",
-						args: { filters },
-					}).then(() => {
+					startViewRefresh(filters).then(() => {
 						sessionStorage.setItem(key, String(Date.now()));
 						// soft refresh: re-fetch data
 						const original = listview.render.bind(listview);
@@ -175,11 +191,7 @@ frappe.listview_settings["Item Price"] = {
 						return originalRefresh(...args);
 					}
 					autoSyncInProgress = true;
-					return frappe
-						.call({
-							method: "apex_item.item_price_hooks.refresh_item_prices_by_filters",
-							args: { filters },
-						})
+					return startViewRefresh(filters)
 						.then(() => {
 							sessionStorage.setItem(key, String(Date.now()));
 						})
@@ -196,6 +208,127 @@ frappe.listview_settings["Item Price"] = {
 	},
 };
 
+// Background view refreshes: resolve once the job's done event arrives (or polling sees it finish)
+const viewRefreshWaiters = {};
+
+function startViewRefresh(filters, { showProgress = false } = {}) {
+	return frappe
+		.call({
+			method: "apex_item.item_price_view_refresh.start_filter_refresh",
+			args: { filters },
+			freeze: false,
+		})
+		.then((response) => {
+			const state = response.message || {};
+			if (isViewRefreshFinished(state)) {
+				return finishViewRefresh(state);
+			}
+			// Identical refreshes share one server job, so several callers may wait on it
+			return new Promise((resolve, reject) => {
+				const waiters = viewRefreshWaiters[state.job_id];
+				viewRefreshWaiters[state.job_id] = [...(waiters || []), { resolve, reject, showProgress }];
+				if (!waiters) {
+					pollViewRefresh(state.job_id);
+				}
+			});
+		});
+}
+
+function isViewRefreshFinished(state) {
+	return ["completed", "failed", "unknown"].includes(state.status);
+}
+
+function finishViewRefresh(state) {
+	if (state.status === "failed") {
+		throw new Error(state.error || "View refresh failed");
+	}
+	return state.stats || {};
+}
+
+function settleViewRefresh(state) {
+	const waiters = viewRefreshWaiters[state.job_id];
+	if (!waiters) {
+		return;
+	}
+	delete viewRefreshWaiters[state.job_id];
+	if (waiters.some((waiter) => waiter.showProgress)) {
+		frappe.hide_progress();
+	}
+	waiters.forEach((waiter) => {
+		try {
+			waiter.resolve(finishViewRefresh(state));
+		} catch (e) {
+			waiter.reject(e);
+		}
+	});
+}
+
+function pollViewRefresh(jobId, delay = 3000) {
+	// Fallback for when realtime is unavailable; stops as soon as the job is settled
+	setTimeout(() => {
+		if (!viewRefreshWaiters[jobId]) {
+			return;
+		}
+		frappe
+			.call({
+				method: "apex_item.item_price_view_refresh.get_filter_refresh_status",
+				args: { job_id: jobId },
+				freeze: false,
+			})
+			.then((response) => {
+				const state = response.message || {};
+				if (isViewRefreshFinished(state)) {
+					settleViewRefresh(state);
+				} else {
+					pollViewRefresh(jobId, Math.min(delay * 2, 15000));
+				}
+			})
+			.catch(() => pollViewRefresh(jobId, Math.min(delay * 2, 15000)));
+	}, delay);
+}
+
+if (frappe.realtime && typeof frappe.realtime.on === "function") {
+	frappe.realtime.on("apex_item_view_refresh_progress", (state) => {
+		const waiters = (state && viewRefreshWaiters[state.job_id]) || [];
+		if (waiters.some((waiter) => waiter.showProgress) && state.total) {
+			frappe.show_progress(__("Refreshing stock"), state.progress, state.total, __("Refreshing current view"));
+		}
+	});
+	frappe.realtime.on("apex_item_view_refresh_done", (state) => {
+		if (state && state.job_id) {
+			settleViewRefresh(state);
+		}
+	});
+	frappe.realtime.on("apex_item_rebuild_progress", onRebuildProgress);
+}
+
+function onRebuildProgress(state) {
+	if (!state) {
+		return;
+	}
+	if (["queued", "running"].includes(state.status)) {
+		if (state.total) {
+			frappe.show_progress(__("Updating Item Price stock"), state.progress, state.total, __("Rebuilding stock fields"));
+		}
+		return;
+	}
+
+	frappe.hide_progress();
+	const indicators = { completed: "green", cancelled: "orange", failed: "red" };
+	frappe.show_alert({
+		message: __("Item Price stock rebuild {0}: {1} of {2} rows updated", [
+			__(state.status),
+			state.written || 0,
+			state.total || 0,
+		]),
+		indicator: indicators[state.status] || "blue",
+	});
+	const listview = window.cur_list && window.cur_list.doctype === "Item Price" ? window.cur_list : null;
+	if (listview && state.status === "completed") {
+		listview.refresh();
+	}
+}
+
 function getFieldDefinitions() {
 	return {
 		price_list_rate: { label: __("Price"), css_class: "price", hide_if_zero: 0, icon: "💰" },
@@ -233,15 +366,56 @@ function getDefaultCardConfig() {
 	};
 }
 
+function getCardConfigStorageKey() {
+	const boot = frappe.boot || {};
+	return `apex_item:item_price_card_config:${boot.sitename || window.location.host}:${boot.lang || "en"}`;
+}
+
+function readStoredCardConfig() {
+	try {
+		const stored = JSON.parse(window.localStorage.getItem(getCardConfigStorageKey()) || "null");
+		return stored && stored.version && stored.config ? stored : null;
+	} catch (e) {
+		return null;
+	}
+}
+
+function storeCardConfig(config) {
+	if (!config || !config.version) {
+		return;
+	}
+	try {
+		window.localStorage.setItem(
+			getCardConfigStorageKey(),
+			JSON.stringify({ version: config.version, config })
+		);
+	} catch (e) {
+		// Storage full or disabled; the config is simply fetched again next time
+	}
+}
+
 function fetchItemPriceCardConfig() {
 	if (!itemPriceCardConfigPromise) {
+		// Revalidate the locally stored config: the server answers "not modified" while its version matches
+		const stored = readStoredCardConfig();
 		itemPriceCardConfigPromise = frappe
 			.call({
 				method: "apex_item.api.get_item_price_card_config",
+				args: { version: stored ? stored.version : null },
 				freeze: false,
 			})
-			.then((response) => normalizeCardConfig(response.message))
-			.catch(() => normalizeCardConfig());
+			.then((response) => {
+				const message = response.message || {};
+				if (message.not_modified && stored) {
+					return normalizeCardConfig(stored.config);
+				}
+				storeCardConfig(message);
+				if (frappe.boot && message.version) {
+					frappe.boot.apex_item_card_config = message;
+				}
+				return normalizeCardConfig(message);
+			})
+			.catch(() => normalizeCardConfig(stored ? stored.config : null));
 	}
 
 	return itemPriceCardConfigPromise;
@@ -271,6 +445,7 @@ function normalizeCardConfig(rawConfig) {
 		show_item_image: cintValue(config.show_item_image) || base.show_item_image,
 		empty_state_text: config.empty_state_text || base.empty_state_text,
 		fields: normalizedFields.length ? normalizedFields : base.fields,
+		version: config.version || null,
 	};
 }
 
@@ -297,11 +472,52 @@ function normalizeField(field, definitions) {
 }
 
 function setupItemPriceView(listview) {
+	// Render on first paint from the boot payload; the config is fetched again only when its version moves on
+	const bootConfig = frappe.boot && frappe.boot.apex_item_card_config;
+	if (bootConfig && bootConfig.version) {
+		storeCardConfig(bootConfig);
+		initializeItemPriceView(listview, normalizeCardConfig(bootConfig));
+		return;
+	}
+
 	fetchItemPriceCardConfig().then((config) => initializeItemPriceView(listview, config));
 }
 
+function onCardConfigVersionChanged(data) {
+	const current = frappe.boot && frappe.boot.apex_item_card_config;
+	if (!data || !data.version || (current && current.version === data.version)) {
+		return;
+	}
+
+	itemPriceCardConfigPromise = null;
+	fetchItemPriceCardConfig().then((config) => {
+		const listview = window.cur_list;
+		if (listview && listview.doctype === "Item Price" && listview._apex_ip_card_config) {
+			Object.assign(listview._apex_ip_card_config, config);
+			listview.render();
+		}
+	});
+}
+
+function onItemPriceStockChanged(data) {
+	const listview = window.cur_list;
+	if (!data || !data.rows || !listview || listview.doctype !== "Item Price") {
+		return;
+	}
+	if (typeof listview._apex_ip_apply_stock_changes === "function") {
+		listview._apex_ip_apply_stock_changes(data.rows);
+	}
+}
+
+if (frappe.realtime && typeof frappe.realtime.on === "function") {
+	frappe.realtime.on("apex_item_card_config_version", onCardConfigVersionChanged);
+	frappe.realtime.on("apex_item_item_price_stock", onItemPriceStockChanged);
+}
+
 function initializeItemPriceView(listview, config) {
 	const isMobile = () => window.innerWidth <= 768;
+	// Kept on the listview so a newer config version can be swapped in place
+	listview._apex_ip_card_config = config;
 	let $cardsContainer = null;
 	const debounce = (fn, wait = 300) => {
 		let t = null;
@@ -333,6 +549,99 @@ function initializeItemPriceView(listview, config) {
 		return $cardsContainer;
 	};
 
+	// Cards read from the keyset feed endpoint, one page at a time, as the user scrolls
+	const feed = { cursor: null, done: false, loading: false, fallback: false, token: 0, observer: null, rows: {} };
+
+	const appendCards = (container, rows) => {
+		rows.forEach((item) => {
+			feed.rows[item.name] = item;
+			const cardHtml = createItemPriceCard(item, config);
+			if (cardHtml) {
+				container.append(cardHtml);
+			}
+		});
+	};
+
+	const observeSentinel = (container) => {
+		container.find(".item-price-feed-sentinel").remove();
+		if (feed.done || typeof window.IntersectionObserver !== "function") {
+			return;
+		}
+
+		const $sentinel = $('<div class="item-price-feed-sentinel"></div>').appendTo(container);
+		if (!feed.observer) {
+			feed.observer = new IntersectionObserver((entries) => {
+				if (entries.some((entry) => entry.isIntersecting)) {
+					loadFeedPage();
+				}
+			});
+		}
+		feed.observer.disconnect();
+		feed.observer.observe($sentinel[0]);
+	};
+
+	const loadFeedPage = () => {
+		if (feed.loading || feed.done) {
+			return;
+		}
+
+		const token = feed.token;
+		const container = ensureCardsContainer();
+		feed.loading = true;
+		frappe
+			.call({
+				method: "apex_item.api.get_item_price_feed",
+				args: {
+					filters: readListFilters(listview),
+					cursor: feed.cursor,
+					sort_by: listview.sort_by,
+					sort_order: listview.sort_order,
+				},
+				freeze: false,
+			})
+			.then((response) => {
+				if (token !== feed.token) {
+					return; // a newer render reset the feed
+				}
+
+				const page = response.message || {};
+				const rows = page.rows || [];
+				if (!feed.cursor && !rows.length) {
+					const emptyText = frappe.utils.escape_html(
+						config.empty_state_text || __("لا توجد أصناف مطابقة")
+					);
+					container.html(`<div class="item-price-empty">${emptyText}</div>`);
+				} else {
+					appendCards(container, rows);
+				}
+
+				feed.cursor = page.next_cursor || null;
+				feed.done = !page.next_cursor;
+				observeSentinel(container);
+
+				if (page.version && config.version && page.version !== config.version) {
+					onCardConfigVersionChanged({ version: page.version });
+				}
+			})
+			.catch(() => {
+				// Feed unavailable: run the list's own query once and render its rows instead
+				if (token === feed.token && !feed.cursor) {
+					feed.fallback = true;
+					Promise.resolve(baseRefresh()).finally(() => {
+						if (token === feed.token && feed.fallback) {
+							feed.fallback = false;
+							appendCards(ensureCardsContainer(), listview.data || []);
+						}
+					});
+				}
+			})
+			.finally(() => {
+				if (token === feed.token) {
+					feed.loading = false;
+				}
+			});
+	};
+
 	const renderCards = () => {
 		if (!isMobile()) {
 			return;
@@ -341,29 +650,63 @@ function initializeItemPriceView(listview, config) {
 		const container = ensureCardsContainer();
 		container.empty();
 
-		const data = listview.data || [];
-		if (!data.length) {
-			const emptyText = frappe.utils.escape_html(
-				config.empty_state_text || __("لا توجد أصناف مطابقة")
-			);
-			container.html(
-				`<div class="item-price-empty">${emptyText}</div>`
-			);
-			return;
+		feed.token += 1;
+		feed.rows = {};
+		feed.cursor = null;
+		feed.done = false;
+		feed.loading = false;
+		loadFeedPage();
+	};
+
+	const originalRender = listview.render.bind(listview);
+
+	// On mobile the cards page through the feed, so the list's own query is skipped
+	const baseRefresh = listview.refresh.bind(listview);
+	listview.refresh = function (...args) {
+		if (!isMobile()) {
+			return baseRefresh(...args);
 		}
+		listview.render();
+		return Promise.resolve();
+	};
 
-		data.forEach((item) => {
-			const cardHtml = createItemPriceCard(item, config);
-			if (cardHtml) {
-				container.append(cardHtml);
-			}
+	// With summary reads the Item Price stock columns are not maintained; overlay the joined figures
+	const overlaySummaryStock = () => {
+		const rows = (listview.data || []).filter((row) => !row._apex_ip_summary);
+		if (!isSummaryStockReads() || !rows.length) {
+			return;
+		}
+		rows.forEach((row) => {
+			row._apex_ip_summary = 1;
 		});
+
+		frappe
+			.call({
+				method: "apex_item.api.get_item_price_stock",
+				args: { names: rows.map((row) => row.name) },
+				freeze: false,
+			})
+			.then((response) => {
+				const stock = {};
+				(response.message || []).forEach((row) => {
+					stock[row.name] = row;
+				});
+				rows.forEach((row) => {
+					ITEM_PRICE_SUMMARY_FIELDS.forEach((fieldname) => {
+						if (stock[row.name] && fieldname in stock[row.name]) {
+							row[fieldname] = stock[row.name][fieldname];
+						}
+					});
+				});
+				originalRender();
+			});
 	};
 
-	const originalRender = listview.render.bind(listview);
 	listview.render = function () {
 		originalRender();
-		if (isMobile()) {
+		if (!isMobile()) {
+			overlaySummaryStock();
+		} else if (!feed.fallback) {
 			setTimeout(renderCards, 60);
 		}
 		// Auto-sync after render (debounced) so it works on normal refresh and first load
@@ -389,10 +732,7 @@ function initializeItemPriceView(listview, config) {
 					const now = Date.now();
 					if (now - last < 60000) return; // throttle 60s
 
-					frappe.call({
-						method: "apex_item.item_price_hooks.refresh_item_prices_by_filters",
-						args: { filters },
-					}).then(() => {
+					startViewRefresh(filters).then(() => {
 						sessionStorage.setItem(key, String(Date.now()));
 						// re-render quietly
 						originalRender();
@@ -403,6 +743,35 @@ function initializeItemPriceView(listview, config) {
 		listview._apex_ip_auto_sync();
 	};
 
+	// Realtime stock diffs: patch loaded rows and their cards in place instead of reloading
+	listview._apex_ip_apply_stock_changes = (changes) => {
+		let listChanged = false;
+		(listview.data || []).forEach((row) => {
+			if (changes[row.name]) {
+				Object.assign(row, changes[row.name]);
+				listChanged = true;
+			}
+		});
+
+		if (isMobile() && $cardsContainer) {
+			Object.keys(changes).forEach((name) => {
+				const row = feed.rows[name];
+				if (!row) {
+					return;
+				}
+				Object.assign(row, changes[name]);
+				const $card = createItemPriceCard(row, config);
+				const $existing = $cardsContainer.find(`.item-price-card[data-name="${CSS.escape(name)}"]`);
+				if ($card && $existing.length) {
+					$existing.replaceWith($card);
+				}
+			});
+		} else if (listChanged) {
+			// Re-render from the rows in memory; nothing is fetched again
+			originalRender();
+		}
+	};
+
 	let resizeTimer = null;
 	$(window).on("resize.item-price-view", () => {
 		clearTimeout(resizeTimer);
@@ -417,6 +786,9 @@ function initializeItemPriceView(listview, config) {
 
 	const teardown = () => {
 		$(window).off("resize.item-price-view");
+		if (feed.observer) {
+			feed.observer.disconnect();
+		}
 	};
 
 	if (listview.page) {
@@ -436,6 +808,20 @@ function initializeItemPriceView(listview, config) {
 	setTimeout(renderCards, 80);
 }
 
+function readListFilters(listview) {
+	try {
+		if (listview.filter_area && typeof listview.filter_area.get === "function") {
+			return listview.filter_area.get() || [];
+		}
+		if (typeof listview.get_filters_for_args === "function") {
+			return listview.get_filters_for_args() || [];
+		}
+	} catch (e) {
+		console.warn("Failed to read filters from listview", e);
+	}
+	return [];
+}
+
 function createItemPriceCard(data, config) {
 	const itemName = frappe.utils.escape_html(data.item_name || __("Unnamed Item"));
 	const itemCode = data.item_code ? frappe.utils.escape_html(data.item_code) : "";
@@ -470,6 +856,7 @@ function createItemPriceCard(data, config) {
 	);
 
 	if (data.name) {
+		$card.attr("data-name", data.name);
 		$card.addClass("card-clickable");
 		$card.on("click", () => {
 			frappe.set_route("Form", "Item Price", data.name);
@@ -6,10 +6,15 @@
 
 from __future__ import annotations
 
+import pickle
+import threading
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
 from apex_item import api
+from apex_item.utils import RedisLease
 
 
 class TestApexItemAPI(FrappeTestCase):
@@ -95,6 +100,126 @@ class TestApexItemAPI(FrappeTestCase):
 		config = api.get_item_price_card_config()
 		self.assertIsNotNone(config)
 
+	def test_card_config_version_bump_invalidates_cache(self):
+		"""Test that clearing the cache bumps the version and warm calls run no SQL"""
+		version = api.get_card_config_version()
+		api.get_item_price_card_config()
+
+		with patch.object(frappe.db, "sql", side_effect=AssertionError("warm call hit the database")):
+			api.get_item_price_card_config()
+
+		api.clear_item_price_card_config_cache()
+		self.assertGreater(api.get_card_config_version(), version)
+		self.assertIsNone(api._get_cached_item_price_card_config(api.get_card_config_version()))
+
+	def test_card_config_served_from_process_cache(self):
+		"""Test that the in-process cache skips Redis until the version check expires"""
+		config = api.get_item_price_card_config()
+		with patch.object(api, "_get_cached_item_price_card_config", side_effect=AssertionError("Redis read")):
+			self.assertIs(api.get_item_price_card_config(), config)
+
+		# Another worker bumps the version; this one notices once its version entry expires
+		cache = frappe.cache()
+		cache.execute_command("INCR", cache.make_key(api._CARD_CONFIG_VERSION_KEY))
+		api._card_config_version_l1.invalidate("version")
+		self.assertIsNot(api.get_item_price_card_config(), config)
+
+	def test_card_config_not_modified_for_current_version(self):
+		"""Test that a client holding the current version gets a minimal response"""
+		config = api.get_item_price_card_config()
+		self.assertIn("version", config)
+
+		response = api.get_item_price_card_config(version=config["version"])
+		self.assertEqual(response, {"not_modified": 1, "version": config["version"]})
+
+		stale = api.get_item_price_card_config(version=config["version"] - 1)
+		self.assertIn("fields", stale)
+
+	def test_concurrent_rebuild_serves_last_good_config(self):
+		"""Test that a miss during another request's rebuild serves the previous config"""
+		previous = api.get_item_price_card_config(force=True)
+		api.clear_item_price_card_config_cache()
+		version = api.get_card_config_version()
+
+		lease = RedisLease(api._CARD_CONFIG_LOCK_KEY.format(lang=frappe.local.lang or "en"), 30)
+		self.assertTrue(lease.acquire())
+		try:
+			with patch.object(api, "_build_item_price_card_config", side_effect=AssertionError("rebuilt")):
+				self.assertEqual(api.get_item_price_card_config(), previous)
+		finally:
+			lease.release()
+
+		self.assertEqual(api.get_item_price_card_config()["version"], version)
+		self.assertGreaterEqual(api.get_card_config_metrics().get("stale_served", 0), 1)
+
+	def test_lock_waiter_returns_config_cached_by_the_holder(self):
+		"""Test that a miss with no last good config picks up the lock holder's result"""
+		api.clear_item_price_card_config_cache()
+		version = api.get_card_config_version()
+		lang = frappe.local.lang or "en"
+		cache = frappe.cache()
+		cache.delete_value(api._CARD_CONFIG_LAST_GOOD_KEY.format(lang=lang))
+		built = {"fields": [], "version": version, "built_by": "holder"}
+		key = cache.make_key(api._get_card_config_cache_key(version))
+
+		def fill():
+			# Another worker finishing its build while this request waits
+			cache.execute_command("SET", key, pickle.dumps(built), "EX", 60)
+
+		lease = RedisLease(api._CARD_CONFIG_LOCK_KEY.format(lang=lang), 30)
+		self.assertTrue(lease.acquire())
+		holder = threading.Timer(0.2, fill)
+		try:
+			holder.start()
+			with patch.object(api, "_CARD_CONFIG_LOCK_WAIT_MS", 5000), patch.object(
+				api, "_build_item_price_card_config", side_effect=AssertionError("rebuilt")
+			):
+				self.assertEqual(api.get_item_price_card_config(), built)
+		finally:
+			holder.join()
+			lease.release()
+			api.clear_item_price_card_config_cache()
+
+	def test_boot_session_includes_card_config(self):
+		"""Test that the desk boot payload carries the current card config and version"""
+		bootinfo = frappe._dict()
+		api.boot_session(bootinfo)
+
+		self.assertIn("fields", bootinfo.apex_item_card_config)
+		self.assertEqual(bootinfo.apex_item_card_config["version"], api.get_card_config_version())
+
+	def test_item_price_feed_keyset_pages(self):
+		"""Test that feed pages follow each other without overlap and carry the config version"""
+		first = api.get_item_price_feed(page_length=2, prefetch=0)
+		self.assertEqual(first["version"], api.get_card_config_version())
+		self.assertLessEqual(len(first["rows"]), 2)
+		if not first["next_cursor"]:
+			self.skipTest("Not enough Item Price rows available")
+
+		second = api.get_item_price_feed(cursor=frappe.as_json(first["next_cursor"]), page_length=2)
+		first_names = {row.name for row in first["rows"]}
+		self.assertFalse(first_names & {row.name for row in second["rows"]})
+
+		expected = frappe.get_list(
+			"Item Price", pluck="name", order_by="modified desc, name desc", limit_page_length=4
+		)
+		self.assertEqual([row.name for row in first["rows"] + second["rows"]], expected)
+
+	def test_item_price_feed_follows_list_sort(self):
+		"""Test that the feed pages in the requested sort and ignores unsortable fields"""
+		first = api.get_item_price_feed(
+			page_length=2, prefetch=0, sort_by="`tabItem Price`.`name`", sort_order="asc"
+		)
+		if not first["next_cursor"]:
+			self.skipTest("Not enough Item Price rows available")
+		second = api.get_item_price_feed(
+			cursor=first["next_cursor"], page_length=2, prefetch=0, sort_by="name", sort_order="asc"
+		)
+
+		expected = frappe.get_list("Item Price", pluck="name", order_by="name asc", limit_page_length=4)
+		self.assertEqual([row.name for row in first["rows"] + second["rows"]], expected)
+		self.assertEqual(api._normalize_feed_sort("item_name", "sideways"), ("modified", "desc"))
+
 	def test_get_item_price_card_setting_debug(self):
 		"""Test get_item_price_card_setting_debug API"""
 		# Only test if DocType exists
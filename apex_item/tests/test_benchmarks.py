@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the benchmark dataset generator and harness"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item.benchmarks import CASES, dataset, run_benchmarks
+
+
+class TestBenchmarks(FrappeTestCase):
+	"""Test cases for a tiny benchmark run"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+
+	def tearDown(self):
+		dataset.delete_dataset()
+
+	def test_dataset_is_reproducible(self):
+		"""Test that the same seed produces the same Bin quantities"""
+		counts = dataset.generate_dataset(items=5, warehouses=2, price_lists=2, purchase_orders=1, seed=7)
+		self.assertEqual(counts["item_prices"], 10)
+		first = frappe.get_all("Bin", filters={"name": ["like", "APEX-BENCH%"]}, fields=["name", "actual_qty"])
+
+		# A second call replaces the first dataset instead of failing on duplicate names
+		dataset.generate_dataset(items=5, warehouses=2, price_lists=2, purchase_orders=1, seed=7)
+		second = frappe.get_all("Bin", filters={"name": ["like", "APEX-BENCH%"]}, fields=["name", "actual_qty"])
+
+		self.assertEqual(
+			{row.name: row.actual_qty for row in first}, {row.name: row.actual_qty for row in second}
+		)
+
+	def test_run_writes_json_results(self):
+		"""Test that a run times the selected cases, writes JSON and removes its dataset"""
+		output = os.path.join(tempfile.mkdtemp(), "results.json")
+		# The full rebuild sweeps every Item Price of the site; leave it out on the test site
+		cases = [case for case in CASES if case != "update_all_item_price_qty"]
+		results = run_benchmarks(
+			items=4, warehouses=2, price_lists=1, purchase_orders=1, repeat=1, sample=2, output=output, cases=cases
+		)
+
+		with open(output) as f:
+			written = json.load(f)
+		self.assertEqual(set(written["results"]), set(results["results"]))
+		self.assertEqual(set(written["results"]), set(cases))
+		self.assertIn("get_item_price_card_config_warm", written["results"])
+		for case in written["results"].values():
+			self.assertEqual(case["runs"], 1)
+			self.assertGreaterEqual(case["median"], 0)
+		self.assertFalse(frappe.db.exists("Item", {"name": ["like", "APEX-BENCH%"]}))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the open-purchase ledger"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, flt, getdate, now
+
+from apex_item.apex_item.doctype.item_open_purchase.item_open_purchase import (
+	get_waiting_buckets,
+	get_waiting_qty,
+	reconcile_open_purchase_ledger,
+)
+
+
+class TestItemOpenPurchase(FrappeTestCase):
+	"""Test cases for waiting quantity read from the ledger"""
+
+	item_code = "TEST-OPEN-PO-ITEM"
+	warehouse = "TEST-OPEN-PO-WH"
+
+	def setUp(self):
+		frappe.db.rollback()
+		frappe.db.begin()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def insert_ledger_row(self, warehouse, schedule_date, open_qty):
+		frappe.db.sql(
+			"""
+			INSERT INTO `tabItem Open Purchase`
+				(name, creation, modified, owner, modified_by, item_code, warehouse, schedule_date, open_qty)
+			VALUES (%s, %s, %s, 'Administrator', 'Administrator', %s, %s, %s, %s)
+		""",
+			(frappe.generate_hash(length=12), now(), now(), self.item_code, warehouse, schedule_date, open_qty),
+		)
+
+	def test_waiting_qty_grouped_by_warehouse(self):
+		"""Test that ledger rows sum per warehouse and a blank warehouse reads as None"""
+		today = getdate()
+		self.insert_ledger_row(self.warehouse, today, 4)
+		self.insert_ledger_row(self.warehouse, add_days(today, 60), 6)
+		self.insert_ledger_row("", today, 1)
+
+		waiting = get_waiting_qty([self.item_code])[self.item_code]
+		self.assertEqual(flt(waiting[self.warehouse]), 10)
+		self.assertEqual(flt(waiting[None]), 1)
+
+	def test_waiting_buckets_by_expected_date(self):
+		"""Test that overdue and near lines count towards this week, far lines towards neither"""
+		today = getdate("2025-06-11")
+		self.insert_ledger_row(self.warehouse, add_days(today, -3), 2)
+		self.insert_ledger_row(self.warehouse, today, 3)
+		self.insert_ledger_row(self.warehouse, "2025-06-25", 5)
+		self.insert_ledger_row(self.warehouse, "2025-08-01", 7)
+
+		buckets = get_waiting_buckets([(self.item_code, self.warehouse), (self.item_code, None)], today=today)
+		for pair in ((self.item_code, self.warehouse), (self.item_code, None)):
+			self.assertEqual(flt(buckets[pair]["waiting_this_week"]), 5)
+			self.assertEqual(flt(buckets[pair]["waiting_this_month"]), 10)
+
+	def test_reconcile_writes_only_drifted_rows(self):
+		"""Test that the reconcile removes rows without open PO lines and then writes nothing"""
+		self.insert_ledger_row(self.warehouse, getdate(), 4)
+
+		self.assertEqual(reconcile_open_purchase_ledger([self.item_code]), 1)
+		self.assertFalse(frappe.db.exists("Item Open Purchase", {"item_code": self.item_code}))
+		self.assertEqual(reconcile_open_purchase_ledger([self.item_code]), 0)
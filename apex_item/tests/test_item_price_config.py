@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the compiled Item Price card field definitions"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item.item_price_config import (
+	clear_compiled_config,
+	get_default_card_config,
+	get_field_definition,
+)
+
+
+class TestItemPriceConfig(FrappeTestCase):
+	"""Test cases for memoized, read-only card definitions"""
+
+	def test_definitions_are_memoized_and_frozen(self):
+		"""Test that repeated calls return the same read-only objects"""
+		self.assertIs(get_default_card_config(), get_default_card_config())
+		self.assertIs(get_field_definition("price_list_rate"), get_field_definition("price_list_rate"))
+		self.assertEqual(get_field_definition("unknown_field"), {})
+
+		with self.assertRaises(TypeError):
+			get_field_definition("price_list_rate")["label"] = "Changed"
+		with self.assertRaises(TypeError):
+			get_default_card_config()["fields"][0]["label"] = "Changed"
+
+	def test_clear_recompiles(self):
+		"""Test that clearing drops the memoized config"""
+		config = get_default_card_config()
+		clear_compiled_config()
+		self.assertIsNot(get_default_card_config(), config)
+		self.assertEqual(
+			[dict(field) for field in get_default_card_config()["fields"]],
+			[dict(field) for field in config["fields"]],
+		)
+		self.assertTrue(frappe.as_json([dict(field) for field in config["fields"]]))
@@ -12,6 +12,9 @@ from frappe.tests.utils import FrappeTestCase
 from frappe.utils import flt
 
 from apex_item.item_price_hooks import (
+	_get_item_default_warehouse,
+	get_item_default_warehouses,
+	get_stock_snapshots,
 	refresh_item_price,
 	refresh_item_prices,
 	refresh_item_prices_by_filters,
@@ -250,6 +253,20 @@ class TestItemPriceHooks(FrappeTestCase):
 		# Verify count
 		self.assertGreaterEqual(updated, 1)
 
+	def test_filter_refresh_skips_synced_rows(self):
+		"""Test that a repeated filter refresh only recomputes rows whose sources changed"""
+		self.create_test_bin(actual_qty=20.0)
+		item_price = self.create_test_item_price()
+		filters = [["name", "=", item_price.name]]
+
+		first = refresh_item_prices_by_filters(filters, with_stats=True)
+		self.assertEqual(first["total"], 1)
+		self.assertIsNotNone(frappe.db.get_value("Item Price", item_price.name, "stock_synced_at"))
+
+		second = refresh_item_prices_by_filters(filters, with_stats=True)
+		self.assertEqual(second["total"], 0)
+		self.assertEqual(second["fresh"], 1)
+
 	def test_stock_fields_read_only(self):
 		"""Test that stock quantity fields are read-only"""
 		item_price = self.create_test_item_price()
@@ -302,4 +319,165 @@ class TestItemPriceHooks(FrappeTestCase):
 		self.assertEqual(flt(item_price.available_qty), 0.0)
 		self.assertEqual(flt(item_price.waiting_qty), 0.0)
 
+	def test_get_stock_snapshots_batch(self):
+		"""Test that batch snapshots match per-warehouse and all-warehouse totals"""
+		self.create_test_bin(actual_qty=40.0, reserved_qty=10.0)
+
+		snapshots = get_stock_snapshots(
+			[
+				(self.test_item, self.test_warehouse),
+				{"item_code": self.test_item, "warehouse": None},
+				("NON-EXISTENT-ITEM", self.test_warehouse),
+			]
+		)
+
+		by_warehouse = snapshots[(self.test_item, self.test_warehouse)]
+		self.assertEqual(flt(by_warehouse["actual_qty"]), 40.0)
+		self.assertEqual(flt(by_warehouse["available_qty"]), 30.0)
+
+		all_warehouses = snapshots[(self.test_item, None)]
+		self.assertGreaterEqual(flt(all_warehouses["actual_qty"]), 40.0)
+
+		missing = snapshots[("NON-EXISTENT-ITEM", self.test_warehouse)]
+		self.assertEqual(flt(missing["actual_qty"]), 0.0)
+		self.assertIsNone(missing["item_group"])
+
+	def test_refresh_skips_unchanged_rows(self):
+		"""Test that a second refresh without stock changes writes nothing"""
+		self.create_test_bin(actual_qty=60.0, reserved_qty=6.0)
+		item_price = self.create_test_item_price()
+
+		first = refresh_item_prices([item_price.name], with_stats=True)
+		self.assertEqual(first["total"], 1)
 
+		second = refresh_item_prices([item_price.name], with_stats=True)
+		self.assertEqual(second["total"], 1)
+		self.assertEqual(second["written"], 0)
+		self.assertEqual(second["skipped"], 1)
+
+	def test_unselected_snapshot_fields_are_not_changes(self):
+		"""Test that snapshot values outside the stored row fields never count as changes"""
+		from apex_item.item_price_hooks import _get_changed_values
+
+		row = {"name": "IP-1", "actual_qty": 5.0}
+		snapshot = {"actual_qty": 5.0, "item_image": "/files/a.png"}
+		self.assertEqual(_get_changed_values(row, snapshot, 6, {"actual_qty"}), {})
+		self.assertEqual(
+			_get_changed_values(row, dict(snapshot, actual_qty=6.0), 6, {"actual_qty"}), {"actual_qty": 6.0}
+		)
+
+	def test_stock_ledger_delta_updates_item_price(self):
+		"""Test that a Stock Ledger Entry shifts actual/available qty by its signed change"""
+		from apex_item.item_price_hooks import update_item_prices_from_stock_ledger
+
+		item_price = self.create_test_item_price()
+		before = frappe.db.get_value("Item Price", item_price.name, ["actual_qty", "available_qty"], as_dict=True)
+
+		sle = frappe._dict(
+			item_code=self.test_item, warehouse=self.test_warehouse, actual_qty=12.5, voucher_type="Stock Entry"
+		)
+		# Cancelling the voucher submits a reversing entry carrying the negated quantity
+		reversal = frappe._dict(sle, actual_qty=-12.5, is_cancelled=1)
+		with patch.dict(frappe.conf, {"apex_item_incremental_stock": 1}):
+			update_item_prices_from_stock_ledger(sle, "on_submit")
+			after_submit = frappe.db.get_value("Item Price", item_price.name, ["actual_qty", "available_qty"], as_dict=True)
+			update_item_prices_from_stock_ledger(reversal, "on_submit")
+			after_reversal = frappe.db.get_value("Item Price", item_price.name, "actual_qty")
+			update_item_prices_from_stock_ledger(frappe._dict(sle, docstatus=1), "on_submit")
+			update_item_prices_from_stock_ledger(frappe._dict(sle, docstatus=2), "on_cancel")
+			after_cancel = frappe.db.get_value("Item Price", item_price.name, "actual_qty")
+
+		self.assertEqual(flt(after_submit.actual_qty), flt(before.actual_qty) + 12.5)
+		self.assertEqual(flt(after_submit.available_qty), flt(before.available_qty) + 12.5)
+		self.assertEqual(flt(after_reversal), flt(before.actual_qty))
+		self.assertEqual(flt(after_cancel), flt(before.actual_qty))
+
+	def test_stock_ledger_without_delta_enqueues_refresh(self):
+		"""Test that zero-quantity and Stock Reconciliation entries fall back to a refresh"""
+		from apex_item import item_price_hooks
+
+		entries = [
+			frappe._dict(item_code=self.test_item, warehouse=self.test_warehouse, actual_qty=0),
+			frappe._dict(
+				item_code=self.test_item,
+				warehouse=self.test_warehouse,
+				actual_qty=4,
+				voucher_type="Stock Reconciliation",
+			),
+		]
+		with patch.dict(frappe.conf, {"apex_item_incremental_stock": 1}), patch.object(
+			item_price_hooks, "_enqueue_item_price_refresh"
+		) as enqueue, patch.object(item_price_hooks, "apply_stock_delta") as apply_delta:
+			for entry in entries:
+				item_price_hooks.update_item_prices_from_stock_ledger(entry, "on_submit")
+
+		apply_delta.assert_not_called()
+		self.assertEqual(enqueue.call_count, 2)
+		enqueue.assert_called_with([{"item_code": self.test_item, "warehouse": self.test_warehouse}])
+
+	def test_summary_only_delta_leaves_item_price_quantities(self):
+		"""Test that with summary reads a stock delta moves the summary rows, not Item Price"""
+		from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import get_item_price_stock
+		from apex_item.item_price_hooks import apply_stock_delta
+
+		item_price = self.create_test_item_price()
+		with patch.dict(frappe.conf, {"apex_item_stock_summary_reads": 1}):
+			refresh_item_prices([item_price.name])
+			stored = frappe.db.get_value("Item Price", item_price.name, "actual_qty")
+			before = get_item_price_stock([item_price.name])[0]
+			apply_stock_delta(self.test_item, self.test_warehouse, 7)
+			after = get_item_price_stock([item_price.name])[0]
+
+		self.assertEqual(flt(frappe.db.get_value("Item Price", item_price.name, "actual_qty")), flt(stored))
+		self.assertEqual(flt(after.actual_qty), flt(before.actual_qty) + 7)
+
+	def test_summary_only_delta_refreshes_only_rows_item_prices_read(self):
+		"""Test that a delta only enqueues a refresh for a summary row an Item Price reads"""
+		from apex_item import item_price_hooks
+		from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import get_summary_name
+
+		self.create_test_item_price()
+		with patch.dict(frappe.conf, {"apex_item_stock_summary_reads": 1}):
+			refresh_item_prices(frappe.get_all("Item Price", {"item_code": self.test_item}, pluck="name"))
+			with patch.object(item_price_hooks, "_enqueue_item_price_refresh") as enqueue:
+				# No Item Price is pinned to this warehouse or reads the rollup
+				item_price_hooks.apply_stock_delta(self.test_item, "_Test Unpinned Warehouse", 3)
+				enqueue.assert_not_called()
+
+				pinned = get_summary_name(self.test_item, self.test_warehouse)
+				frappe.db.delete("Item Stock Summary", {"name": pinned})
+				item_price_hooks.apply_stock_delta(self.test_item, self.test_warehouse, 3)
+
+		enqueue.assert_called_once_with([{"item_code": self.test_item, "warehouse": self.test_warehouse}])
+
+	def test_default_warehouse_version_bump_expires_cached_entries(self):
+		"""Test that bumping the shared version makes every worker resolve the warehouse again"""
+		from apex_item import item_price_hooks
+
+		with patch.object(item_price_hooks, "_load_item_default_warehouse", return_value="WH-OLD"):
+			self.assertEqual(item_price_hooks._get_item_default_warehouse(self.test_item), "WH-OLD")
+
+		item_price_hooks._bump_default_warehouse_version()
+		with patch.object(item_price_hooks, "_load_item_default_warehouse", return_value="WH-NEW") as load:
+			self.assertEqual(item_price_hooks._get_item_default_warehouse(self.test_item), "WH-NEW")
+		load.assert_called_once_with(self.test_item)
+
+	def test_bulk_default_warehouse_resolution(self):
+		"""Test that the bulk resolver matches the per-item lookup and filters by company"""
+		company = frappe.db.get_value("Warehouse", self.test_warehouse, "company")
+		frappe.db.sql("DELETE FROM `tabItem Default` WHERE parent = %s", self.test_item)
+		item = frappe.get_doc("Item", self.test_item)
+		item.append("item_defaults", {"company": company, "default_warehouse": self.test_warehouse})
+		item.flags.ignore_mandatory = True
+		item.save(ignore_permissions=True)
+
+		warehouses = get_item_default_warehouses([self.test_item, "NON-EXISTENT-ITEM"])
+		self.assertEqual(warehouses["NON-EXISTENT-ITEM"], None)
+		self.assertEqual(warehouses[self.test_item], _get_item_default_warehouse(self.test_item))
+		item_level = None
+		if frappe.db.has_column("Item", "default_warehouse"):
+			item_level = frappe.db.get_value("Item", self.test_item, "default_warehouse") or None
+		self.assertEqual(
+			get_item_default_warehouses([self.test_item], company="NON-EXISTENT-COMPANY")[self.test_item],
+			item_level,
+		)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the coalescing Item Price refresh queue"""
+
+from __future__ import annotations
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item import item_price_queue
+
+
+class TestItemPriceQueue(FrappeTestCase):
+	"""Test cases for the Redis-backed refresh queue"""
+
+	def setUp(self):
+		cache = frappe.cache()
+		for key in (
+			item_price_queue._PENDING_KEY,
+			item_price_queue._PENDING_SINCE_KEY,
+			item_price_queue._FLUSH_SCHEDULED_KEY,
+		):
+			cache.execute_command("DEL", cache.make_key(key))
+
+	def test_duplicate_events_coalesce(self):
+		"""Test that repeated events for the same pair occupy one slot and one flusher"""
+		with patch.object(item_price_queue, "_enqueue_flusher") as enqueue_flusher:
+			item_price_queue.queue_item_price_refresh([("ITEM-A", "WH-1"), ("ITEM-A", "WH-1")])
+			item_price_queue.queue_item_price_refresh([{"item_code": "ITEM-A", "warehouse": "WH-1"}])
+			pending = item_price_queue.queue_item_price_refresh([("ITEM-B", None)])
+
+		self.assertEqual(pending, 2)
+		self.assertEqual(enqueue_flusher.call_count, 1)
+
+	def test_drain_refreshes_all_pending_pairs(self):
+		"""Test that draining pops every pending pair and hands it to the refresh"""
+		with patch.object(item_price_queue, "_enqueue_flusher"):
+			item_price_queue.queue_item_price_refresh([("ITEM-A", "WH-1"), ("ITEM-B", None)])
+
+		with patch.object(item_price_queue, "refresh_item_prices_for_items") as refresh:
+			refreshed = item_price_queue.drain_pending_pairs()
+
+		self.assertEqual(refreshed, 2)
+		pairs = {pair for call in refresh.call_args_list for pair in call.args[0]}
+		self.assertEqual(pairs, {("ITEM-A", "WH-1"), ("ITEM-B", None)})
+		self.assertEqual(item_price_queue.get_pending_count(), 0)
+
+	def test_partial_drain_keeps_debounce_start(self):
+		"""Test that the debounce start survives until the pending set is empty"""
+		cache = frappe.cache()
+		since_key = cache.make_key(item_price_queue._PENDING_SINCE_KEY)
+		with patch.object(item_price_queue, "_enqueue_flusher"):
+			item_price_queue.queue_item_price_refresh([("ITEM-A", "WH-1"), ("ITEM-B", None), ("ITEM-C", None)])
+
+		with patch.object(item_price_queue, "refresh_item_prices_for_items"), patch.dict(
+			frappe.conf, {"apex_item_refresh_batch_size": 2}
+		):
+			item_price_queue.drain_pending_pairs(max_batches=1)
+			self.assertTrue(cache.execute_command("GET", since_key))
+
+			item_price_queue.drain_pending_pairs()
+		self.assertFalse(cache.execute_command("GET", since_key))
+
+	def test_flush_reschedules_instead_of_sleeping(self):
+		"""Test that a flush inside the debounce window re-enqueues itself with a delay"""
+		with patch.object(item_price_queue, "_enqueue_flusher"):
+			item_price_queue.queue_item_price_refresh([("ITEM-A", "WH-1")])
+
+		with patch.object(item_price_queue, "_enqueue_flusher", return_value=True) as enqueue_flusher, patch.dict(
+			frappe.conf, {"apex_item_refresh_flush_interval": 60}
+		):
+			self.assertEqual(item_price_queue.flush_item_price_refresh_queue(), 0)
+
+		self.assertGreater(enqueue_flusher.call_args.kwargs["delay"], 0)
+		self.assertEqual(item_price_queue.get_pending_count(), 1)
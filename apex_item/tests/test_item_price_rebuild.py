@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the resumable Item Price rebuild job"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item import item_price_rebuild
+
+
+class TestItemPriceRebuild(FrappeTestCase):
+	"""Test cases for the background Item Price rebuild"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.db.set_global(item_price_rebuild._STATE_KEY, None)
+		frappe.cache().delete_value(item_price_rebuild._CANCEL_KEY)
+
+	def test_rebuild_completes_and_records_checkpoint(self):
+		"""Test that a rebuild (run inline in tests) walks every Item Price row"""
+		state = item_price_rebuild.start_rebuild(resume=False)
+		self.assertIn(state.get("status"), ("queued", "running", "completed"))
+
+		state = item_price_rebuild.get_rebuild_state()
+		self.assertEqual(state.get("status"), "completed")
+		self.assertEqual(state.get("processed"), state.get("total"))
+		self.assertEqual(state.get("written") + state.get("skipped"), state.get("processed"))
+
+	def test_rebuild_resumes_after_checkpoint(self):
+		"""Test that a resumed rebuild only processes rows after the saved checkpoint"""
+		names = frappe.get_all(
+			"Item Price", filters={"item_code": ["is", "set"]}, pluck="name", order_by="name asc"
+		)
+		if len(names) < 2:
+			self.skipTest("Not enough Item Price rows available")
+
+		item_price_rebuild._save_state(
+			{
+				"status": "running",
+				"last_name": names[0],
+				"processed": 1,
+				"written": 0,
+				"skipped": 1,
+				"total": len(names),
+			}
+		)
+		item_price_rebuild.start_rebuild(resume=True)
+
+		state = item_price_rebuild.get_rebuild_state()
+		self.assertEqual(state.get("status"), "completed")
+		self.assertEqual(state.get("processed"), len(names))
+
+	def test_cancel_without_active_job(self):
+		"""Test that cancelling a queued rebuild with no worker marks it cancelled"""
+		item_price_rebuild._save_state({"status": "queued", "processed": 0, "total": 0})
+
+		state = item_price_rebuild.cancel_rebuild()
+		self.assertEqual(state.get("status"), "cancelled")
+
+	def test_cancel_stops_running_rebuild(self):
+		"""Test that a cancel flag set partway through a run stops it after the current page"""
+		names = frappe.get_all("Item Price", filters={"item_code": ["is", "set"]}, pluck="name", limit=3)
+		if len(names) < 3:
+			self.skipTest("Not enough Item Price rows available")
+
+		refresh = item_price_rebuild.refresh_item_price_rows
+
+		def refresh_then_cancel(rows, **kwargs):
+			stats = refresh(rows, **kwargs)
+			frappe.cache().set_value(item_price_rebuild._CANCEL_KEY, 1, expires_in_sec=60)
+			return stats
+
+		# Read the flag once first, as the running job does before its first page
+		frappe.cache().get_value(item_price_rebuild._CANCEL_KEY)
+		item_price_rebuild._save_state({"status": "queued", "processed": 0, "written": 0, "skipped": 0})
+		with patch.object(item_price_rebuild, "_CHUNK_SIZE", 1), patch.object(
+			item_price_rebuild, "refresh_item_price_rows", side_effect=refresh_then_cancel
+		):
+			item_price_rebuild.run_rebuild()
+
+		state = item_price_rebuild.get_rebuild_state()
+		self.assertEqual(state.get("status"), "cancelled")
+		self.assertEqual(state.get("processed"), 1)
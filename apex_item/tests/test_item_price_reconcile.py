@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the cursor-based Item Price reconcile"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item import item_price_reconcile
+from apex_item.utils import RedisLease
+
+
+class TestItemPriceReconcile(FrappeTestCase):
+	"""Test cases for the scheduled and partitioned reconcile"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.db.set_global(item_price_reconcile._WATERMARK_KEY, None)
+		frappe.cache().delete_value(item_price_reconcile._LEASE_KEY)
+		frappe.db.set_global(item_price_reconcile._RUN_KEY, None)
+
+	def test_watermark_advances_and_second_run_is_empty(self):
+		"""Test that every Bin after the watermark is processed once, then nothing is rescanned"""
+		item_price_reconcile._save_watermark({"modified": "2000-01-01 00:00:00", "name": ""})
+		expected = frappe.db.count("Bin")
+
+		with patch.dict(frappe.conf, {"apex_item_reconcile_safety_window": 0}):
+			self.assertEqual(item_price_reconcile.reconcile_changed_bins(), expected)
+			watermark = item_price_reconcile.get_watermark()
+			if expected:
+				latest = frappe.get_all("Bin", fields=["name"], order_by="modified desc, name desc", limit=1)
+				self.assertEqual(watermark.get("name"), latest[0].name)
+
+			self.assertEqual(item_price_reconcile.reconcile_changed_bins(), 0)
+
+	def test_recent_changes_wait_for_the_safety_window(self):
+		"""Test that Bins modified inside the safety window are left for a later run"""
+		bins = frappe.get_all("Bin", fields=["name"], limit=1)
+		if not bins:
+			self.skipTest("No Bin on this site")
+
+		frappe.db.set_value("Bin", bins[0].name, "modified", frappe.utils.now())
+		start = {"modified": str(frappe.utils.add_to_date(frappe.utils.now_datetime(), seconds=-30)), "name": ""}
+		item_price_reconcile._save_watermark(start)
+
+		with patch.dict(frappe.conf, {"apex_item_reconcile_safety_window": 3600}):
+			self.assertEqual(item_price_reconcile.reconcile_changed_bins(), 0)
+		self.assertEqual(item_price_reconcile.get_watermark(), start)
+
+		with patch.dict(frappe.conf, {"apex_item_reconcile_safety_window": 0}):
+			self.assertGreaterEqual(item_price_reconcile.reconcile_changed_bins(), 1)
+
+	def test_overlapping_run_is_skipped(self):
+		"""Test that a run is a no-op while another run holds the lease"""
+		item_price_reconcile._save_watermark({"modified": "2000-01-01 00:00:00", "name": ""})
+		lease = RedisLease(item_price_reconcile._LEASE_KEY, 60)
+		self.assertTrue(lease.acquire())
+		try:
+			self.assertEqual(item_price_reconcile.reconcile_changed_bins(), 0)
+		finally:
+			lease.release()
+
+	def test_partitions_cover_every_item_price_once(self):
+		"""Test that partition jobs (run inline in tests) together process every Item Price row"""
+		run = item_price_reconcile.start_partitioned_reconcile(partitions=3)
+		expected = frappe.db.count("Item Price", {"item_code": ["is", "set"]})
+
+		self.assertEqual(run.get("status"), "completed")
+		self.assertLessEqual(run.get("partitions"), 3)
+		self.assertEqual(len(run.get("partition_states")), run.get("partitions"))
+		self.assertEqual(run.get("processed"), expected)
+		self.assertEqual(run.get("written") + run.get("skipped"), expected)
+
+	def test_partitioned_reconcile_removes_orphan_summaries(self):
+		"""Test that a full reconcile drops summary rows no Item Price reads"""
+		from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import (
+			get_summary_name,
+			update_stock_summary,
+		)
+
+		update_stock_summary({("TEST-ORPHAN-ITEM", None): {"actual_qty": 1, "available_qty": 1}})
+		frappe.db.commit()
+
+		run = item_price_reconcile.start_partitioned_reconcile(partitions=2)
+
+		self.assertEqual(run.get("status"), "completed")
+		self.assertGreaterEqual(run.get("orphans"), 1)
+		self.assertFalse(frappe.db.exists("Item Stock Summary", get_summary_name("TEST-ORPHAN-ITEM", None)))
+
+	def test_bin_reconcile_resyncs_open_purchase_ledger(self):
+		"""Test that a stale ledger row of a reconciled item is re-derived from its PO lines"""
+		bins = frappe.get_all("Bin", fields=["item_code"], limit=1)
+		if not bins:
+			self.skipTest("No Bin on this site")
+
+		frappe.db.set_global("apex_item_open_purchase_ledger_ready", 1)
+		frappe.db.sql(
+			"""
+			INSERT INTO `tabItem Open Purchase`
+				(name, creation, modified, owner, modified_by, item_code, warehouse, schedule_date, open_qty)
+			VALUES
+				('TEST-STALE-LEDGER', NOW(), NOW(), 'Administrator', 'Administrator', %s, 'TEST-STALE-WH', CURDATE(), 99)
+		""",
+			bins[0].item_code,
+		)
+		item_price_reconcile._save_watermark({"modified": "2000-01-01 00:00:00", "name": ""})
+
+		with patch.dict(frappe.conf, {"apex_item_reconcile_safety_window": 0}):
+			item_price_reconcile.reconcile_changed_bins()
+		self.assertFalse(frappe.db.exists("Item Open Purchase", "TEST-STALE-LEDGER"))
+
+	def test_partition_ranges_are_contiguous(self):
+		"""Test that the sampled ranges chain end to start and leave both ends open"""
+		ranges = item_price_reconcile.get_partition_ranges(4)
+
+		self.assertLessEqual(len(ranges), 4)
+		self.assertIsNone(ranges[0][0])
+		self.assertIsNone(ranges[-1][1])
+		for previous, current in zip(ranges, ranges[1:]):
+			self.assertEqual(previous[1], current[0])
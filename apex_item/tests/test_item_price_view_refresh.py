@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the asynchronous list view refresh"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item import item_price_view_refresh
+
+
+class TestItemPriceViewRefresh(FrappeTestCase):
+	"""Test cases for the background filter refresh"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.job_id = item_price_view_refresh.get_flight_key([], 50)
+		frappe.cache().delete_value(item_price_view_refresh._RESULT_KEY.format(job_id=self.job_id))
+
+	def test_start_returns_handle_and_job_completes(self):
+		"""Test that start returns a job handle and the (inline) job leaves a completed state"""
+		state = item_price_view_refresh.start_filter_refresh(filters={}, limit=50)
+
+		self.assertEqual(state.get("job_id"), self.job_id)
+		status = item_price_view_refresh.get_filter_refresh_status(state["job_id"])
+		self.assertEqual(status.get("status"), "completed")
+		self.assertEqual(status.get("progress"), status.get("total"))
+
+		stats = status.get("stats") or {}
+		self.assertEqual(stats.get("written") + stats.get("skipped"), stats.get("total"))
+		self.assertLessEqual(stats.get("total") + stats.get("fresh"), 50)
+
+	def test_identical_requests_share_one_flight(self):
+		"""Test that equivalent filters map to one handle and a recent result is reused"""
+		self.assertEqual(
+			item_price_view_refresh.get_flight_key(
+				item_price_view_refresh._normalize_filters({"price_list": "Standard Selling", "selling": 1}), 50
+			),
+			item_price_view_refresh.get_flight_key(
+				item_price_view_refresh._normalize_filters(
+					'[["selling", "=", 1], ["price_list", "=", "Standard Selling"]]'
+				),
+				50,
+			),
+		)
+
+		first = item_price_view_refresh.start_filter_refresh(filters=[], limit=50)
+		second = item_price_view_refresh.start_filter_refresh(filters="[]", limit=50)
+
+		self.assertEqual(second.get("job_id"), first.get("job_id"))
+		self.assertTrue(second.get("reused"))
+		self.assertEqual(second.get("finished_at"), first.get("finished_at"))
+
+	def test_flight_lock_is_short_until_the_job_starts(self):
+		"""Test that a flight whose job never started frees its lock after the queued lease"""
+		lock_key = item_price_view_refresh._LOCK_KEY.format(job_id=self.job_id)
+		cache = frappe.cache()
+		lock = item_price_view_refresh.RedisLease(lock_key, item_price_view_refresh._QUEUED_LEASE_TTL)
+		self.assertTrue(lock.acquire())
+		try:
+			ttl = cache.execute_command("TTL", cache.make_key(lock_key))
+			self.assertLessEqual(ttl, item_price_view_refresh._QUEUED_LEASE_TTL)
+
+			# The job takes over the request's lease and extends it to the job timeout
+			state = item_price_view_refresh.run_filter_refresh(self.job_id, [], 50, lock_token=lock.token)
+			self.assertEqual(state.get("status"), "completed")
+			self.assertFalse(cache.execute_command("EXISTS", cache.make_key(lock_key)))
+		finally:
+			lock.release()
+
+	def test_job_skips_a_flight_owned_by_a_newer_request(self):
+		"""Test that a job whose queued lease was taken over leaves the work to the new owner"""
+		lock_key = item_price_view_refresh._LOCK_KEY.format(job_id=self.job_id)
+		frappe.cache().delete_value(item_price_view_refresh._STATE_KEY.format(job_id=self.job_id))
+		owner = item_price_view_refresh.RedisLease(lock_key, 60)
+		self.assertTrue(owner.acquire())
+		try:
+			state = item_price_view_refresh.run_filter_refresh(self.job_id, [], 50, lock_token="expired-token")
+			self.assertNotEqual(state.get("status"), "completed")
+			self.assertTrue(owner.renew())
+		finally:
+			owner.release()
+
+	def test_unknown_job_reports_unknown(self):
+		"""Test that polling an expired or unknown handle does not fail"""
+		status = item_price_view_refresh.get_filter_refresh_status("does-not-exist")
+		self.assertEqual(status.get("status"), "unknown")
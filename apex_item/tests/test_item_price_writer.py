@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the batched Item Price writer"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from apex_item.item_price_writer import STOCK_CHANGE_EVENT, ItemPriceWriter
+
+
+class TestItemPriceWriter(FrappeTestCase):
+	"""Test cases for ItemPriceWriter"""
+
+	def setUp(self):
+		frappe.db.rollback()
+		frappe.db.begin()
+		frappe.set_user("Administrator")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_item_price_names(self, limit=2):
+		names = frappe.get_all("Item Price", pluck="name", limit_page_length=limit)
+		if len(names) < limit:
+			self.skipTest("Not enough Item Price rows available")
+		return names
+
+	def test_flush_updates_rows_without_touching_modified(self):
+		"""Test that queued payloads are written and modified is preserved"""
+		names = self.get_item_price_names()
+		before = {name: frappe.db.get_value("Item Price", name, "modified") for name in names}
+
+		with ItemPriceWriter(chunk_size=1) as writer:
+			for idx, name in enumerate(names, start=1):
+				writer.add(name, {"actual_qty": idx * 10, "reserved_qty": idx, "available_qty": idx * 9})
+
+		self.assertEqual(writer.written, len(names))
+		for idx, name in enumerate(names, start=1):
+			row = frappe.db.get_value("Item Price", name, ["actual_qty", "available_qty", "modified"], as_dict=True)
+			self.assertEqual(flt(row.actual_qty), idx * 10)
+			self.assertEqual(flt(row.available_qty), idx * 9)
+			self.assertEqual(row.modified, before[name])
+
+	def test_payloads_for_same_row_are_merged(self):
+		"""Test that later payloads for a row are merged into the pending update"""
+		name = self.get_item_price_names(limit=1)[0]
+
+		writer = ItemPriceWriter()
+		writer.add(name, {"actual_qty": 5})
+		writer.add(name, {"waiting_qty": 7, "unknown_column": "ignored"})
+		self.assertEqual(len(writer), 1)
+		writer.flush()
+
+		row = frappe.db.get_value("Item Price", name, ["actual_qty", "waiting_qty"], as_dict=True)
+		self.assertEqual(flt(row.actual_qty), 5)
+		self.assertEqual(flt(row.waiting_qty), 7)
+
+	def test_flush_publishes_stock_diffs(self):
+		"""Test that a flush pushes only the written stock fields, and nothing when disabled"""
+		name = self.get_item_price_names(limit=1)[0]
+
+		with patch("frappe.publish_realtime") as publish:
+			with ItemPriceWriter() as writer:
+				writer.add(name, {"actual_qty": 3, "item_group": "ignored"})
+			publish.assert_called_once_with(
+				STOCK_CHANGE_EVENT, {"rows": {name: {"actual_qty": 3}}}, after_commit=True
+			)
+
+		with patch("frappe.publish_realtime") as publish:
+			with ItemPriceWriter(publish=False) as writer:
+				writer.add(name, {"actual_qty": 4})
+			publish.assert_not_called()
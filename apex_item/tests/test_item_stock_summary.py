@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the materialized Item Stock Summary table"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from apex_item.apex_item.doctype.item_stock_summary.item_stock_summary import (
+	ROLLUP_WAREHOUSE,
+	apply_summary_delta,
+	delete_orphan_summaries,
+	get_summary_name,
+	has_missing_summary,
+	update_stock_summary,
+)
+
+
+class TestItemStockSummary(FrappeTestCase):
+	"""Test cases for Item Stock Summary maintenance"""
+
+	item_code = "TEST-SUMMARY-ITEM"
+	warehouse = "TEST-SUMMARY-WH"
+
+	def setUp(self):
+		frappe.db.rollback()
+		frappe.db.begin()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_row(self, warehouse):
+		return frappe.db.get_value(
+			"Item Stock Summary",
+			get_summary_name(self.item_code, warehouse),
+			["warehouse", "actual_qty", "available_qty", "modified"],
+			as_dict=True,
+		)
+
+	def snapshot(self, actual, reserved=0):
+		return {
+			"actual_qty": actual,
+			"reserved_qty": reserved,
+			"available_qty": actual - reserved,
+			"waiting_qty": 0,
+			"item_group": None,
+			"item_image": None,
+		}
+
+	def test_upsert_writes_pair_and_rollup_rows(self):
+		"""Test that one row is kept per pair and a None warehouse maps to the rollup row"""
+		update_stock_summary(
+			{
+				(self.item_code, self.warehouse): self.snapshot(10, 2),
+				(self.item_code, None): self.snapshot(15, 2),
+			}
+		)
+		update_stock_summary({(self.item_code, self.warehouse): self.snapshot(12, 2)})
+
+		self.assertEqual(flt(self.get_row(self.warehouse).available_qty), 10)
+		rollup = self.get_row(None)
+		self.assertEqual(rollup.warehouse, ROLLUP_WAREHOUSE)
+		self.assertEqual(flt(rollup.actual_qty), 15)
+
+	def test_unchanged_upsert_keeps_modified(self):
+		"""Test that re-writing identical values does not move modified"""
+		update_stock_summary({(self.item_code, self.warehouse): self.snapshot(5)})
+		before = self.get_row(self.warehouse).modified
+
+		self.assertEqual(update_stock_summary({(self.item_code, self.warehouse): self.snapshot(5)}), set())
+		self.assertEqual(self.get_row(self.warehouse).modified, before)
+		self.assertEqual(
+			update_stock_summary({(self.item_code, self.warehouse): self.snapshot(6)}),
+			{(self.item_code, self.warehouse)},
+		)
+
+	def test_delta_updates_warehouse_and_rollup(self):
+		"""Test that a stock delta shifts both the warehouse row and the rollup row"""
+		update_stock_summary(
+			{
+				(self.item_code, self.warehouse): self.snapshot(10),
+				(self.item_code, None): self.snapshot(10),
+			}
+		)
+		apply_summary_delta(self.item_code, self.warehouse, -4)
+
+		self.assertEqual(flt(self.get_row(self.warehouse).actual_qty), 6)
+		self.assertEqual(flt(self.get_row(None).available_qty), 6)
+
+	def test_missing_rows_without_item_prices_need_no_refresh(self):
+		"""Test that an item no Item Price reads never reports a missing summary row"""
+		self.assertFalse(has_missing_summary(self.item_code, self.warehouse))
+
+	def test_orphan_rows_are_deleted(self):
+		"""Test that summary rows of an item without Item Prices are removed"""
+		update_stock_summary(
+			{
+				(self.item_code, self.warehouse): self.snapshot(3),
+				(self.item_code, None): self.snapshot(3),
+			}
+		)
+		names = [get_summary_name(self.item_code, self.warehouse), get_summary_name(self.item_code, None)]
+
+		self.assertEqual(delete_orphan_summaries(names), 2)
+		self.assertIsNone(self.get_row(self.warehouse))
+		self.assertIsNone(self.get_row(None))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for the opt-in SQL tracing spans"""
+
+from __future__ import annotations
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item import tracing
+
+
+class TestTracing(FrappeTestCase):
+	"""Test cases for spans, traces and traced jobs"""
+
+	def tearDown(self):
+		tracing.stop_trace()
+
+	def test_span_is_noop_without_trace(self):
+		"""Test that spans cost nothing and frappe.db.sql stays unwrapped when tracing is off"""
+		self.assertFalse(tracing.is_tracing())
+		self.assertIs(tracing.span("step", item_code="A"), tracing._NOOP_SPAN)
+		self.assertNotIn("sql", vars(frappe.db))
+
+	def test_spans_count_queries_and_rows(self):
+		"""Test that a span records its queries, rows and tags and the wrapper is removed"""
+		with tracing.traced() as trace:
+			with tracing.span("outer", item_code="ITEM-A", warehouse="WH-A"):
+				frappe.db.sql("SELECT 1 UNION ALL SELECT 2")
+				with tracing.span("inner"):
+					frappe.db.sql("SELECT 1")
+
+		summary = trace.summary
+		self.assertEqual(summary["queries"], 2)
+		self.assertEqual(summary["steps"]["outer"]["queries"], 2)
+		self.assertEqual(summary["steps"]["outer"]["rows"], 3)
+		self.assertEqual(summary["steps"]["inner"]["queries"], 1)
+		outer = next(record for record in summary["spans"] if record["name"] == "outer")
+		self.assertEqual(outer["tags"], {"item_code": "ITEM-A", "warehouse": "WH-A"})
+		self.assertNotIn("sql", vars(frappe.db))
+
+	def test_traceable_job_attaches_summary(self):
+		"""Test that a job called with trace=1 returns its summary and runs untraced otherwise"""
+
+		@tracing.traceable
+		def job(value):
+			with tracing.span("job.step"):
+				frappe.db.sql("SELECT 1")
+			return {"value": value}
+
+		self.assertEqual(job(1), {"value": 1})
+		result = job(2, trace=1)
+		self.assertEqual(result["value"], 2)
+		self.assertEqual(result["trace"]["steps"]["job.step"]["queries"], 1)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Apex Item
+# License: MIT. See LICENSE
+
+"""Tests for shared Apex Item helpers"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from apex_item.utils import SiteTTLCache, get_conf_int
+
+
+class TestSiteTTLCache(FrappeTestCase):
+	"""Test cases for the bounded per-site cache"""
+
+	def test_lru_eviction_and_counters(self):
+		"""Test that the least recently used entry is evicted and hits / misses are counted"""
+		cache = SiteTTLCache(maxsize=2, ttl=60)
+		cache.get_or_set("a", lambda: 1)
+		cache.get_or_set("b", lambda: 2)
+		self.assertEqual(cache.get_or_set("a", lambda: 0), 1)
+		cache.get_or_set("c", lambda: 3)
+
+		self.assertEqual(cache.get_or_set("b", lambda: "reloaded"), "reloaded")
+		stats = cache.stats()
+		self.assertEqual(stats["hits"], 1)
+		self.assertEqual(stats["misses"], 4)
+		self.assertEqual(stats["size"], 2)
+
+	def test_ttl_expiry_and_invalidate(self):
+		"""Test that expired or invalidated entries are loaded again, None included"""
+		cache = SiteTTLCache(maxsize=10, ttl=0)
+		cache.get_or_set("a", lambda: None)
+		self.assertEqual(cache.get_or_set("a", lambda: "fresh"), "fresh")
+
+		cache.ttl = 60
+		cache.set("b", None)
+		self.assertIsNone(cache.get_or_set("b", lambda: "unused"))
+		cache.invalidate("b")
+		self.assertEqual(cache.get_or_set("b", lambda: "fresh"), "fresh")
+
+	def test_entries_are_scoped_by_site(self):
+		"""Test that the same key on another site is a separate entry"""
+		cache = SiteTTLCache(maxsize=10, ttl=60)
+		cache.set("item", "WH-A")
+		with patch.object(frappe.local, "site", "other.site"):
+			self.assertEqual(cache.get_or_set("item", lambda: "WH-B"), "WH-B")
+		self.assertEqual(cache.get_or_set("item", lambda: "unused"), "WH-A")
+
+
+class TestGetConfInt(FrappeTestCase):
+	"""Test cases for integer site config settings"""
+
+	def test_explicit_zero_is_kept(self):
+		"""Test that a configured 0 is honoured when the minimum allows it"""
+		with patch.dict(frappe.conf, {"apex_item_test_setting": 0}):
+			self.assertEqual(get_conf_int("apex_item_test_setting", 6, minimum=0), 0)
+			self.assertEqual(get_conf_int("apex_item_test_setting", 6), 6)
+		self.assertEqual(get_conf_int("apex_item_missing_setting", 6, minimum=0), 6)
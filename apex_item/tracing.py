@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""Opt-in tracing of SQL work per logical step, for requests and background jobs"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import frappe
+from frappe.utils import cint
+
+# Request header (and form key) asking for a trace; the summary comes back in the same header
+TRACE_HEADER = "X-Apex-Item-Trace"
+_TRACE_FORM_KEY = "apex_item_trace"
+_LOCAL_KEY = "apex_item_trace"
+
+# Finished spans kept per trace; the per-step totals always cover every span
+_MAX_SPANS = 200
+# Response headers are size-limited; the header carries the per-step totals only
+_MAX_HEADER_SIZE = 4096
+
+
+class Trace:
+	"""Counters for one traced request or job, plus the spans finished within it."""
+
+	def __init__(self):
+		self.started = time.perf_counter()
+		self.queries = 0
+		self.rows = 0
+		self.sql_time = 0.0
+		self.spans: List[Dict[str, Any]] = []
+		self.steps: Dict[str, Dict[str, Any]] = {}
+		self.dropped = 0
+		self.summary: Optional[Dict[str, Any]] = None
+		self._stack: List[_Span] = []
+		self._db = None
+
+	def record_query(self, rows: int, elapsed: float) -> None:
+		self.queries += 1
+		self.rows += rows
+		self.sql_time += elapsed
+		# Spans are inclusive: a query counts towards every open span
+		for open_span in self._stack:
+			open_span.queries += 1
+			open_span.rows += rows
+
+	def add_span(self, record: Dict[str, Any]) -> None:
+		step = self.steps.setdefault(record["name"], {"count": 0, "queries": 0, "rows": 0, "ms": 0.0})
+		step["count"] += 1
+		step["queries"] += record["queries"]
+		step["rows"] += record["rows"]
+		step["ms"] = round(step["ms"] + record["ms"], 3)
+
+		if len(self.spans) < _MAX_SPANS:
+			self.spans.append(record)
+		else:
+			self.dropped += 1
+
+	def get_summary(self) -> Dict[str, Any]:
+		return {
+			"queries": self.queries,
+			"rows": self.rows,
+			"sql_ms": round(self.sql_time * 1000, 3),
+			"elapsed_ms": round((time.perf_counter() - self.started) * 1000, 3),
+			"steps": self.steps,
+			"spans": self.spans,
+			"dropped_spans": self.dropped,
+		}
+
+
+class _Span:
+	__slots__ = ("name", "queries", "rows", "started", "tags", "trace")
+
+	def __init__(self, trace: Trace, name: str, tags: Dict[str, Any]):
+		self.trace = trace
+		self.name = name
+		self.tags = tags
+		self.queries = 0
+		self.rows = 0
+		self.started = 0.0
+
+	def __enter__(self) -> "_Span":
+		self.started = time.perf_counter()
+		self.trace._stack.append(self)
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> bool:
+		elapsed = time.perf_counter() - self.started
+		self.trace._stack.remove(self)
+		record = {
+			"name": self.name,
+			"queries": self.queries,
+			"rows": self.rows,
+			"ms": round(elapsed * 1000, 3),
+		}
+		if self.tags:
+			record["tags"] = self.tags
+		if exc_type:
+			record["error"] = exc_type.__name__
+		self.trace.add_span(record)
+		return False
+
+	def tag(self, **tags) -> None:
+		self.tags.update({key: value for key, value in tags.items() if value is not None})
+
+
+class _NoopSpan:
+	__slots__ = ()
+
+	def __enter__(self) -> "_NoopSpan":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> bool:
+		return False
+
+	def tag(self, **tags) -> None:
+		pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, item_code: Optional[str] = None, warehouse: Optional[str] = None, **tags):
+	"""
+	Context manager timing one logical step of the active trace. Without an active trace
+	it returns a shared no-op, so instrumented code costs one attribute lookup.
+	"""
+	trace = getattr(frappe.local, _LOCAL_KEY, None)
+	if trace is None:
+		return _NOOP_SPAN
+	tags.update(item_code=item_code, warehouse=warehouse)
+	return _Span(trace, name, {key: value for key, value in tags.items() if value is not None})
+
+
+def is_tracing() -> bool:
+	return getattr(frappe.local, _LOCAL_KEY, None) is not None
+
+
+def start_trace() -> Trace:
+	"""
+	Start tracing the current request or job and wrap this connection's frappe.db.sql
+	to count queries and rows. Returns the already active trace when there is one.
+	"""
+	trace = getattr(frappe.local, _LOCAL_KEY, None)
+	if trace is not None:
+		return trace
+
+	trace = Trace()
+	db = frappe.db
+	if db is not None:
+		sql = db.sql
+
+		def traced_sql(*args, **kwargs):
+			started = time.perf_counter()
+			result = sql(*args, **kwargs)
+			trace.record_query(_count_rows(db, result), time.perf_counter() - started)
+			return result
+
+		# Instance attribute: only this connection is wrapped, and removing it restores the method
+		db.sql = traced_sql
+		trace._db = db
+
+	setattr(frappe.local, _LOCAL_KEY, trace)
+	return trace
+
+
+def stop_trace() -> Optional[Dict[str, Any]]:
+	"""Stop the active trace, unwrap frappe.db.sql and return the trace summary."""
+	trace = getattr(frappe.local, _LOCAL_KEY, None)
+	if trace is None:
+		return None
+
+	setattr(frappe.local, _LOCAL_KEY, None)
+	if trace._db is not None and "sql" in vars(trace._db):
+		del trace._db.sql
+	trace.summary = trace.get_summary()
+	return trace.summary
+
+
+@contextmanager
+def traced() -> Iterator[Trace]:
+	"""Trace the enclosed block; nested use joins the outer trace. Summary is on ``.summary``."""
+	if is_tracing():
+		yield getattr(frappe.local, _LOCAL_KEY)
+		return
+
+	trace = start_trace()
+	try:
+		yield trace
+	finally:
+		stop_trace()
+
+
+def traceable(fn: Callable) -> Callable:
+	"""
+	Give a background job a ``trace`` keyword (or trace every such job with
+	apex_item_trace_jobs in site config). A traced dict result carries the summary
+	under ``"trace"``; other results are logged with it instead.
+	"""
+
+	@wraps(fn)
+	def wrapper(*args, trace: bool = False, **kwargs):
+		if is_tracing() or not (cint(trace) or cint(frappe.conf.get("apex_item_trace_jobs"))):
+			return fn(*args, **kwargs)
+
+		with traced() as active:
+			result = fn(*args, **kwargs)
+		if isinstance(result, dict):
+			return dict(result, trace=active.summary)
+		frappe.logger("apex_item").info({"job": fn.__name__, "trace": active.summary})
+		return result
+
+	return wrapper
+
+
+def before_request() -> None:
+	"""Start a trace when the request asks for one (System Managers only) or the site traces all."""
+	if cint(frappe.conf.get("apex_item_tracing")) or (_is_trace_requested() and _can_trace()):
+		start_trace()
+
+
+def after_request(response=None, request=None) -> None:
+	"""Stop the request trace and return its per-step summary in the response header."""
+	summary = stop_trace()
+	if summary is None or response is None:
+		return
+
+	header = {key: value for key, value in summary.items() if key not in ("spans", "dropped_spans")}
+	payload = json.dumps(header, separators=(",", ":"), default=str)
+	if len(payload) > _MAX_HEADER_SIZE:
+		header.pop("steps")
+		payload = json.dumps(header, separators=(",", ":"), default=str)
+	response.headers[TRACE_HEADER] = payload
+	frappe.logger("apex_item").info({"path": getattr(request, "path", None), "trace": summary})
+
+
+def _is_trace_requested() -> bool:
+	request = getattr(frappe.local, "request", None)
+	if request is not None and cint(request.headers.get(TRACE_HEADER)):
+		return True
+	return bool(cint((getattr(frappe.local, "form_dict", None) or {}).get(_TRACE_FORM_KEY)))
+
+
+def _can_trace() -> bool:
+	return "System Manager" in frappe.get_roles()
+
+
+def _count_rows(db, result: Any) -> int:
+	if isinstance(result, (list, tuple)):
+		return len(result)
+	# Writes return nothing; use the rows the statement affected
+	cursor = getattr(db, "_cursor", None)
+	return max(getattr(cursor, "rowcount", 0) or 0, 0)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Shared helpers for Apex Item"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+import frappe
+from frappe.utils import cint
+
+
+def get_conf_int(key: str, default: int, minimum: int = 1) -> int:
+	"""Read an integer setting from site_config.json, falling back to ``default``."""
+	value = frappe.conf.get(key)
+	# An explicit 0 is a valid setting wherever ``minimum`` allows it
+	value = default if value in (None, "") else cint(value)
+	return value if value >= minimum else default
+
+
+def chunked(values: Iterable, size: int) -> Iterator[List]:
+	"""Yield ``values`` in lists of at most ``size`` elements."""
+	chunk: List = []
+	for value in values:
+		chunk.append(value)
+		if len(chunk) >= size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def get_redis_value(key: str) -> Any:
+	"""
+	Read a frappe.cache() value straight from Redis. get_value returns whatever
+	frappe.local.cache holds for the key, including a miss stored by an earlier read
+	(even with expires=True), so loops polling for another process's write must use this.
+	"""
+	cache = frappe.cache()
+	try:
+		value = cache.get(cache.make_key(key))
+	except Exception:
+		return None
+	return pickle.loads(value) if value is not None else None
+
+
+# Compare-and-act scripts so a lease is only renewed or released by its holder
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+	return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+	return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+	"""
+	Site-scoped lease lock held in Redis for ``ttl`` seconds. A holder that dies simply
+	lets the lease expire; long runs call renew() between units of work. Passing the
+	``token`` of a lease acquired elsewhere (e.g. by the request that enqueued a job)
+	lets that job renew or release it.
+	"""
+
+	def __init__(self, key: str, ttl: int, token: Optional[str] = None):
+		self.key = key
+		self.ttl = ttl
+		self.token: Optional[str] = token
+
+	def __enter__(self) -> bool:
+		return self.acquire()
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.release()
+
+	def acquire(self) -> bool:
+		token = frappe.generate_hash(length=16)
+		cache = frappe.cache()
+		if cache.execute_command("SET", cache.make_key(self.key), token, "NX", "EX", self.ttl):
+			self.token = token
+			return True
+		return False
+
+	def renew(self) -> bool:
+		if not self.token:
+			return False
+		cache = frappe.cache()
+		return bool(cache.execute_command("EVAL", _RENEW_SCRIPT, 1, cache.make_key(self.key), self.token, self.ttl))
+
+	def release(self) -> None:
+		if not self.token:
+			return
+		cache = frappe.cache()
+		cache.execute_command("EVAL", _RELEASE_SCRIPT, 1, cache.make_key(self.key), self.token)
+		self.token = None
+
+
+class SiteTTLCache:
+	"""
+	In-process cache bounded by ``maxsize`` entries with per-entry ``ttl`` (seconds) and
+	LRU eviction. Keys are scoped by ``frappe.local.site`` so workers serving several
+	sites never mix values. Invalidation is local to the process; other workers pick
+	up changes once their entries expire.
+	"""
+
+	def __init__(self, maxsize: int, ttl: float):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._data: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+		"""Return the cached value for ``key``, calling ``loader`` on a miss (``None`` is cached too)."""
+		site_key = (_get_site(), key)
+		with self._lock:
+			entry = self._data.get(site_key)
+			if entry and entry[0] > time.monotonic():
+				self._data.move_to_end(site_key)
+				self.hits += 1
+				return entry[1]
+			self.misses += 1
+
+		value = loader()
+		self.set(key, value)
+		return value
+
+	def get_many(self, keys: Iterable[Hashable]) -> tuple[Dict[Hashable, Any], List[Hashable]]:
+		"""Return ({key: value} for live entries, [keys that missed])."""
+		site = _get_site()
+		found: Dict[Hashable, Any] = {}
+		missing: List[Hashable] = []
+		now = time.monotonic()
+		with self._lock:
+			for key in dict.fromkeys(keys):
+				entry = self._data.get((site, key))
+				if entry and entry[0] > now:
+					self._data.move_to_end((site, key))
+					found[key] = entry[1]
+				else:
+					missing.append(key)
+			self.hits += len(found)
+			self.misses += len(missing)
+		return found, missing
+
+	def set(self, key: Hashable, value: Any) -> None:
+		site_key = (_get_site(), key)
+		with self._lock:
+			self._data[site_key] = (time.monotonic() + self.ttl, value)
+			self._data.move_to_end(site_key)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+				self.evictions += 1
+
+	def invalidate(self, key: Hashable) -> None:
+		with self._lock:
+			self._data.pop((_get_site(), key), None)
+
+	def clear(self) -> None:
+		"""Drop every entry of the current site."""
+		site = _get_site()
+		with self._lock:
+			for site_key in [site_key for site_key in self._data if site_key[0] == site]:
+				del self._data[site_key]
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"size": len(self._data),
+				"maxsize": self.maxsize,
+				"ttl": self.ttl,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+			}
+
+
+def _get_site() -> Optional[str]:
+	return getattr(frappe.local, "site", None)